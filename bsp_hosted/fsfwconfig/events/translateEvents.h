@@ -5,4 +5,10 @@
 
 const char *translateEvents(Event event);
 
+/**
+ * Look up the ID of an event by its name.
+ * @return false if no event with this name exists
+ */
+bool translateEventName(const char *name, EventId_t &eventId);
+
 #endif /* FSFWCONFIG_EVENTS_TRANSLATEEVENTS_H_ */
@@ -1,136 +1,152 @@
 /**
- * @brief  Auto-generated object translation file.
+ * @brief    Auto-generated object translation file. Contains 40 translations.
  * @details
- * Contains 40 translations.
  * Generated on: 2022-07-27 19:41:37
  */
 #include "translateObjects.h"
 
-const char *TEST_ASSEMBLY_STRING = "TEST_ASSEMBLY";
-const char *TEST_CONTROLLER_STRING = "TEST_CONTROLLER";
-const char *TEST_DEVICE_HANDLER_0_STRING = "TEST_DEVICE_HANDLER_0";
-const char *TEST_DEVICE_HANDLER_1_STRING = "TEST_DEVICE_HANDLER_1";
-const char *TEST_ECHO_COM_IF_STRING = "TEST_ECHO_COM_IF";
-const char *FSFW_OBJECTS_START_STRING = "FSFW_OBJECTS_START";
-const char *PUS_SERVICE_1_VERIFICATION_STRING = "PUS_SERVICE_1_VERIFICATION";
-const char *PUS_SERVICE_2_DEVICE_ACCESS_STRING = "PUS_SERVICE_2_DEVICE_ACCESS";
-const char *PUS_SERVICE_3_HOUSEKEEPING_STRING = "PUS_SERVICE_3_HOUSEKEEPING";
-const char *PUS_SERVICE_5_EVENT_REPORTING_STRING = "PUS_SERVICE_5_EVENT_REPORTING";
-const char *PUS_SERVICE_8_FUNCTION_MGMT_STRING = "PUS_SERVICE_8_FUNCTION_MGMT";
-const char *PUS_SERVICE_9_TIME_MGMT_STRING = "PUS_SERVICE_9_TIME_MGMT";
-const char *PUS_SERVICE_11_TC_SCHEDULER_STRING = "PUS_SERVICE_11_TC_SCHEDULER";
-const char *PUS_SERVICE_17_TEST_STRING = "PUS_SERVICE_17_TEST";
-const char *PUS_SERVICE_20_PARAMETERS_STRING = "PUS_SERVICE_20_PARAMETERS";
-const char *PUS_SERVICE_200_MODE_MGMT_STRING = "PUS_SERVICE_200_MODE_MGMT";
-const char *PUS_SERVICE_201_HEALTH_STRING = "PUS_SERVICE_201_HEALTH";
-const char *CFDP_PACKET_DISTRIBUTOR_STRING = "CFDP_PACKET_DISTRIBUTOR";
-const char *HEALTH_TABLE_STRING = "HEALTH_TABLE";
-const char *MODE_STORE_STRING = "MODE_STORE";
-const char *EVENT_MANAGER_STRING = "EVENT_MANAGER";
-const char *INTERNAL_ERROR_REPORTER_STRING = "INTERNAL_ERROR_REPORTER";
-const char *TC_STORE_STRING = "TC_STORE";
-const char *TM_STORE_STRING = "TM_STORE";
-const char *IPC_STORE_STRING = "IPC_STORE";
-const char *TIME_STAMPER_STRING = "TIME_STAMPER";
-const char *TC_VERIFICATOR_STRING = "TC_VERIFICATOR";
-const char *FSFW_OBJECTS_END_STRING = "FSFW_OBJECTS_END";
-const char *TCPIP_TMTC_BRIDGE_STRING = "TCPIP_TMTC_BRIDGE";
-const char *TCPIP_TMTC_POLLING_TASK_STRING = "TCPIP_TMTC_POLLING_TASK";
-const char *CCSDS_DISTRIBUTOR_STRING = "CCSDS_DISTRIBUTOR";
-const char *PUS_DISTRIBUTOR_STRING = "PUS_DISTRIBUTOR";
-const char *TM_FUNNEL_STRING = "TM_FUNNEL";
-const char *TEST_DUMMY_1_STRING = "TEST_DUMMY_1";
-const char *TEST_DUMMY_2_STRING = "TEST_DUMMY_2";
-const char *TEST_DUMMY_3_STRING = "TEST_DUMMY_3";
-const char *TEST_DUMMY_4_STRING = "TEST_DUMMY_4";
-const char *TEST_DUMMY_5_STRING = "TEST_DUMMY_5";
-const char *TEST_TASK_STRING = "TEST_TASK";
-const char *NO_OBJECT_STRING = "NO_OBJECT";
+#include <cstddef>
+#include <cstring>
+
+namespace {
+
+struct ObjectTranslation {
+  object_id_t id;
+  const char *name;
+};
+
+constexpr size_t NUM_OBJECT_TRANSLATIONS = 40;
+
+// Sorted by ID
+constexpr ObjectTranslation OBJECT_TRANSLATIONS[] = {
+    {0x4100CAFE, "TEST_ASSEMBLY"},
+    {0x4301CAFE, "TEST_CONTROLLER"},
+    {0x4401AFFE, "TEST_DEVICE_HANDLER_0"},
+    {0x4402AFFE, "TEST_DEVICE_HANDLER_1"},
+    {0x4900AFFE, "TEST_ECHO_COM_IF"},
+    {0x53000000, "FSFW_OBJECTS_START"},
+    {0x53000001, "PUS_SERVICE_1_VERIFICATION"},
+    {0x53000002, "PUS_SERVICE_2_DEVICE_ACCESS"},
+    {0x53000003, "PUS_SERVICE_3_HOUSEKEEPING"},
+    {0x53000005, "PUS_SERVICE_5_EVENT_REPORTING"},
+    {0x53000008, "PUS_SERVICE_8_FUNCTION_MGMT"},
+    {0x53000009, "PUS_SERVICE_9_TIME_MGMT"},
+    {0x53000011, "PUS_SERVICE_11_TC_SCHEDULER"},
+    {0x53000017, "PUS_SERVICE_17_TEST"},
+    {0x53000020, "PUS_SERVICE_20_PARAMETERS"},
+    {0x53000200, "PUS_SERVICE_200_MODE_MGMT"},
+    {0x53000201, "PUS_SERVICE_201_HEALTH"},
+    {0x53001000, "CFDP_PACKET_DISTRIBUTOR"},
+    {0x53010000, "HEALTH_TABLE"},
+    {0x53010100, "MODE_STORE"},
+    {0x53030000, "EVENT_MANAGER"},
+    {0x53040000, "INTERNAL_ERROR_REPORTER"},
+    {0x534f0100, "TC_STORE"},
+    {0x534f0200, "TM_STORE"},
+    {0x534f0300, "IPC_STORE"},
+    {0x53500010, "TIME_STAMPER"},
+    {0x53500020, "TC_VERIFICATOR"},
+    {0x53ffffff, "FSFW_OBJECTS_END"},
+    {0x62000300, "TCPIP_TMTC_BRIDGE"},
+    {0x62000400, "TCPIP_TMTC_POLLING_TASK"},
+    {0x63000000, "CCSDS_DISTRIBUTOR"},
+    {0x63000001, "PUS_DISTRIBUTOR"},
+    {0x63000002, "TM_FUNNEL"},
+    {0x74000001, "TEST_DUMMY_1"},
+    {0x74000002, "TEST_DUMMY_2"},
+    {0x74000003, "TEST_DUMMY_3"},
+    {0x74000004, "TEST_DUMMY_4"},
+    {0x74000005, "TEST_DUMMY_5"},
+    {0x7400CAFE, "TEST_TASK"},
+    {0xFFFFFFFF, "NO_OBJECT"},
+};
+
+// Indexes into OBJECT_TRANSLATIONS, sorted by name
+constexpr size_t OBJECT_NAME_INDEX[] = {
+    30,
+    17,
+    20,
+    27,
+    5,
+    18,
+    21,
+    24,
+    19,
+    39,
+    31,
+    12,
+    13,
+    6,
+    15,
+    16,
+    14,
+    7,
+    8,
+    9,
+    10,
+    11,
+    28,
+    29,
+    22,
+    26,
+    0,
+    1,
+    2,
+    3,
+    33,
+    34,
+    35,
+    36,
+    37,
+    4,
+    38,
+    25,
+    32,
+    23,
+};
+
+}  // namespace
 
 const char *translateObject(object_id_t object) {
-  switch ((object & 0xFFFFFFFF)) {
-    case 0x4100CAFE:
-      return TEST_ASSEMBLY_STRING;
-    case 0x4301CAFE:
-      return TEST_CONTROLLER_STRING;
-    case 0x4401AFFE:
-      return TEST_DEVICE_HANDLER_0_STRING;
-    case 0x4402AFFE:
-      return TEST_DEVICE_HANDLER_1_STRING;
-    case 0x4900AFFE:
-      return TEST_ECHO_COM_IF_STRING;
-    case 0x53000000:
-      return FSFW_OBJECTS_START_STRING;
-    case 0x53000001:
-      return PUS_SERVICE_1_VERIFICATION_STRING;
-    case 0x53000002:
-      return PUS_SERVICE_2_DEVICE_ACCESS_STRING;
-    case 0x53000003:
-      return PUS_SERVICE_3_HOUSEKEEPING_STRING;
-    case 0x53000005:
-      return PUS_SERVICE_5_EVENT_REPORTING_STRING;
-    case 0x53000008:
-      return PUS_SERVICE_8_FUNCTION_MGMT_STRING;
-    case 0x53000009:
-      return PUS_SERVICE_9_TIME_MGMT_STRING;
-    case 0x53000011:
-      return PUS_SERVICE_11_TC_SCHEDULER_STRING;
-    case 0x53000017:
-      return PUS_SERVICE_17_TEST_STRING;
-    case 0x53000020:
-      return PUS_SERVICE_20_PARAMETERS_STRING;
-    case 0x53000200:
-      return PUS_SERVICE_200_MODE_MGMT_STRING;
-    case 0x53000201:
-      return PUS_SERVICE_201_HEALTH_STRING;
-    case 0x53001000:
-      return CFDP_PACKET_DISTRIBUTOR_STRING;
-    case 0x53010000:
-      return HEALTH_TABLE_STRING;
-    case 0x53010100:
-      return MODE_STORE_STRING;
-    case 0x53030000:
-      return EVENT_MANAGER_STRING;
-    case 0x53040000:
-      return INTERNAL_ERROR_REPORTER_STRING;
-    case 0x534f0100:
-      return TC_STORE_STRING;
-    case 0x534f0200:
-      return TM_STORE_STRING;
-    case 0x534f0300:
-      return IPC_STORE_STRING;
-    case 0x53500010:
-      return TIME_STAMPER_STRING;
-    case 0x53500020:
-      return TC_VERIFICATOR_STRING;
-    case 0x53ffffff:
-      return FSFW_OBJECTS_END_STRING;
-    case 0x62000300:
-      return TCPIP_TMTC_BRIDGE_STRING;
-    case 0x62000400:
-      return TCPIP_TMTC_POLLING_TASK_STRING;
-    case 0x63000000:
-      return CCSDS_DISTRIBUTOR_STRING;
-    case 0x63000001:
-      return PUS_DISTRIBUTOR_STRING;
-    case 0x63000002:
-      return TM_FUNNEL_STRING;
-    case 0x74000001:
-      return TEST_DUMMY_1_STRING;
-    case 0x74000002:
-      return TEST_DUMMY_2_STRING;
-    case 0x74000003:
-      return TEST_DUMMY_3_STRING;
-    case 0x74000004:
-      return TEST_DUMMY_4_STRING;
-    case 0x74000005:
-      return TEST_DUMMY_5_STRING;
-    case 0x7400CAFE:
-      return TEST_TASK_STRING;
-    case 0xFFFFFFFF:
-      return NO_OBJECT_STRING;
-    default:
-      return "UNKNOWN_OBJECT";
+  const object_id_t id = object;
+  size_t low = 0;
+  size_t high = NUM_OBJECT_TRANSLATIONS;
+  while (low < high) {
+    const size_t mid = low + (high - low) / 2;
+    if (OBJECT_TRANSLATIONS[mid].id < id) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  if (low < NUM_OBJECT_TRANSLATIONS && OBJECT_TRANSLATIONS[low].id == id) {
+    return OBJECT_TRANSLATIONS[low].name;
+  }
+  return "UNKNOWN_OBJECT";
+}
+
+bool translateObjectName(const char *name, object_id_t &objectId) {
+  if (name == nullptr) {
+    return false;
+  }
+  size_t low = 0;
+  size_t high = NUM_OBJECT_TRANSLATIONS;
+  while (low < high) {
+    const size_t mid = low + (high - low) / 2;
+    const char *midName = OBJECT_TRANSLATIONS[OBJECT_NAME_INDEX[mid]].name;
+    if (std::strcmp(midName, name) < 0) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  if (low == NUM_OBJECT_TRANSLATIONS) {
+    return false;
+  }
+  const ObjectTranslation &translation = OBJECT_TRANSLATIONS[OBJECT_NAME_INDEX[low]];
+  if (std::strcmp(translation.name, name) == 0) {
+    objectId = translation.id;
+    return true;
   }
-  return 0;
+  return false;
 }
@@ -5,4 +5,10 @@
 
 const char *translateObject(object_id_t object);
 
+/**
+ * Look up the ID of an object by its name.
+ * @return false if no object with this name exists
+ */
+bool translateObjectName(const char *name, object_id_t &objectId);
+
 #endif /* FSFWCONFIG_OBJECTS_TRANSLATEOBJECTS_H_ */
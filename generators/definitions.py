@@ -17,4 +17,5 @@ OBSW_ROOT_DIR = Path(determine_obsw_root_path())
 COMMON_SUBMODULE_NAME = "example_common"
 EXAMPLE_COMMON_DIR = f"{OBSW_ROOT_DIR}/{COMMON_SUBMODULE_NAME}"
 DATABASE_NAME = "eive_mod.db"
+PARSE_CACHE_NAME = ".parse_cache"
 BSP_HOSTED = "bsp_hosted"
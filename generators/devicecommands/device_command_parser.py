@@ -9,13 +9,19 @@
 @author     R. Mueller
 """
 import re
+from collections.abc import ItemsView, Mapping, ValuesView
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 from fsfwgen.parserbase.file_list_parser import FileListParser
 from fsfwgen.parserbase.parser import FileParser
 from fsfwgen.utility.csv_writer import CsvWriter
 from fsfwgen.utility.printer import Printer
 
+from utility.line_source import LineSource
+from utility.sql_exporter import SqlTable
+
 
 DH_COMMAND_PACKET_DEFINITION_DESTINATION = "../../mission/devices/devicepackets/"
 DH_DEFINITION_DESTINATION = "../../mission/devices/"
@@ -31,32 +37,25 @@ DH_COMMAND_HEADER_COLUMNS = [
     "Command Field Option Value",
     "Comment",
 ]
-
-SQL_DELETE_CMDTABLE_CMD = """
-    DROP TABLE IF EXISTS DeviceHandlerCommand;
-"""
-
-SQL_CREATE_CMDTABLE_CMD = """
-    CREATE TABLE IF NOT EXISTS DeviceHandlerCommand(
-    id                      INTEGER PRIMARY KEY,
-    deviceHandler           TEXT,
-    commandName             TEXT,
-    actionID                INTEGER,
-    cmdFieldName            TEXT,
-    cmdFieldPos             INTEGER,
-    cmdFieldType            TEXT,
-    cmdFieldOptName         TEXT,
-    cmdFieldOptVal          INTEGER,
-    comment                 COMMENT
-    )
-    """
-
-
-SQL_INSERT_INTO_CMDTABLE_CMD = """
-INSERT INTO DeviceHandlerCommand(deviceHandler,commandName,actionID,cmdFieldName,cmdFieldPos,
-                                 cmdFieldType,cmdFieldOptName,cmdFieldOptVal,comment)
-VALUES(?,?,?,?,?,?,?,?,?)
-"""
+# Device handler command enums and definitions are marked with these strings
+DH_INFORMATION_MARKERS = ("[export",)
+DH_COMMAND_MARKERS = ("[EXPORT]",)
+
+DH_COMMAND_SQL_TABLE = SqlTable(
+    name="DeviceHandlerCommand",
+    columns=[
+        ("deviceHandler", "TEXT"),
+        ("commandName", "TEXT"),
+        ("actionID", "INTEGER"),
+        ("cmdFieldName", "TEXT"),
+        ("cmdFieldPos", "INTEGER"),
+        ("cmdFieldType", "TEXT"),
+        ("cmdFieldOptName", "TEXT"),
+        ("cmdFieldOptVal", "INTEGER"),
+        ("comment", "TEXT"),
+    ],
+    key_columns=["deviceHandler", "commandName", "cmdFieldName", "cmdFieldOptName"],
+)
 
 
 class DeviceCommandColumns(Enum):
@@ -78,6 +77,116 @@ class DeviceCommandColumns(Enum):
 Clmns = DeviceCommandColumns
 
 
+class EnumOption(NamedTuple):
+    name: str
+    value: str
+    comment: str
+
+
+class CommandEnum(NamedTuple):
+    """Command field enum of a device handler. One instance is shared by all command fields
+    which use the enum."""
+
+    name: str
+    options: Tuple[EnumOption, ...]
+
+
+class DeviceHandlerInfo(NamedTuple):
+    """Command IDs and command field enums of a device handler, by name."""
+
+    command_ids: Dict[str, str]
+    enums: Dict[str, CommandEnum]
+
+
+class CommandField(NamedTuple):
+    name: str
+    type: str
+    index: int
+    enum: Optional[CommandEnum]
+    comment: str
+
+
+@dataclass
+class DeviceCommand:
+    handler: str
+    name: str
+    action_id: str
+    fields: List[CommandField] = field(default_factory=list)
+
+
+class DeviceCommandTable(Mapping):
+    """Device handler commands with their fields and the options of their field enums.
+
+    The table is a mapping of row indexes to the rows of the CSV and SQL export. The rows are
+    created while they are iterated: fields with an enum have one row per enum option,
+    all other fields have one row. Use items() or values() to iterate the rows, looking
+    up a single row walks the table.
+    """
+
+    def __init__(self):
+        # All commands in parse order, and the same commands grouped by device handler
+        self.commands: List[DeviceCommand] = []
+        self.handlers: Dict[str, List[DeviceCommand]] = dict()
+
+    def add_command(self, command: DeviceCommand):
+        self.commands.append(command)
+        self.handlers.setdefault(command.handler, []).append(command)
+
+    def iter_rows(self) -> Iterator[Tuple[int, tuple]]:
+        # The row indexes are the ones of the former flat table, which leaves a gap after
+        # the rows of every field with enum options
+        index = 0
+        for command in self.commands:
+            for command_field in command.fields:
+                head = (
+                    command.handler,
+                    command.name,
+                    command.action_id,
+                    command_field.name,
+                    command_field.index,
+                    command_field.type,
+                )
+                if command_field.enum is None:
+                    yield index, head + ("", "", command_field.comment)
+                else:
+                    for option in command_field.enum.options:
+                        index += 1
+                        yield index, head + option
+                index += 1
+
+    def __len__(self) -> int:
+        return sum(
+            len(command_field.enum.options) if command_field.enum is not None else 1
+            for command in self.commands
+            for command_field in command.fields
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        return (index for index, _ in self.iter_rows())
+
+    def __getitem__(self, key: int) -> tuple:
+        for index, row in self.iter_rows():
+            if index == key:
+                return row
+        raise KeyError(key)
+
+    def items(self) -> "_RowItemsView":
+        return _RowItemsView(self)
+
+    def values(self) -> "_RowValuesView":
+        return _RowValuesView(self)
+
+
+class _RowItemsView(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_rows()
+
+
+class _RowValuesView(ValuesView):
+    def __iter__(self):
+        return (row for _, row in self._mapping.iter_rows())
+
+
 def main():
     """
     The main routine is run if the device command parser is run separately.
@@ -117,6 +226,9 @@ class DeviceHandlerInformationParser(FileParser):
     header files. These can be used to map commands to the device handler packets later.
     """
 
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
     def __init__(self, fileList):
         super().__init__(fileList)
         self.command_dict = dict()
@@ -141,16 +253,17 @@ class DeviceHandlerInformationParser(FileParser):
         if not handler_match:
             print("Device Command Parser: Configuration error, no handler name match !")
         handler_name = handler_match.group(1)
-        file = open(file_name, "r")
         if self_print_parsing_info:
             print("Parsing " + file_name + " ...")
-        # Scans each line for possible device handler command enums
-        for line in file.readlines():
-            self.__handle_line_reading(line)
-        handler_tuple = (self.command_dict, self.command_enum_dict)
-        handler_dict = dict()
-        handler_dict.update({handler_name: handler_tuple})
-        self.mib_table.update(handler_dict)
+        # Scans each line for possible device handler command enums. Files without export
+        # markers still get an empty handler entry.
+        markers = () if self.command_scanning_pending else DH_INFORMATION_MARKERS
+        with self._line_source(file_name, markers, ignore_case=True) as lines:
+            for line in lines:
+                self.__handle_line_reading(line)
+        self.mib_table.update(
+            {handler_name: DeviceHandlerInfo(self.command_dict, self.command_enum_dict)}
+        )
 
         self.command_dict = dict()
         self.command_enum_dict = dict()
@@ -194,12 +307,18 @@ class DeviceHandlerInformationParser(FileParser):
         if not self.command_scanning_pending:
             # scanning enum finished
             # stores current command into command dictionary with command name as unique key
-            command_tuple = (
-                self.command_value_name_list,
-                self.command_value_list,
-                self.command_comment_list,
+            command_enum = CommandEnum(
+                name=self.command_enum_name,
+                options=tuple(
+                    EnumOption(name, value, comment)
+                    for name, value, comment in zip(
+                        self.command_value_name_list,
+                        self.command_value_list,
+                        self.command_comment_list,
+                    )
+                ),
             )
-            self.command_enum_dict.update({self.command_enum_name: command_tuple})
+            self.command_enum_dict.update({self.command_enum_name: command_enum})
             self.command_enum_name = ""
             self.command_value_name_list = []
             self.command_value_list = []
@@ -238,15 +357,17 @@ class DeviceHandlerCommandParser(FileParser):
     by running the DH information parser.
     """
 
-    def __init__(self, file_list, dh_information_table):
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
+    def __init__(self, file_list, dh_information_table: Dict[str, DeviceHandlerInfo]):
         super().__init__(file_list)
-        # this table includes the current new table entry,
-        # which will be updated for target parameter
-        self.dict_entry_list = list(range(Clmns.__len__()))
+        self.command_table = DeviceCommandTable()
+        self.current_command: Optional[DeviceCommand] = None
 
         # This table containts information about respective device handler command options
         self.dh_information_table = dh_information_table
-        self.enum_dict = dict()
+        self.enum_dict: Dict[str, CommandEnum] = dict()
 
         self.current_enum_name = ""
         self.comment = ""
@@ -255,19 +376,27 @@ class DeviceHandlerCommandParser(FileParser):
 
         self.scanning_pending = PendingScanType.NO_SCANNING.value
 
-    # This is called for every file, fill out mib_table
+    def parse_files(self, *args, **kwargs) -> DeviceCommandTable:
+        """Parse all files. The rows of the returned table are only created on export."""
+        super().parse_files(*args, **kwargs)
+        return self.command_table
+
+    # This is called for every file, fill out the command table
     def _handle_file_parsing(self, file_name, *args):
         self_print_parsing_info = False
         if len(args) == 1 and isinstance(args[0], bool):
             self_print_parsing_info = args[0]
-        file = open(file_name, "r")
 
         if self_print_parsing_info:
             print("Parsing " + file_name + " ...")
 
         # Scans each line for possible device handler command enums
-        for line in file.readlines():
-            self.__handle_line_reading(line)
+        markers = ()
+        if self.scanning_pending is PendingScanType.NO_SCANNING.value:
+            markers = DH_COMMAND_MARKERS
+        with self._line_source(file_name, markers) as lines:
+            for line in lines:
+                self.__handle_line_reading(line)
 
     def __handle_line_reading(self, line: str):
         """
@@ -312,20 +441,23 @@ class DeviceHandlerCommandParser(FileParser):
 
     def __start_class_or_struct_scanning(self, command_match):
         """
-        Stores and assigns values that are the same for each command field option
+        Adds the command to the table and looks up its action ID and the enums of its
+        device handler
         :param command_match:
         :return:
         """
         handler_name = command_match.group(2)
-        self.dict_entry_list[Clmns.DH_NAME.value] = handler_name
-        self.dict_entry_list[Clmns.NAME.value] = command_match.group(1)
         command_name = command_match.group(3)
-        if handler_name in self.dh_information_table:
-            (command_id_dict, self.enum_dict) = self.dh_information_table[handler_name]
-            if command_name in command_id_dict:
-                self.dict_entry_list[Clmns.ACTION_ID.value] = command_id_dict[
-                    command_name
-                ]
+        action_id = ""
+        self.enum_dict = dict()
+        handler_info = self.dh_information_table.get(handler_name)
+        if handler_info is not None:
+            self.enum_dict = handler_info.enums
+            action_id = handler_info.command_ids.get(command_name, "")
+        self.current_command = DeviceCommand(
+            handler=handler_name, name=command_match.group(1), action_id=action_id
+        )
+        self.command_table.add_command(self.current_command)
 
     def __scan_command(self, line):
         datatype_match = False
@@ -345,17 +477,28 @@ class DeviceHandlerCommandParser(FileParser):
             self.__handle_datatype_match(datatype_match)
         elif re.search(r"}[\s]*;", line):
             self.scanning_pending = PendingScanType.NO_SCANNING.value
+            self.current_command = None
             self.command_index = 0
 
     def __handle_datatype_match(self, datatype_match):
-        self.dict_entry_list[Clmns.TYPE.value] = datatype_match.group(1)
-        self.dict_entry_list[Clmns.COMMAND_FIELD_NAME.value] = datatype_match.group(2)
-        size_of_enum = 0
+        self.current_enum_name = ""
+        self.command_comment = ""
         if datatype_match.group(3) is not None:
             self.__analyse_exporter_sequence(datatype_match.group(3))
-        if self.current_enum_name != "":
-            size_of_enum = self.__get_enum_size()
-        self.__update_device_command_dict(size_of_enum)
+        # The enum is referenced by the field, its options are only expanded on export
+        command_enum = self.enum_dict.get(self.current_enum_name)
+        if command_enum is not None and not command_enum.options:
+            command_enum = None
+        self.current_command.fields.append(
+            CommandField(
+                name=datatype_match.group(2),
+                type=datatype_match.group(1),
+                index=self.command_index,
+                enum=command_enum,
+                comment=self.command_comment if command_enum is None else "",
+            )
+        )
+        self.command_index += 1
 
     def __analyse_exporter_sequence(self, exporter_sequence):
         # This matches the exporter sequence pairs e.g. [ENUM] BLA [COMMENT] BLABLA [...] ...
@@ -382,48 +525,6 @@ class DeviceHandlerCommandParser(FileParser):
         elif sequence_type.casefold() == "comment":
             self.command_comment = sequence_entry
 
-    def __get_enum_size(self) -> int:
-        if self.current_enum_name in self.enum_dict:
-            size_of_enum = len(self.enum_dict[self.current_enum_name][1])
-            return size_of_enum
-        return 0
-
-    def __update_device_command_dict(self, size_of_enum: int = 0):
-        if size_of_enum > 0:
-            enum_tuple = self.enum_dict[self.current_enum_name]
-            for count in range(0, size_of_enum):
-                self.__update_table_with_command_options(count, enum_tuple)
-            self.command_index = self.command_index + 1
-        else:
-            self.__update_table_with_no_command_options()
-        self.index = self.index + 1
-        self.current_enum_name = ""
-
-    def __update_table_with_command_options(self, count, enum_tuple):
-        enum_value_name_list, enum_value_list, enum_comment_list = enum_tuple
-        self.dict_entry_list[
-            Clmns.COMMAND_FIELD_OPTION_NAME.value
-        ] = enum_value_name_list[count]
-        self.dict_entry_list[Clmns.COMMAND_FIELD_OPTION_VALUE.value] = enum_value_list[
-            count
-        ]
-        self.dict_entry_list[Clmns.COMMAND_FIELD_COMMENT.value] = enum_comment_list[
-            count
-        ]
-        self.dict_entry_list[Clmns.COMMAND_INDEX.value] = self.command_index
-        dh_command_tuple = tuple(self.dict_entry_list)
-        self.index += 1
-        self.mib_table.update({self.index: dh_command_tuple})
-
-    def __update_table_with_no_command_options(self):
-        self.dict_entry_list[Clmns.COMMAND_FIELD_OPTION_NAME.value] = ""
-        self.dict_entry_list[Clmns.COMMAND_FIELD_OPTION_VALUE.value] = ""
-        self.dict_entry_list[Clmns.COMMAND_FIELD_COMMENT.value] = self.command_comment
-        self.dict_entry_list[Clmns.COMMAND_INDEX.value] = self.command_index
-        dh_command_tuple = tuple(self.dict_entry_list)
-        self.mib_table.update({self.index: dh_command_tuple})
-        self.command_index += 1
-
     def _post_parsing_operation(self):
         pass
 
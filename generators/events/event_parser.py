@@ -1,21 +1,45 @@
 """Part of the Mission Operation Database Exporter for the FSFW project.
 Event exporter.
+
+Example declarations to scan for:
+
+static constexpr uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::PUS_SERVICE_17;
+//! [EXPORT] : [COMMENT] Event triggered by a connection test
+static constexpr Event TEST = MAKE_EVENT(0, severity::INFO);
+static constexpr Event OTHER_TEST = event::makeEvent(SUBSYSTEM_ID, 1, severity::LOW);
 """
 import datetime
-import time
 import os
+import re
+from functools import partial
+from typing import Dict, List, Optional
 
 from fsfwgen.events.event_parser import (
     handle_csv_export,
     handle_cpp_export,
     SubsystemDefinitionParser,
-    EventParser,
 )
-from fsfwgen.parserbase.file_list_parser import FileListParser
-from fsfwgen.utility.printer import PrettyPrinter
-from fsfwgen.utility.file_management import copy_file
 from fsfwgen.core import get_console_logger
-from definitions import BSP_HOSTED, ROOT_DIR, OBSW_ROOT_DIR, EXAMPLE_COMMON_DIR
+from fsfwgen.parserbase.parser import FileParser
+from definitions import (
+    BSP_HOSTED,
+    DATABASE_NAME,
+    ROOT_DIR,
+    OBSW_ROOT_DIR,
+    EXAMPLE_COMMON_DIR,
+)
+from utility.cpp_tokenizer import DECL_STATIC_CONST, export_comment, scan_declarations
+from utility.cpp_translation import (
+    TRANSLATION_BACKEND_TABLE,
+    write_event_translation_table,
+)
+from utility.line_source import LineSource
+from utility.lookup_table import write_lookup_table
+from utility.output_stage import OutputStage
+from utility.parse_cache import ParseCache
+from utility.reporting import dump_table, stage
+from utility.source_scanner import SourceScanner
+from utility.sql_exporter import SqlExporter, SqlTable, hex_id
 
 LOGGER = get_console_logger()
 DATE_TODAY = datetime.datetime.now()
@@ -23,10 +47,15 @@ DATE_STRING_FULL = DATE_TODAY.strftime("%Y-%m-%d %H:%M:%S")
 
 GENERATE_CPP = True
 GENERATE_CPP_H = True
+# Either "table" for a binary searched constexpr table with reverse lookup, or "switch" for
+# the switch statement generated by fsfwgen
+TRANSLATION_BACKEND = TRANSLATION_BACKEND_TABLE
 GENERATE_CSV = True
 COPY_CPP_FILE = True
 COPY_CPP_H_FILE = True
 MOVE_CSV_FILE = True
+GENERATE_LOOKUP_TABLE = True
+EXPORT_TO_SQL = True
 
 PARSE_HOST_BSP = True
 
@@ -37,6 +66,9 @@ CPP_H_FILENAME = f"{os.path.dirname(os.path.realpath(__file__))}/translateEvents
 # Store this file in the root of the generators folder
 CSV_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_events.csv"
 CSV_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/events.csv"
+LOOKUP_TABLE_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_events.bin"
+LOOKUP_TABLE_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/events.bin"
+LOOKUP_TABLE_FIELDS = ["name", "severity", "description", "file"]
 FSFW_CONFIG_ROOT = f"{OBSW_ROOT_DIR}/bsp_hosted/fsfwconfig"
 CPP_COPY_DESTINATION = f"{FSFW_CONFIG_ROOT}/events/"
 
@@ -52,59 +84,235 @@ HEADER_DEFINITION_DESTINATIONS = [
     f"{FSFW_CONFIG_ROOT}",
 ]
 
+# Initializers of event definitions, with the macro or with the function of the event namespace
+EVENT_VALUE_PATTERN = re.compile(
+    r"(?:MAKE_EVENT|(?:\w+::)*makeEvent)\((?:(?P<subsystem>[\w:]+),\s*)?"
+    r"(?P<number>\w+),\s*severity::(?P<severity>\w+)\)"
+)
+SUBSYSTEM_ID_PATTERN = re.compile(r"^SUBSYSTEM_ID::(\w+)$")
+# Files which contain none of these strings can not define events
+EVENT_MARKERS = ("Event",)
+
+EVENTS_SQL_TABLE = SqlTable(
+    name="Events",
+    columns=[
+        ("eventid", "TEXT"),
+        ("eventidInt", "INTEGER"),
+        ("name", "TEXT"),
+        ("severity", "TEXT"),
+        ("description", "TEXT"),
+        ("file", "TEXT"),
+    ],
+    key_columns=["eventidInt"],
+    indexes=[("name", ["name", "eventidInt"], False)],
+    version=3,
+)
+
 
 def parse_events(
-    generate_csv: bool = True, generate_cpp: bool = True, print_events: bool = True
+    generate_csv: bool = True,
+    generate_cpp: bool = True,
+    print_events: bool = True,
+    scanner: Optional[SourceScanner] = None,
+    cache: Optional[ParseCache] = None,
 ):
     LOGGER.info("EventParser: Parsing events: ")
-    # Small delay for clean printout
-    time.sleep(0.01)
-    event_list = generate_event_list()
+    with stage("events: parse"):
+        event_list = generate_event_list(scanner, cache)
     if print_events:
-        PrettyPrinter.pprint(event_list)
-        # Delay for clean printout
-        time.sleep(0.1)
+        dump_table("events", event_list)
     # xml_test()
-    if generate_csv:
-        handle_csv_export(
-            file_name=CSV_FILENAME, event_list=event_list, file_separator=FILE_SEPARATOR
-        )
-        LOGGER.info(f"Copying CSV file to {CSV_COPY_DEST}")
-        copy_file(
-            filename=CSV_FILENAME, destination=CSV_COPY_DEST, delete_existing_file=True
-        )
-
-    if generate_cpp:
-        handle_cpp_export(
-            event_list=event_list,
-            date_string=DATE_STRING_FULL,
-            file_name=CPP_FILENAME,
-            generate_header=GENERATE_CPP_H,
-            header_file_name=CPP_H_FILENAME,
-        )
-        if COPY_CPP_FILE:
-            LOGGER.info(
-                f"EventParser: Copying CPP translation file to {CPP_COPY_DESTINATION}"
+    with stage("events: export"):
+        export_events(event_list, generate_csv, generate_cpp)
+    if EXPORT_TO_SQL:
+        LOGGER.info("EventParser: Exporting to SQL")
+        with stage("events: SQL export"):
+            sql_event_exporter(event_list, db_filename=f"{ROOT_DIR}/{DATABASE_NAME}")
+
+
+def export_events(event_list: list, generate_csv: bool, generate_cpp: bool):
+    # Files are only written and copied if their content changed
+    with OutputStage() as output:
+        if generate_csv:
+            LOGGER.info(f"Exporting CSV file, copy destination {CSV_COPY_DEST}")
+            handle_csv_export(
+                file_name=output.path(CSV_FILENAME, CSV_COPY_DEST),
+                event_list=event_list,
+                file_separator=FILE_SEPARATOR,
+            )
+        if GENERATE_LOOKUP_TABLE:
+            write_lookup_table(
+                file_name=output.path(LOOKUP_TABLE_FILENAME, LOOKUP_TABLE_COPY_DEST),
+                fields=LOOKUP_TABLE_FIELDS,
+                entries=event_list,
             )
-            copy_file(CPP_FILENAME, CPP_COPY_DESTINATION)
-            copy_file(CPP_H_FILENAME, CPP_COPY_DESTINATION)
 
+        if generate_cpp:
+            cpp_copy_destination = CPP_COPY_DESTINATION if COPY_CPP_FILE else None
+            if COPY_CPP_FILE:
+                LOGGER.info(
+                    f"EventParser: Copying CPP translation file to {CPP_COPY_DESTINATION}"
+                )
+            if TRANSLATION_BACKEND == TRANSLATION_BACKEND_TABLE:
+                write_event_translation_table(
+                    file_name=output.path(CPP_FILENAME, cpp_copy_destination),
+                    header_file_name=output.path(CPP_H_FILENAME, cpp_copy_destination)
+                    if GENERATE_CPP_H
+                    else None,
+                    event_list=event_list,
+                    date_string=DATE_STRING_FULL,
+                )
+            else:
+                handle_cpp_export(
+                    event_list=event_list,
+                    date_string=DATE_STRING_FULL,
+                    file_name=output.path(CPP_FILENAME, cpp_copy_destination),
+                    generate_header=GENERATE_CPP_H,
+                    header_file_name=output.path(CPP_H_FILENAME, cpp_copy_destination),
+                )
 
-def generate_event_list() -> list:
-    subsystem_parser = SubsystemDefinitionParser(SUBSYSTEM_DEFINITION_DESTINATIONS)
-    subsystem_table = subsystem_parser.parse_files()
-    LOGGER.info(f"Found {len(subsystem_table)} subsystem definitions.")
-    PrettyPrinter.pprint(subsystem_table)
-    event_header_parser = FileListParser(HEADER_DEFINITION_DESTINATIONS)
-    event_headers = event_header_parser.parse_header_files(
-        True, "Parsing event header file list:\n", True
+
+def sql_event_exporter(event_list: list, db_filename: str):
+    SqlExporter(db_filename).export(
+        EVENTS_SQL_TABLE,
+        [
+            (
+                hex_id(entry[0], 4),
+                entry[0],
+                entry[1][0],
+                entry[1][1],
+                entry[1][2],
+                entry[1][3],
+            )
+            for entry in event_list
+        ],
     )
+
+
+def generate_event_list(
+    scanner: Optional[SourceScanner] = None, cache: Optional[ParseCache] = None
+) -> list:
+    if scanner is None:
+        scanner = SourceScanner()
+    if cache is None:
+        cache = ParseCache()
+    subsystem_table = cache.parse(
+        table_name="subsystems",
+        file_list=SUBSYSTEM_DEFINITION_DESTINATIONS,
+        parser_factory=SubsystemDefinitionParser,
+        scanner=scanner,
+        split_files=False,
+    )
+    LOGGER.info(f"Found {len(subsystem_table)} subsystem definitions.")
+    dump_table("subsystems", subsystem_table)
+    event_headers = scanner.header_files(HEADER_DEFINITION_DESTINATIONS)
+    LOGGER.info(f"Parsing event header file list: {len(event_headers)} header files")
     # PrettyPrinter.pprint(event_headers)
     # myEventList = parseHeaderFiles(subsystem_table, event_headers)
-    event_parser = EventParser(event_headers, subsystem_table)
-    event_parser.obsw_root_path = OBSW_ROOT_DIR
-    event_parser.set_moving_window_mode(moving_window_size=7)
-    event_table = event_parser.parse_files()
+    event_table = cache.parse(
+        table_name="events",
+        file_list=event_headers,
+        parser_factory=partial(create_event_parser, subsystem_table),
+        scanner=scanner,
+        context=subsystem_table,
+    )
     event_list = sorted(event_table.items())
     LOGGER.info(f"Found {len(event_list)} entries")
     return event_list
+
+
+class EventParser(FileParser):
+    """Parses the event definitions of headers from the declarations of the C++ tokenizer.
+    The entries are keyed by the full event ID and contain the name, the severity, the
+    description and the file of the event, like the entries of the fsfwgen event parser.
+    The description is taken from an [EXPORT] : [COMMENT] command in the comments of the
+    definition.
+    """
+
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
+    def __init__(self, file_list: List[str], subsystem_table: dict):
+        super().__init__(file_list)
+        self.subsystem_table = subsystem_table
+        self.obsw_root_path: Optional[str] = None
+
+    def _handle_file_parsing(self, file_name: str, *args: any, **kwargs):
+        with self._line_source(file_name, EVENT_MARKERS) as lines:
+            declarations = scan_declarations(lines)
+        # Subsystem ID constants of this file, and the last one, which is used by the
+        # MAKE_EVENT macro
+        subsystem_ids: Dict[str, int] = dict()
+        current_id: Optional[int] = None
+        for declaration in declarations:
+            if declaration.kind != DECL_STATIC_CONST:
+                continue
+            subsystem_match = SUBSYSTEM_ID_PATTERN.match(declaration.value)
+            if subsystem_match:
+                current_id = self.__subsystem_id(subsystem_match.group(1))
+                if current_id is not None:
+                    subsystem_ids[declaration.name] = current_id
+                continue
+            if declaration.type_name.split("::")[-1] != "Event":
+                continue
+            event_match = EVENT_VALUE_PATTERN.search(declaration.value)
+            if not event_match:
+                continue
+            subsystem = event_match.group("subsystem")
+            subsystem_id = current_id
+            if subsystem is not None:
+                subsystem_match = SUBSYSTEM_ID_PATTERN.match(subsystem)
+                if subsystem_match:
+                    subsystem_id = self.__subsystem_id(subsystem_match.group(1))
+                else:
+                    subsystem_id = subsystem_ids.get(subsystem, current_id)
+            try:
+                number = int(event_match.group("number"), 0)
+            except ValueError:
+                number = None
+            if subsystem_id is None or number is None:
+                LOGGER.warning(
+                    f"EventParser: Could not resolve the ID of event {declaration.name} "
+                    f"in {file_name}"
+                )
+                continue
+            self.__add_entry(
+                subsystem_id * 100 + number,
+                (
+                    declaration.name,
+                    event_match.group("severity"),
+                    export_comment(declaration.doc)
+                    or export_comment(declaration.trailing_doc),
+                    self.__relative_file_name(file_name),
+                ),
+            )
+
+    def __subsystem_id(self, subsystem_name: str) -> Optional[int]:
+        subsystem_entry = self.subsystem_table.get(subsystem_name)
+        if subsystem_entry is None:
+            LOGGER.warning(f"EventParser: Subsystem ID {subsystem_name} not found")
+            return None
+        return int(str(subsystem_entry[0]), 0)
+
+    def __add_entry(self, full_id: int, entry: tuple):
+        previous_entry = self.mib_table.get(full_id)
+        if previous_entry is not None and previous_entry != entry:
+            LOGGER.warning(
+                f"EventParser: Duplicate event ID {full_id}: {entry[0]} in {entry[3]}, "
+                f"{previous_entry[0]} in {previous_entry[3]}"
+            )
+        self.mib_table.update({full_id: entry})
+
+    def __relative_file_name(self, file_name: str) -> str:
+        if self.obsw_root_path is None:
+            return file_name
+        return os.path.relpath(file_name, self.obsw_root_path)
+
+    def _post_parsing_operation(self):
+        pass
+
+
+def create_event_parser(subsystem_table: dict, event_headers: List[str]) -> EventParser:
+    event_parser = EventParser(event_headers, subsystem_table)
+    event_parser.obsw_root_path = OBSW_ROOT_DIR
+    return event_parser
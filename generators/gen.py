@@ -1,9 +1,32 @@
 #!/usr/bin/env python3
 import time
 
-from objects.objects import parse_objects
-from events.event_parser import parse_events
-from returnvalues.returnvalues_parser import parse_returnvalues
+from objects.objects import (
+    parse_objects,
+    OBJECTS_DEFINITIONS,
+    CPP_COPY_DESTINATION as OBJECTS_CPP_COPY_DESTINATION,
+)
+from events.event_parser import (
+    parse_events,
+    HEADER_DEFINITION_DESTINATIONS,
+    SUBSYSTEM_DEFINITION_DESTINATIONS,
+    CPP_COPY_DESTINATION as EVENTS_CPP_COPY_DESTINATION,
+)
+from returnvalues.returnvalues_parser import (
+    parse_returnvalues,
+    INTERFACE_DEFINITION_FILES,
+    RETURNVALUE_SOURCES,
+)
+from packetcontent.packet_content_parser import (
+    parse_packet_content,
+    PACKET_CONTENT_SOURCES,
+)
+from subservice.subservice_parser import parse_subservices, SUBSERVICE_SOURCES
+from utility import reporting
+from utility.parse_cache import ParseCache
+from utility.source_scanner import SourceScanner
+from utility.watcher import HeaderWatcher, affected_targets
+from definitions import PARSE_CACHE_NAME, ROOT_DIR
 from fsfwgen.core import (
     return_generic_args_parser,
     init_printout,
@@ -14,28 +37,143 @@ from fsfwgen.core import (
 
 LOGGER = get_console_logger()
 
+# Sources each generator depends on. Used by the watch mode to only re-run affected generators.
+WATCH_TARGETS = {
+    "objects": OBJECTS_DEFINITIONS,
+    "events": SUBSYSTEM_DEFINITION_DESTINATIONS + HEADER_DEFINITION_DESTINATIONS,
+    "returnvalues": INTERFACE_DEFINITION_FILES + RETURNVALUE_SOURCES,
+    "packetcontent": PACKET_CONTENT_SOURCES,
+    "subservices": SUBSERVICE_SOURCES,
+}
+# Generated headers which are copied into the watched source trees
+GENERATED_HEADERS = [
+    f"{OBJECTS_CPP_COPY_DESTINATION}translateObjects.h",
+    f"{EVENTS_CPP_COPY_DESTINATION}translateEvents.h",
+]
+
 
 def main():
     init_printout(project_string="FSFW")
     parser = return_generic_args_parser()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse all headers again instead of re-using the results of unchanged ones",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse the headers",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Stay resident and regenerate the affected outputs when a header changes",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        action="store_true",
+        help="Batch mode for CI runs, do not print the parsed tables to the console",
+    )
+    parser.add_argument(
+        "--log-file",
+        help="Write table dumps and stage timings as JSON lines into this file",
+    )
     args = parser.parse_args()
+    reporting.configure(batch_mode=args.batch, log_file=args.log_file)
+    # All parsers share one scanner, so every header is only listed and read once
+    scanner = SourceScanner()
+    cache = ParseCache(
+        cache_file=None if args.no_cache else f"{ROOT_DIR}/{PARSE_CACHE_NAME}",
+        jobs=args.jobs,
+    )
+    with reporting.stage("cache: load"):
+        cache.load()
     if args.type == "objects":
         LOGGER.info(f"Generating objects data..")
-        time.sleep(0.05)
-        parse_objects()
+        parse_objects(scanner=scanner, cache=cache)
     elif args.type == "events":
         LOGGER.info(f"Generating event data")
-        time.sleep(0.05)
-        parse_events()
+        parse_events(scanner=scanner, cache=cache)
     elif args.type == "returnvalues" or args.type == "retvals":
         LOGGER.info("Generating returnvalue data")
-        time.sleep(0.05)
-        parse_returnvalues()
+        parse_returnvalues(scanner=scanner, cache=cache)
     elif args.type == "all":
         LOGGER.info("Generating all data")
-        parse_objects()
-        parse_events()
-        # parse_returnvalues()
+        parse_objects(scanner=scanner, cache=cache)
+        parse_events(scanner=scanner, cache=cache)
+        parse_returnvalues(scanner=scanner, cache=cache)
+        parse_packet_content(scanner=scanner, cache=cache)
+        parse_subservices(scanner=scanner, cache=cache)
+    with reporting.stage("cache: save"):
+        cache.save()
+    reporting.report_stage_times()
+    if args.watch:
+        targets = ["returnvalues" if args.type == "retvals" else args.type]
+        if args.type == "all":
+            targets = list(WATCH_TARGETS.keys())
+        watch(targets, scanner, cache)
+
+
+def watch(targets: list, scanner: SourceScanner, cache: ParseCache):
+    """Regenerate the outputs of the given targets whenever one of their sources changes.
+    Only the targets containing a changed header are run again. Errors of a run are
+    reported and do not end the watch mode."""
+    watched_targets = {target: WATCH_TARGETS[target] for target in targets}
+    watcher = HeaderWatcher(
+        paths=[path for paths in watched_targets.values() for path in paths],
+        ignored_files=GENERATED_HEADERS,
+    )
+    LOGGER.info("Waiting for header changes, press CTRL-C to exit")
+    # Targets whose last run failed are run again with the next change, even if the
+    # change does not affect them
+    failed_targets = set()
+    try:
+        while True:
+            changed_files = watcher.wait_for_changes()
+            scanner.forget(changed_files)
+            rerun_targets = set(affected_targets(changed_files, watched_targets))
+            rerun_targets |= failed_targets
+            for target in watched_targets:
+                if target not in rerun_targets:
+                    continue
+                start_time = time.monotonic()
+                LOGGER.info(f"Regenerating {target} data")
+                # A header may be half written or replaced while it is parsed. The error
+                # is reported and the target is run again with the next change.
+                try:
+                    regenerate(target, scanner, cache)
+                except Exception as error:
+                    LOGGER.exception(f"Regenerating {target} data failed: {error}")
+                    failed_targets.add(target)
+                    continue
+                failed_targets.discard(target)
+                LOGGER.info(
+                    f"Regenerated {target} data in {time.monotonic() - start_time:.3f} s"
+                )
+            try:
+                cache.save()
+            except OSError as error:
+                LOGGER.error(f"Saving the parse cache failed: {error}")
+    except KeyboardInterrupt:
+        cache.save()
+
+
+def regenerate(target: str, scanner: SourceScanner, cache: ParseCache):
+    if target == "objects":
+        parse_objects(scanner=scanner, cache=cache)
+    elif target == "events":
+        parse_events(scanner=scanner, cache=cache)
+    elif target == "returnvalues":
+        parse_returnvalues(scanner=scanner, cache=cache)
+    elif target == "packetcontent":
+        parse_packet_content(scanner=scanner, cache=cache)
+    elif target == "subservices":
+        parse_subservices(scanner=scanner, cache=cache)
 
 
 if __name__ == "__main__":
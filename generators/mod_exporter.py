@@ -37,26 +37,25 @@ import pprint
 
 from utility.mib_csv_writer import CsvWriter
 from utility.mib_printer import Printer, PrettyPrinter
-from utility.mib_sql_writer import SqlWriter
+from utility.sql_exporter import SqlExporter
 from utility import mib_globals as g
+from definitions import DATABASE_NAME
 from parserbase.mib_file_list_parser import FileListParser
 from packetcontent.packet_content_parser import (
     PacketContentParser,
     PACKET_CONTENT_DEFINITION_DESTINATION,
     PACKET_CONTENT_CSV_NAME,
     PACKET_CONTENT_HEADER_COLUMN,
-    SQL_CREATE_PACKET_DATA_CONTENT_CMD,
-    SQL_INSERT_PACKET_DATA_CMD,
-    SQL_DELETE_PACKET_DATA_CONTENT_CMD,
+    PACKET_CONTENT_SQL_TABLE,
 )
 from subservice.subservice_parser import (
     SubserviceParser,
     SUBSERVICE_DEFINITION_DESTINATION,
     SUBSERVICE_CSV_NAME,
     SUBSERVICE_COLUMN_HEADER,
-    SQL_CREATE_SUBSVC_CMD,
-    SQL_DELETE_SUBSVC_CMD,
-    SQL_INSERT_INTO_SUBSVC_CMD,
+    SUBSERVICE_SQL_TABLE,
+    SUBSERVICE_TABLE_DEST,
+    write_subservice_table,
 )
 from devicecommands.device_command_parser import (
     DeviceHandlerInformationParser,
@@ -65,9 +64,7 @@ from devicecommands.device_command_parser import (
     DH_DEFINITION_DESTINATION,
     DH_COMMANDS_CSV_NAME,
     DH_COMMAND_HEADER_COLUMNS,
-    SQL_CREATE_CMDTABLE_CMD,
-    SQL_INSERT_INTO_CMDTABLE_CMD,
-    SQL_DELETE_CMDTABLE_CMD,
+    DH_COMMAND_SQL_TABLE,
 )
 from returnvalues.returnvalues_parser import (
     InterfaceParser,
@@ -137,12 +134,11 @@ def handle_subservices_generation():
         )
         print("MIB Exporter: Exporting to file: " + SUBSERVICE_CSV_NAME)
         subservice_writer.write_to_csv()
+        write_subservice_table(SUBSERVICE_TABLE_DEST, subservice_table)
     if EXPORT_TO_SQL:
         print("MIB Exporter: Exporting subservices to SQL")
-        sql_writer = SqlWriter()
-        sql_writer.delete(SQL_DELETE_SUBSVC_CMD)
-        sql_writer.sql_writing_helper(
-            SQL_CREATE_SUBSVC_CMD, SQL_INSERT_INTO_SUBSVC_CMD, subservice_table
+        SqlExporter(DATABASE_NAME).export(
+            SUBSERVICE_SQL_TABLE, subservice_table.values()
         )
 
 
@@ -178,13 +174,8 @@ def handle_packet_content_generation():
         packet_content_writer.write_to_csv()
     if EXPORT_TO_SQL:
         print("MIB Exporter: Exporting packet content to SQL")
-        sql_writer = SqlWriter()
-
-        sql_writer.sql_writing_helper(
-            SQL_CREATE_PACKET_DATA_CONTENT_CMD,
-            SQL_INSERT_PACKET_DATA_CMD,
-            packet_content_table,
-            SQL_DELETE_PACKET_DATA_CONTENT_CMD,
+        SqlExporter(DATABASE_NAME).export(
+            PACKET_CONTENT_SQL_TABLE, packet_content_table.values()
         )
 
 
@@ -222,12 +213,8 @@ def handle_device_handler_command_generation():
         device_command_writer.write_to_csv()
     if EXPORT_TO_SQL:
         print("MIB Exporter: Exporting device handler commands to SQL")
-        sql_writer = SqlWriter()
-        sql_writer.sql_writing_helper(
-            SQL_CREATE_CMDTABLE_CMD,
-            SQL_INSERT_INTO_CMDTABLE_CMD,
-            dh_command_table,
-            SQL_DELETE_CMDTABLE_CMD,
+        SqlExporter(DATABASE_NAME).export(
+            DH_COMMAND_SQL_TABLE, dh_command_table.values()
         )
 
 
@@ -277,7 +264,7 @@ def handle_returnvalue_generation():
         ReturnValueParser.export_to_file(CSV_RETVAL_FILENAME, returnvalue_table)
     if EXPORT_TO_SQL:
         print("MIB Exporter: Export returnvalues to SQL: ")
-        sql_retval_exporter(returnvalue_table)
+        sql_retval_exporter(returnvalue_table, DATABASE_NAME)
 
 
 def generate_returnvalue_table():
@@ -308,7 +295,7 @@ def handle_objects_generation():
         export_object_file(CSV_OBJECT_FILENAME, object_list_sorted)
     if EXPORT_TO_SQL:
         print("MIB Exporter: Exporting objects into SQL table")
-        sql_object_exporter(object_list_sorted)
+        sql_object_exporter(object_list_sorted, DATABASE_NAME)
 
 
 def handle_events_generation():
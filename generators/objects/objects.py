@@ -3,17 +3,15 @@ Object exporter.
 """
 import datetime
 import os
+from typing import Optional
 
 from fsfwgen.core import get_console_logger
 from fsfwgen.objects.objects import (
-    sql_object_exporter,
     ObjectDefinitionParser,
     write_translation_file,
     export_object_file,
     write_translation_header_file,
 )
-from fsfwgen.utility.printer import PrettyPrinter
-from fsfwgen.utility.file_management import copy_file
 
 from definitions import (
     BSP_HOSTED,
@@ -22,6 +20,16 @@ from definitions import (
     ROOT_DIR,
     EXAMPLE_COMMON_DIR,
 )
+from utility.cpp_translation import (
+    TRANSLATION_BACKEND_TABLE,
+    write_object_translation_table,
+)
+from utility.lookup_table import write_lookup_table
+from utility.output_stage import OutputStage
+from utility.parse_cache import ParseCache
+from utility.reporting import dump_table, stage
+from utility.source_scanner import SourceScanner
+from utility.sql_exporter import SqlExporter, SqlTable, hex_id
 
 LOGGER = get_console_logger()
 DATE_TODAY = datetime.datetime.now()
@@ -34,6 +42,11 @@ GENERATE_CPP = True
 COPY_CPP = True
 
 GENERATE_HEADER = True
+# Either "table" for a binary searched constexpr table with reverse lookup, or "switch" for
+# the switch statement generated by fsfwgen
+TRANSLATION_BACKEND = TRANSLATION_BACKEND_TABLE
+
+GENERATE_LOOKUP_TABLE = True
 
 FSFW_CONFIG_ROOT = f"{BSP_HOSTED}/fsfwconfig"
 
@@ -44,6 +57,9 @@ CPP_FILENAME = f"{os.path.dirname(os.path.realpath(__file__))}//translateObjects
 CPP_H_FILENAME = f"{os.path.dirname(os.path.realpath(__file__))}//translateObjects.h"
 CSV_OBJECT_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_objects.csv"
 CSV_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/objects.csv"
+LOOKUP_TABLE_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_objects.bin"
+LOOKUP_TABLE_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/objects.bin"
+LOOKUP_TABLE_FIELDS = ["name"]
 FILE_SEPARATOR = ";"
 
 
@@ -54,70 +70,101 @@ FRAMEWORK_OBJECT_PATH = (
 COMMON_OBJECTS_PATH = f"{EXAMPLE_COMMON_DIR}/config/commonObjects.h"
 OBJECTS_DEFINITIONS = [OBJECTS_PATH, FRAMEWORK_OBJECT_PATH, COMMON_OBJECTS_PATH]
 
-SQL_DELETE_OBJECTS_CMD = """
-    DROP TABLE IF EXISTS Objects
-    """
-
-SQL_CREATE_OBJECTS_CMD = """
-    CREATE TABLE IF NOT EXISTS Objects(
-    id              INTEGER PRIMARY KEY,
-    objectid        TEXT,
-    name            TEXT
-    )
-    """
-
-SQL_INSERT_INTO_OBJECTS_CMD = """
-INSERT INTO Objects(objectid, name)
-VALUES(?,?)
-"""
+OBJECTS_SQL_TABLE = SqlTable(
+    name="Objects",
+    columns=[("objectid", "TEXT"), ("objectidInt", "INTEGER"), ("name", "TEXT")],
+    key_columns=["objectidInt"],
+    indexes=[("name", ["name", "objectidInt"], False)],
+    version=3,
+)
 
 
-def parse_objects(print_object_list: bool = True):
+def parse_objects(
+    print_object_list: bool = True,
+    scanner: Optional[SourceScanner] = None,
+    cache: Optional[ParseCache] = None,
+):
     # fetch objects
-    object_parser = ObjectDefinitionParser(OBJECTS_DEFINITIONS)
-    subsystem_definitions = object_parser.parse_files()
+    if scanner is None:
+        scanner = SourceScanner()
+    if cache is None:
+        cache = ParseCache()
+    with stage("objects: parse"):
+        subsystem_definitions = cache.parse(
+            table_name="objects",
+            file_list=OBJECTS_DEFINITIONS,
+            parser_factory=ObjectDefinitionParser,
+            scanner=scanner,
+        )
     # id_subsystem_definitions.update(framework_subsystem_definitions)
     list_items = sorted(subsystem_definitions.items())
     LOGGER.info(f"ObjectParser: Number of objects: {len(list_items)}")
 
     if print_object_list:
-        PrettyPrinter.pprint(list_items)
+        dump_table("objects", list_items)
 
-    handle_file_export(list_items)
+    with stage("objects: export"):
+        handle_file_export(list_items)
     if EXPORT_TO_SQL:
         LOGGER.info("ObjectParser: Exporting to SQL")
-        sql_object_exporter(
-            object_table=list_items,
-            delete_cmd=SQL_DELETE_OBJECTS_CMD,
-            insert_cmd=SQL_INSERT_INTO_OBJECTS_CMD,
-            create_cmd=SQL_CREATE_OBJECTS_CMD,
-            db_filename=f"{ROOT_DIR}/{DATABASE_NAME}",
-        )
+        with stage("objects: SQL export"):
+            sql_object_exporter(
+                object_table=list_items, db_filename=f"{ROOT_DIR}/{DATABASE_NAME}"
+            )
 
 
 def handle_file_export(list_items):
-    if GENERATE_CPP:
-        LOGGER.info("ObjectParser: Generating C++ translation file")
-        write_translation_file(
-            filename=CPP_FILENAME,
-            list_of_entries=list_items,
-            date_string_full=DATE_STRING_FULL,
-        )
-        if COPY_CPP:
-            LOGGER.info("ObjectParser: Copying object file to " + CPP_COPY_DESTINATION)
-            copy_file(CPP_FILENAME, CPP_COPY_DESTINATION)
-    if GENERATE_HEADER:
-        write_translation_header_file(filename=CPP_H_FILENAME)
-        copy_file(filename=CPP_H_FILENAME, destination=CPP_COPY_DESTINATION)
-    if GENERATE_CSV:
-        LOGGER.info("ObjectParser: Generating text export")
-        export_object_file(
-            filename=CSV_OBJECT_FILENAME,
-            object_list=list_items,
-            file_separator=FILE_SEPARATOR,
-        )
-        copy_file(
-            filename=CSV_OBJECT_FILENAME,
-            destination=CSV_COPY_DEST,
-            delete_existing_file=True,
-        )
+    # Files are only written and copied if their content changed
+    with OutputStage() as output:
+        if GENERATE_CPP:
+            LOGGER.info("ObjectParser: Generating C++ translation file")
+            if COPY_CPP:
+                LOGGER.info(
+                    "ObjectParser: Copying object file to " + CPP_COPY_DESTINATION
+                )
+            if TRANSLATION_BACKEND == TRANSLATION_BACKEND_TABLE:
+                write_object_translation_table(
+                    file_name=output.path(
+                        CPP_FILENAME, CPP_COPY_DESTINATION if COPY_CPP else None
+                    ),
+                    header_file_name=output.path(CPP_H_FILENAME, CPP_COPY_DESTINATION)
+                    if GENERATE_HEADER
+                    else None,
+                    list_of_entries=list_items,
+                    date_string=DATE_STRING_FULL,
+                )
+            else:
+                write_translation_file(
+                    filename=output.path(
+                        CPP_FILENAME, CPP_COPY_DESTINATION if COPY_CPP else None
+                    ),
+                    list_of_entries=list_items,
+                    date_string_full=DATE_STRING_FULL,
+                )
+        if GENERATE_HEADER and TRANSLATION_BACKEND != TRANSLATION_BACKEND_TABLE:
+            write_translation_header_file(
+                filename=output.path(CPP_H_FILENAME, CPP_COPY_DESTINATION)
+            )
+        if GENERATE_CSV:
+            LOGGER.info("ObjectParser: Generating text export")
+            export_object_file(
+                filename=output.path(CSV_OBJECT_FILENAME, CSV_COPY_DEST),
+                object_list=list_items,
+                file_separator=FILE_SEPARATOR,
+            )
+        if GENERATE_LOOKUP_TABLE:
+            write_lookup_table(
+                file_name=output.path(LOOKUP_TABLE_FILENAME, LOOKUP_TABLE_COPY_DEST),
+                fields=LOOKUP_TABLE_FIELDS,
+                entries=[(int(entry[0], 16), entry[1][:1]) for entry in list_items],
+            )
+
+
+def sql_object_exporter(object_table: list, db_filename: str):
+    SqlExporter(db_filename).export(
+        OBJECTS_SQL_TABLE,
+        [
+            (hex_id(int(entry[0], 16), 8), int(entry[0], 16), entry[1][0])
+            for entry in object_table
+        ],
+    )
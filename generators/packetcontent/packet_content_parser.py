@@ -0,0 +1,386 @@
+#! /usr/bin/python3.8
+"""
+@file       packet_content_parser.py
+@brief      Parses the Service Packet Definition files for all variables
+@details    Used by the Mib Exporter and gen.py, inherits generic File Parser.
+            The size of every packet field is resolved when the field is matched, from a
+            datatype size table which is built once.
+"""
+import os
+import re
+from typing import Dict, Optional, Union
+
+from fsfwgen.core import get_console_logger
+from fsfwgen.parserbase.parser import FileParser
+
+from definitions import DATABASE_NAME, EXAMPLE_COMMON_DIR, OBSW_ROOT_DIR, ROOT_DIR
+from utility.line_source import LineSource
+from utility.output_stage import OutputStage
+from utility.parse_cache import ParseCache
+from utility.reporting import dump_table, stage
+from utility.source_scanner import SourceScanner
+from utility.sql_exporter import SqlExporter, SqlTable
+
+LOGGER = get_console_logger()
+
+GENERATE_CSV = True
+EXPORT_TO_SQL = True
+FILE_SEPARATOR = ";"
+
+# Relative destinations used by the MIB exporter
+PACKET_CONTENT_DEFINITION_DESTINATION = [
+    "../../mission/pus/servicepackets/",
+    "../../fsfw/pus/servicepackets/",
+]
+PACKET_CONTENT_SOURCES = [
+    f"{OBSW_ROOT_DIR}/fsfw/src/fsfw/pus/servicepackets/",
+    f"{EXAMPLE_COMMON_DIR}/pus/servicepackets/",
+]
+PACKET_CONTENT_CSV_NAME = "mib_packet_data_content.csv"
+CSV_FILENAME = f"{ROOT_DIR}/{PACKET_CONTENT_CSV_NAME}"
+PACKET_CONTENT_HEADER_COLUMN = [
+    "Service",
+    "Subservice",
+    "Packet Name",
+    "Datatype",
+    "Name",
+    "Size [Bytes]",
+    "Comment",
+]
+
+PACKET_CONTENT_SQL_TABLE = SqlTable(
+    name="PacketContent",
+    columns=[
+        ("service", "INTEGER"),
+        ("subsvc", "INTEGER"),
+        ("packetName", "TEXT"),
+        ("dataType", "TEXT"),
+        ("name", "TEXT"),
+        ("size", "INTEGER"),
+        ("comment", "TEXT"),
+    ],
+    key_columns=["service", "subsvc", "packetName", "name"],
+)
+
+# Datatypes of generic packet fields, and the sizes of datatypes which are not an unsigned
+# integer type
+FIELD_DATATYPES = (
+    r"uint32_t|uint8_t|uint16_t|ReturnValue_t|Mode_t|Submode_t|object_id_t|float|double|"
+    r"bool|ActionId_t|EventId_t|sid_t|ParameterId_t"
+)
+DATATYPE_SIZE_PATTERNS = [
+    (re.compile(r"double"), 8),
+    (re.compile(r"object_id_t|ActionId_t|Mode_t|float|sid_t|ParameterId_t"), 4),
+    (re.compile(r"ReturnValue_t|EventId_t"), 2),
+    (re.compile(r"Submode_t|bool"), 1),
+]
+UINT_PATTERN = re.compile(r"uint([\d]{1,2})_t")
+# One matcher for all field definitions. The alternatives are tried in order for the whole
+# line, so a generic field definition takes precedence over the adapters.
+VARIABLE_PATTERN = re.compile(
+    r"^(?:.*?(?P<generic>[\w]*(?:<)?[\s]*"
+    rf"(?P<generic_type>{FIELD_DATATYPES})"
+    r"(?:>)?[\s]*(?P<generic_name>[\w]*)[\s]*(?:[= 0-9]*)?[;]"
+    r"(?:[\/!< ]*(?P<generic_comment>[^\n]*))?)"
+    # Serial Fixed Array List with Size Header
+    r"|.*?(?P<array>[ \w]*<SerialFixedArrayListAdapter<(?P<array_type>[\w_, ()]*)>>"
+    r"[\s]*(?P<array_name>[\w]*)[\s]*[;](?:[/!< ]*(?P<array_comment>[^\n]*))?)"
+    # Serial Buffer, No length field
+    r"|.*?(?P<buffer>[ \w]*<SerialBufferAdapter<(?P<buffer_type>[\w_,]*)>>"
+    r"[\s]*(?P<buffer_name>[\w]*)[\s]*[;](?:[/!< ]*(?P<buffer_comment>[^\n]*))?)"
+    r"|.*?(?P<pointer>[\w ]*(?:<)?(?P<pointer_type>uint32_t|uint8_t|uint16_t)[\s]*\*"
+    r"(?:>)?[\s]*(?P<pointer_name>[\w]*)[\s]*[;](?:[/!< ]*(?P<pointer_comment>[^\n]*))?))"
+)
+CLASS_PATTERN = re.compile(r"[\s]*class[\s]*([\w]*)[\s]*.*[\s]*{[\s]*([^\n]*)")
+STRUCT_PATTERN = re.compile(r"[\s]*struct[\s]*([\w]*)[\s]*.*[\s]*{[\s]*([^\n]*)")
+FIXED_ARRAY_PATTERN = re.compile(
+    r"([\w_]*)[\s]*,[\s]*([\w_()]*)[\s]*,[\s]*([\w_()]*)[\s]*"
+)
+EXPORTER_PATTERN = re.compile(r"[ /!<]*\[EXPORT[\w]*\][\s]*:[\s]*([^\n]*)")
+EXPORTER_TYPE_PATTERN = re.compile(
+    r"\[(?:BUFFER)?TYPE\][\s]*([\w]*)[^\n|\[]*", re.IGNORECASE
+)
+EXPORTER_COMMENT_PATTERN = re.compile(
+    r"\[COMMENT\][\s]*([\w]*)[^\n|\[]*", re.IGNORECASE
+)
+SUBSERVICE_STRING_PATTERN = re.compile(
+    r"^.*//[\s]*[!<]*[\s]*\[EXPORT[\w]*\][\s]*:[\s]*\[SUBSERVICE\][\s]*([^\n]*)",
+    re.IGNORECASE,
+)
+SERVICE_NUMBER_PATTERN = re.compile(r"[0-9]{1,3}")
+
+
+def _resolve_datatype_size(datatype: str) -> Union[int, str]:
+    if "*" in datatype:
+        return "deduced"
+    uint_match = UINT_PATTERN.search(datatype)
+    if uint_match:
+        return round(int(uint_match.group(1)) / 8)
+    for pattern, size in DATATYPE_SIZE_PATTERNS:
+        if pattern.search(datatype):
+            return size
+    return ""
+
+
+# Sizes of all datatypes the matcher knows. Other datatypes, which are set with the [TYPE]
+# exporter command, are resolved once and added.
+DATATYPE_SIZES: Dict[str, Union[int, str]] = {
+    datatype: _resolve_datatype_size(datatype)
+    for datatype in FIELD_DATATYPES.split("|") + ["uint64_t"]
+}
+
+
+def datatype_size(datatype: str) -> Union[int, str]:
+    """Return the size of a datatype in bytes, deduced for buffers or an empty string if
+    the size is unknown."""
+    size = DATATYPE_SIZES.get(datatype)
+    if size is None:
+        size = _resolve_datatype_size(datatype)
+        DATATYPE_SIZES[datatype] = size
+    return size
+
+
+def main():
+    parse_packet_content()
+
+
+def parse_packet_content(
+    print_table: bool = True,
+    scanner: Optional[SourceScanner] = None,
+    cache: Optional[ParseCache] = None,
+):
+    with stage("packet content: parse"):
+        packet_content_table = generate_packet_content_table(scanner, cache)
+    LOGGER.info(
+        f"PacketContentParser: Found {len(packet_content_table)} packet content entries"
+    )
+    if print_table:
+        dump_table("packet content", packet_content_table)
+    if GENERATE_CSV:
+        with stage("packet content: export"):
+            # The file is only written if its content changed
+            with OutputStage() as output:
+                export_packet_content_csv(
+                    output.path(CSV_FILENAME), packet_content_table
+                )
+    if EXPORT_TO_SQL:
+        LOGGER.info("PacketContentParser: Exporting to SQL")
+        with stage("packet content: SQL export"):
+            SqlExporter(f"{ROOT_DIR}/{DATABASE_NAME}").export(
+                PACKET_CONTENT_SQL_TABLE, packet_content_table.values()
+            )
+
+
+def generate_packet_content_table(
+    scanner: Optional[SourceScanner] = None, cache: Optional[ParseCache] = None
+) -> dict:
+    if scanner is None:
+        scanner = SourceScanner()
+    if cache is None:
+        cache = ParseCache()
+    destinations = []
+    for destination in PACKET_CONTENT_SOURCES:
+        if os.path.isdir(destination):
+            destinations.append(destination)
+        else:
+            LOGGER.warning(f"PacketContentParser: {destination} does not exist")
+    header_list = scanner.header_files(destinations)
+    LOGGER.info(f"Parsing packet data files: {len(header_list)} header files")
+    # The rows are numbered across all files, so the files are parsed together
+    return cache.parse(
+        table_name="packet_content",
+        file_list=header_list,
+        parser_factory=PacketContentParser,
+        scanner=scanner,
+        split_files=False,
+    )
+
+
+def export_packet_content_csv(file_name: str, packet_content_table: dict):
+    with open(file_name, "w") as out:
+        out.write(FILE_SEPARATOR.join(PACKET_CONTENT_HEADER_COLUMN) + "\n")
+        for entry in packet_content_table.values():
+            out.write(FILE_SEPARATOR.join(str(value) for value in entry) + "\n")
+
+
+# noinspection PyTypeChecker
+class PacketContentParser(FileParser):
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
+    # Initialize all needed columns
+    def __init__(self, file_list):
+        super().__init__(file_list)
+        self.serviceColumn = 0
+        self.subserviceColumn = 1
+        self.classNameColumn = 2
+        self.datatypeColumn = 3
+        self.nameColumn = 4
+        self.sizeColumn = 5
+        self.commentColumn = 6
+        self.lastEntryColumn = 7
+        self.columnListLength = 8
+        self.dictEntryList = list(range(self.columnListLength - 1))
+
+        self.ignoreFlag = False
+
+    def _handle_file_parsing(self, file_name: str, *args: any):
+        self_print_parsing_info = False
+        if len(args) == 1 and isinstance(args[0], bool):
+            self_print_parsing_info = args[0]
+
+        # Read service from file name
+        service_match = SERVICE_NUMBER_PATTERN.search(file_name)
+        self.dictEntryList[self.serviceColumn] = (
+            service_match.group(0) if service_match else " "
+        )
+        self.dictEntryList[self.subserviceColumn] = " "
+        if self_print_parsing_info:
+            print("Parsing " + file_name + " ...")
+        # Scans each line for possible variables
+        with self._line_source(file_name) as lines:
+            for line in lines:
+                # Looks for class and struct definitions which mark a PUS packet
+                self.scan_for_class_and_struct_match_and_handle_it(line)
+                # Looks for variables
+                self.scan_for_variable_match_and_handle_it(line)
+
+    # The packet content sizes are resolved when a variable is matched
+    def _post_parsing_operation(self):
+        pass
+
+    def scan_for_class_and_struct_match_and_handle_it(self, line):
+        if "{" not in line:
+            return
+        class_or_struct_match = CLASS_PATTERN.search(line)
+        if not class_or_struct_match:
+            class_or_struct_match = STRUCT_PATTERN.search(line)
+        if class_or_struct_match:
+            self.dictEntryList[self.classNameColumn] = class_or_struct_match.group(1)
+            if class_or_struct_match.group(2):
+                self.dictEntryList[
+                    self.subserviceColumn
+                ] = self.check_for_subservice_string(class_or_struct_match.group(2))
+
+    def scan_for_variable_match_and_handle_it(self, line):
+        # Look for datatype definitions
+        if self.packet_content_matcher(line):
+            # Attempts to find variable definition inside that packet
+            self.update_packet_content_table()
+
+    def packet_content_matcher(self, line) -> bool:
+        # All variable definitions end with a semicolon
+        if ";" not in line:
+            return False
+        var_match = VARIABLE_PATTERN.match(line)
+        if var_match is None:
+            return False
+        kind = var_match.lastgroup
+        datatype = var_match.group(f"{kind}_type")
+        name = var_match.group(f"{kind}_name")
+        comment = var_match.group(f"{kind}_comment")
+        if kind == "generic":
+            self.handle_generic_variable_match(datatype, name, comment)
+        elif kind == "array":
+            self.handle_serial_fixed_array_match(
+                datatype, name, comment, var_match.group(kind)
+            )
+        else:
+            self.handle_serial_buffer_match(datatype, name, comment)
+        # exclude size definition in serialize adapter or any definitions which are not
+        # parameter initializations or typedefs
+        return "typedef" not in var_match.group(kind)
+
+    def update_packet_content_table(self):
+        self.index = self.index + 1
+        if not self.ignoreFlag:
+            self.__add_entry()
+        else:
+            self.ignoreFlag = False
+
+    def __add_entry(self):
+        self.dictEntryList[self.sizeColumn] = datatype_size(
+            self.dictEntryList[self.datatypeColumn]
+        )
+        dict_entry_tuple = tuple(self.dictEntryList[: self.columnListLength])
+        self.mib_table.update({self.index: dict_entry_tuple})
+
+    def handle_generic_variable_match(self, datatype, name, comment):
+        self.handle_var_match(datatype, name)
+        self.handle_exporter_string(comment)
+
+    def handle_serial_fixed_array_match(self, datatype, name, comment, definition):
+        if self.check_for_ignore_string(definition):
+            return
+        fixed_array_properties = FIXED_ARRAY_PATTERN.search(datatype)
+        if fixed_array_properties:
+            type_of_next_buffer_size = fixed_array_properties.group(3)
+            self.index = self.index + 1
+            self.dictEntryList[self.datatypeColumn] = type_of_next_buffer_size
+            self.dictEntryList[self.nameColumn] = "Size of following buffer"
+            self.__add_entry()
+            self.handle_var_match(datatype, name)
+            self.dictEntryList[self.datatypeColumn] = (
+                fixed_array_properties.group(1) + " *"
+            )
+            self.handle_exporter_string(comment)
+
+    def handle_serial_buffer_match(self, datatype, name, comment):
+        self.handle_var_match(datatype, name)
+        self.dictEntryList[self.datatypeColumn] = datatype + " *"
+        self.handle_exporter_string(comment)
+
+    def handle_var_match(self, datatype, name):
+        self.dictEntryList[self.commentColumn] = ""
+        self.dictEntryList[self.sizeColumn] = ""
+        self.dictEntryList[self.datatypeColumn] = datatype
+        self.dictEntryList[self.nameColumn] = name
+
+    # Used to scan exporter string for ignore flag or store any comments
+    def handle_exporter_string(self, match):
+        exporter_string = EXPORTER_PATTERN.search(match)
+        if exporter_string:
+            type_string = EXPORTER_TYPE_PATTERN.search(exporter_string.group(0))
+            if type_string:
+                self.dictEntryList[self.datatypeColumn] = (
+                    str(type_string.group(1)) + " *"
+                )
+            comment_string = EXPORTER_COMMENT_PATTERN.search(exporter_string.group(0))
+            if comment_string:
+                self.dictEntryList[self.commentColumn] = comment_string.group(1)
+            self.check_for_ignore_string(exporter_string.group(0))
+            if not comment_string:
+                self.dictEntryList[self.commentColumn] = exporter_string.group(1)
+
+    # Used to transform comma separated subservice numbers into specific subservice numbers
+    def check_for_subservice_string(self, full_description):
+        subservice_info = SUBSERVICE_STRING_PATTERN.search(full_description)
+        description = " "
+        if subservice_info:
+            description = self.handle_subservice_string(subservice_info)
+        if full_description == "":
+            description = " "
+        return description
+
+    def check_for_ignore_string(self, string):
+        if "ignore" in string.lower():
+            self.ignoreFlag = True
+            return True
+        return False
+
+    @staticmethod
+    def handle_subservice_string(subservice_info):
+        description = " "
+        subservice_list = [int(x) for x in subservice_info.group(1).split(",")]
+        subservice_number = len(subservice_list)
+        for i in range(subservice_number):
+            description = description + str(subservice_list[i])
+            if i == subservice_number - 2:
+                description = description + " and "
+            elif i < subservice_number - 1:
+                description = description + ", "
+        return description
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 #! /usr/bin/env python3
 # -*- coding: utf-8 -*-
 """Part of the MIB export tools for the FSFW project by
+
+Example declarations to scan for:
+
+static constexpr uint8_t INTERFACE_ID = CLASS_ID::HAS_ACTIONS_IF;
+//! [EXPORT] : [COMMENT] The action ID is invalid
+static constexpr ReturnValue_t INVALID_ACTION_ID = MAKE_RETURN_CODE(1);
+static constexpr ReturnValue_t INVALID_PARAMETERS = returnvalue::makeCode(INTERFACE_ID, 2);
 """
+import os
+import re
+from functools import partial
+from typing import Dict, List, Optional
+
 from fsfwgen.core import get_console_logger
-from fsfwgen.utility.file_management import copy_file
-from fsfwgen.parserbase.file_list_parser import FileListParser
-from fsfwgen.returnvalues.returnvalues_parser import InterfaceParser, ReturnValueParser
-from fsfwgen.utility.sql_writer import SqlWriter
-from fsfwgen.utility.printer import PrettyPrinter
+from fsfwgen.parserbase.parser import FileParser
+from fsfwgen.returnvalues.returnvalues_parser import (
+    InterfaceParser,
+    ReturnValueParser as FsfwReturnValueParser,
+)
 
 from definitions import (
     BSP_HOSTED,
@@ -16,6 +28,14 @@ from definitions import (
     OBSW_ROOT_DIR,
     EXAMPLE_COMMON_DIR,
 )
+from utility.cpp_tokenizer import DECL_STATIC_CONST, export_comment, scan_declarations
+from utility.line_source import LineSource
+from utility.lookup_table import write_lookup_table
+from utility.output_stage import OutputStage
+from utility.parse_cache import ParseCache
+from utility.reporting import dump_table, stage
+from utility.source_scanner import SourceScanner
+from utility.sql_exporter import SqlExporter, SqlTable, hex_id
 
 LOGGER = get_console_logger()
 EXPORT_TO_FILE = True
@@ -26,9 +46,15 @@ PRINT_TABLES = True
 
 FILE_SEPARATOR = ";"
 MAX_STRING_LENGTH = 32
+# Names are only truncated beyond the limit of the fsfwgen parser, the exported names of the
+# checked-in tables are longer than MAX_STRING_LENGTH
+MAX_NAME_LENGTH = 80
 
 CSV_RETVAL_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_returnvalues.csv"
 CSV_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/returnvalues.csv"
+LOOKUP_TABLE_FILENAME = f"{ROOT_DIR}/{BSP_HOSTED}_returnvalues.bin"
+LOOKUP_TABLE_COPY_DEST = f"{OBSW_ROOT_DIR}/tmtc/config/returnvalues.bin"
+LOOKUP_TABLE_FIELDS = ["name", "description", "unique_id", "file", "interface"]
 ADD_LINUX_FOLDER = False
 FSFW_CONFIG_ROOT = f"{BSP_HOSTED}/fsfwconfig"
 
@@ -43,69 +69,246 @@ RETURNVALUE_SOURCES = [
     f"{EXAMPLE_COMMON_DIR}/",
 ]
 
-SQL_DELETE_RETURNVALUES_CMD = """
-    DROP TABLE IF EXISTS Returnvalues
-"""
-
-SQL_CREATE_RETURNVALUES_CMD = """
-    CREATE TABLE IF NOT EXISTS Returnvalues (
-    id              INTEGER PRIMARY KEY,
-    code            TEXT,
-    name            TEXT,
-    interface       TEXT,
-    file            TEXT,
-    description     TEXT
-    )
-"""
+# Initializers of returnvalue definitions, with the macro or with one of the code functions
+RETURNVALUE_PATTERN = re.compile(
+    r"(?:MAKE_RETURN_CODE|(?:\w+::)*make(?:Return)?Code)\("
+    r"(?:(?P<interface>[\w:]+),\s*)?(?P<number>\w+)\)"
+)
+CLASS_ID_PATTERN = re.compile(r"^CLASS_ID::(\w+)$")
+# System-wide returnvalues of HasReturnvaluesIF.h, which are not defined with an interface ID
+BUILTIN_RETURNVALUES = {
+    0x0: (
+        "OK",
+        "System-wide code for ok.",
+        "RETURN_OK",
+        "HasReturnvaluesIF.h",
+        "HasReturnvaluesIF",
+    ),
+    0x1: (
+        "Failed",
+        "Unspecified system-wide code for failed.",
+        "RETURN_FAILED",
+        "HasReturnvaluesIF.h",
+        "HasReturnvaluesIF",
+    ),
+}
+# Files which contain none of these strings can not define returnvalues
+RETURNVALUE_MARKERS = ("ReturnValue_t",)
 
-SQL_INSERT_RETURNVALUES_CMD = """
-INSERT INTO Returnvalues(code,name,interface,file,description)
-VALUES(?,?,?,?,?)
-"""
+RETURNVALUES_SQL_TABLE = SqlTable(
+    name="Returnvalues",
+    columns=[
+        ("code", "TEXT"),
+        ("codeInt", "INTEGER"),
+        ("name", "TEXT"),
+        ("interface", "TEXT"),
+        ("file", "TEXT"),
+        ("description", "TEXT"),
+    ],
+    key_columns=["codeInt"],
+    indexes=[("name", ["name", "codeInt"], False)],
+    version=3,
+)
 
 
-def parse_returnvalues():
-    returnvalue_table = generate_returnvalue_table()
+def parse_returnvalues(
+    scanner: Optional[SourceScanner] = None, cache: Optional[ParseCache] = None
+):
+    with stage("returnvalues: parse"):
+        returnvalue_table = generate_returnvalue_table(scanner, cache)
     if EXPORT_TO_FILE:
-        ReturnValueParser.export_to_file(
-            CSV_RETVAL_FILENAME, returnvalue_table, FILE_SEPARATOR
-        )
-        if COPY_CSV_FILE:
-            copy_file(
-                filename=CSV_RETVAL_FILENAME,
-                destination=CSV_COPY_DEST,
-                delete_existing_file=True,
-            )
+        with stage("returnvalues: export"):
+            # The file is only written and copied if its content changed
+            with OutputStage() as output:
+                FsfwReturnValueParser.export_to_file(
+                    output.path(
+                        CSV_RETVAL_FILENAME, CSV_COPY_DEST if COPY_CSV_FILE else None
+                    ),
+                    returnvalue_table,
+                    FILE_SEPARATOR,
+                )
+                write_lookup_table(
+                    file_name=output.path(
+                        LOOKUP_TABLE_FILENAME,
+                        LOOKUP_TABLE_COPY_DEST if COPY_CSV_FILE else None,
+                    ),
+                    fields=LOOKUP_TABLE_FIELDS,
+                    entries=[
+                        (_code_as_int(code), entry)
+                        for code, entry in returnvalue_table.items()
+                    ],
+                )
     if EXPORT_TO_SQL:
         LOGGER.info("ReturnvalueParser: Exporting to SQL")
-        sql_retval_exporter(
-            returnvalue_table, db_filename=f"{ROOT_DIR}/{DATABASE_NAME}"
-        )
+        with stage("returnvalues: SQL export"):
+            sql_retval_exporter(
+                returnvalue_table, db_filename=f"{ROOT_DIR}/{DATABASE_NAME}"
+            )
 
 
-def generate_returnvalue_table():
+def generate_returnvalue_table(
+    scanner: Optional[SourceScanner] = None, cache: Optional[ParseCache] = None
+):
     """Core function to parse for the return values"""
-    interface_parser = InterfaceParser(
-        file_list=INTERFACE_DEFINITION_FILES, print_table=PRINT_TABLES
+    if scanner is None:
+        scanner = SourceScanner()
+    if cache is None:
+        cache = ParseCache()
+    # The tables are printed here after merging instead of by the parsers themselves, which
+    # only see a part of the files.
+    # The class IDs are enumerated across all interface files, so they are parsed together
+    interfaces = cache.parse(
+        table_name="interfaces",
+        file_list=INTERFACE_DEFINITION_FILES,
+        parser_factory=partial(InterfaceParser, print_table=False),
+        scanner=scanner,
+        split_files=False,
+    )
+    if PRINT_TABLES:
+        dump_table("interfaces", interfaces)
+    header_list = scanner.header_files(RETURNVALUE_SOURCES)
+    LOGGER.info(f"Parsing header file list: {len(header_list)} header files")
+    returnvalue_table = cache.parse(
+        table_name="returnvalues",
+        file_list=header_list,
+        parser_factory=partial(create_returnvalue_parser, interfaces),
+        scanner=scanner,
+        context=interfaces,
+        parse_args=(True,),
     )
-    interfaces = interface_parser.parse_files()
-    header_parser = FileListParser(RETURNVALUE_SOURCES)
-    header_list = header_parser.parse_header_files(True, "Parsing header file list: ")
-    returnvalue_parser = ReturnValueParser(interfaces, header_list, PRINT_TABLES)
-    returnvalue_parser.obsw_root_path = OBSW_ROOT_DIR
-    returnvalue_parser.set_moving_window_mode(moving_window_size=7)
-    returnvalue_table = returnvalue_parser.parse_files(True)
     LOGGER.info(f"ReturnvalueParser: Found {len(returnvalue_table)} returnvalues")
+    if PRINT_TABLES:
+        dump_table("returnvalues", returnvalue_table)
     return returnvalue_table
 
 
+class ReturnValueParser(FileParser):
+    """Parses the returnvalue definitions of headers from the declarations of the C++
+    tokenizer. The entries are keyed by the full returnvalue code and contain the checked
+    name, the description, the unique ID, the file and the interface of the returnvalue,
+    like the entries of the fsfwgen returnvalue parser. The description is taken from an
+    [EXPORT] : [COMMENT] command in the comments of the definition. Like the fsfwgen
+    parser, the table always contains the system-wide OK and Failed returnvalues.
+
+    The only positional argument of parse_files enables warnings for truncated names.
+    """
+
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
+    def __init__(self, interfaces: dict, file_list: List[str]):
+        super().__init__(file_list)
+        self.interfaces = interfaces
+        self.obsw_root_path: Optional[str] = None
+        self.mib_table.update(BUILTIN_RETURNVALUES)
+
+    def _handle_file_parsing(self, file_name: str, *args: any, **kwargs):
+        print_truncated_entries = len(args) == 1 and args[0] is True
+        with self._line_source(file_name, RETURNVALUE_MARKERS) as lines:
+            declarations = scan_declarations(lines)
+        # Interface ID constants of this file, and the last one, which is used by the
+        # MAKE_RETURN_CODE macro
+        interface_ids: Dict[str, str] = dict()
+        current_interface: Optional[str] = None
+        for declaration in declarations:
+            if declaration.kind != DECL_STATIC_CONST:
+                continue
+            class_id_match = CLASS_ID_PATTERN.match(declaration.value)
+            if class_id_match:
+                current_interface = class_id_match.group(1)
+                interface_ids[declaration.name] = current_interface
+                continue
+            if declaration.type_name.split("::")[-1] != "ReturnValue_t":
+                continue
+            returnvalue_match = RETURNVALUE_PATTERN.search(declaration.value)
+            if not returnvalue_match:
+                continue
+            interface = returnvalue_match.group("interface")
+            if interface is None:
+                interface = current_interface
+            else:
+                class_id_match = CLASS_ID_PATTERN.match(interface)
+                if class_id_match:
+                    interface = class_id_match.group(1)
+                else:
+                    interface = interface_ids.get(interface, current_interface)
+            interface_entry = self.interfaces.get(interface)
+            unique_id = returnvalue_match.group("number")
+            try:
+                number = int(unique_id, 0)
+            except ValueError:
+                number = None
+            if interface_entry is None or number is None:
+                LOGGER.warning(
+                    f"ReturnvalueParser: Could not resolve the code of returnvalue "
+                    f"{declaration.name} in {file_name}"
+                )
+                continue
+            full_id = (int(str(interface_entry[0]), 0) << 8) + number
+            self.mib_table.update(
+                {
+                    full_id: (
+                        checked_name(
+                            interface_entry[1],
+                            declaration.name,
+                            print_truncated_entries,
+                        ),
+                        export_comment(declaration.doc)
+                        or export_comment(declaration.trailing_doc),
+                        unique_id,
+                        self.__relative_file_name(file_name),
+                        interface,
+                    )
+                }
+            )
+
+    def __relative_file_name(self, file_name: str) -> str:
+        if self.obsw_root_path is None:
+            return file_name
+        return os.path.relpath(file_name, self.obsw_root_path)
+
+    def _post_parsing_operation(self):
+        pass
+
+
+def checked_name(interface_name: str, name: str, print_truncated_entries: bool) -> str:
+    """Return the interface name and the name in capital case, truncated to the maximum
+    name length. The interface name is used as it is in the interface table, including
+    leading whitespace."""
+    full_name = interface_name + "_" + "".join(word.title() for word in name.split("_"))
+    if len(full_name) > MAX_NAME_LENGTH:
+        if print_truncated_entries:
+            LOGGER.warning(f"Entry {full_name} too long. Will truncate.")
+        full_name = full_name[:MAX_NAME_LENGTH]
+    return full_name
+
+
+def create_returnvalue_parser(
+    interfaces: dict, header_list: List[str]
+) -> ReturnValueParser:
+    returnvalue_parser = ReturnValueParser(interfaces, header_list)
+    returnvalue_parser.obsw_root_path = OBSW_ROOT_DIR
+    return returnvalue_parser
+
+
 def sql_retval_exporter(returnvalue_table, db_filename: str):
-    sql_writer = SqlWriter(db_filename=db_filename)
-    sql_writer.open(SQL_CREATE_RETURNVALUES_CMD)
-    for entry in returnvalue_table.items():
-        sql_writer.write_entries(
-            SQL_INSERT_RETURNVALUES_CMD,
-            (entry[0], entry[1][2], entry[1][4], entry[1][3], entry[1][1]),
-        )
-    sql_writer.commit()
-    sql_writer.close()
+    SqlExporter(db_filename).export(
+        RETURNVALUES_SQL_TABLE,
+        [
+            (
+                hex_id(_code_as_int(entry[0]), 4),
+                _code_as_int(entry[0]),
+                entry[1][0],
+                entry[1][4],
+                entry[1][3],
+                entry[1][1],
+            )
+            for entry in returnvalue_table.items()
+        ],
+    )
+
+
+def _code_as_int(code) -> int:
+    if isinstance(code, str):
+        return int(code, 16)
+    return int(code)
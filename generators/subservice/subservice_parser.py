@@ -18,16 +18,44 @@ enum Subservice: uint8_t {
 };
 
 """
+import os
 import re
 from enum import Enum
+from pathlib import Path
+from typing import Optional
 
+from fsfwgen.core import get_console_logger
 from fsfwgen.parserbase.file_list_parser import FileListParser
 from fsfwgen.parserbase.parser import FileParser
 from fsfwgen.utility.csv_writer import CsvWriter
 from fsfwgen.utility.printer import Printer
 
+from utility.cpp_tokenizer import (
+    DECL_ENUM,
+    DECL_ENUMERATOR,
+    Declaration,
+    scan_declarations,
+)
+from definitions import EXAMPLE_COMMON_DIR, OBSW_ROOT_DIR
+from utility.line_source import LineSource
+from utility.output_stage import OutputStage
+from utility.parse_cache import ParseCache
+from utility.reporting import dump_table, stage
+from utility.source_scanner import SourceScanner
+from utility.sql_exporter import SqlTable
+
+LOGGER = get_console_logger()
+
 SUBSERVICE_DEFINITION_DESTINATION = ["../../mission/", "../../fsfw/pus/"]
+SUBSERVICE_SOURCES = [
+    f"{OBSW_ROOT_DIR}/fsfw/src/fsfw/pus/",
+    f"{EXAMPLE_COMMON_DIR}/pus/",
+]
 SUBSERVICE_CSV_NAME = "mib_subservices.csv"
+# Table of the subservice numbers used by the TM dispatcher of the TMTC client
+SUBSERVICE_TABLE_DEST = (
+    Path(__file__).resolve().parents[2] / "tmtc" / "config" / "subservices.csv"
+)
 SUBSERVICE_COLUMN_HEADER = [
     "Service",
     "Subservice Name",
@@ -36,25 +64,26 @@ SUBSERVICE_COLUMN_HEADER = [
     "Comment",
 ]
 
-SQL_DELETE_SUBSVC_CMD = """
-    DROP TABLE IF EXISTS Subservice;
-    """
-
-SQL_CREATE_SUBSVC_CMD = """
-    CREATE TABLE IF NOT EXISTS Subservice(
-    id              INTEGER PRIMARY KEY,
-    service         INTEGER,
-    subsvcName      TEXT,
-    subsvcNumber    INTEGER,
-    type            TEXT CHECK( type IN ('TC','TM')),
-    comment         TEXT
-    )
-    """
-
-SQL_INSERT_INTO_SUBSVC_CMD = """
-INSERT INTO Subservice(service,subsvcName,subsvcNumber,type,comment)
-VALUES(?,?,?,?,?)
-"""
+SUBSERVICE_SQL_TABLE = SqlTable(
+    name="Subservice",
+    columns=[
+        ("service", "INTEGER"),
+        ("subsvcName", "TEXT"),
+        ("subsvcNumber", "INTEGER"),
+        ("type", "TEXT CHECK( type IN ('TC','TM'))"),
+        ("comment", "TEXT"),
+    ],
+    key_columns=["service", "subsvcName"],
+)
+
+# The patterns are compiled once, the parser runs them on the comments of every enumerator
+SERVICE_PATTERN = re.compile(r"Service[^0-9]*([0-9]{1,3})")
+SUBSERVICE_ENUM_PATTERN = re.compile(r"Subservice", re.IGNORECASE)
+EXPORT_PATTERN = re.compile(r"\[export\]", re.IGNORECASE)
+TYPE_PATTERN = re.compile(r"\[(?:(?P<tm>reply|tm)|(?P<tc>command|tc))\]", re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r":[\s]*\[[\w]*\][\s]*([^\n]*)")
+# Files which contain none of these strings (case insensitive) can not define subservices
+SUBSERVICE_MARKERS = ("subservice",)
 
 
 class SubserviceColumns(Enum):
@@ -90,31 +119,86 @@ def main():
     )
     subservice_writer.write_to_csv()
     subservice_writer.move_csv("..")
+    write_subservice_table(SUBSERVICE_TABLE_DEST, subservice_table)
+
+
+def parse_subservices(
+    print_table: bool = True,
+    scanner: Optional[SourceScanner] = None,
+    cache: Optional[ParseCache] = None,
+):
+    """Generate the subservice table loaded by the TM dispatcher of the TMTC client."""
+    with stage("subservices: parse"):
+        subservice_table = generate_subservice_table(scanner, cache)
+    LOGGER.info(f"SubserviceParser: Found {len(subservice_table)} subservice entries")
+    if print_table:
+        dump_table("subservices", subservice_table)
+    with stage("subservices: export"):
+        # The file is only written if its content changed
+        with OutputStage() as output:
+            write_subservice_table(
+                output.path(str(SUBSERVICE_TABLE_DEST)), subservice_table
+            )
+
+
+def generate_subservice_table(
+    scanner: Optional[SourceScanner] = None, cache: Optional[ParseCache] = None
+) -> dict:
+    if scanner is None:
+        scanner = SourceScanner()
+    if cache is None:
+        cache = ParseCache()
+    destinations = []
+    for destination in SUBSERVICE_SOURCES:
+        if os.path.isdir(destination):
+            destinations.append(destination)
+        else:
+            LOGGER.warning(f"SubserviceParser: {destination} does not exist")
+    header_list = scanner.header_files(destinations)
+    LOGGER.info(f"Parsing subservice files: {len(header_list)} header files")
+    # The service is taken over from the previous file and the rows are numbered across
+    # all files, so the files are parsed together
+    return cache.parse(
+        table_name="subservices",
+        file_list=header_list,
+        parser_factory=SubserviceParser,
+        scanner=scanner,
+        split_files=False,
+    )
+
+
+def write_subservice_table(file_name, subservice_table: dict):
+    """Write the service, subservice number, name and type of all subservices, sorted by
+    service and subservice."""
+    rows = sorted(
+        (int(entry[Clmns.SERVICE.value]), int(entry[Clmns.NUMBER.value]), entry)
+        for entry in subservice_table.values()
+        if str(entry[Clmns.SERVICE.value]).isdigit()
+        and str(entry[Clmns.NUMBER.value]).isdigit()
+    )
+    with open(file_name, "w") as out:
+        for service, number, entry in rows:
+            out.write(
+                f"{service};{number};{entry[Clmns.NAME.value]};"
+                f"{entry[Clmns.TYPE.value]}\n"
+            )
 
 
-# TODO: Not really happy with the multi-line implementation, but this is not trivial..
-#       Right not, we are not using the last lines stored, we just store the string
-#       of the last line (if its only a comment). It propably would be better to always
-#       scan 3 or 4 lines at once. However, this is not easy too..
 # pylint: disable=too-few-public-methods
 class SubserviceParser(FileParser):
     """
-    This parser class can parse the subservice definitions.
+    This parser class can parse the subservice definitions. The enumerators of all enums
+    whose name starts with Subservice are exported if their leading comment or their
+    comment on the same line contains an export command. Comments may span several lines.
     """
 
+    # Opens the line source of a file, replaced when a source scanner is attached
+    _line_source = LineSource
+
     def __init__(self, file_list: list):
         super().__init__(file_list)
-        # Column System allows reshuffling of table columns in constructor
-        self.clmns_len = SubserviceColumns.__len__()
-        # this table includes the current new table entry,
-        # which will be updated for target parameter
-        self.dict_entry_list = list(range(self.clmns_len))
-        self.dict_entry_list[Clmns.COMMENT.value] = ""
-        self.subservice_enum_found = False
-        # This list will store the last three lines for longer comments.
-        self.last_line_list = ["", "", ""]
-        # If an export command was found, cache the possibility of a match.
-        self.possible_match_on_next_lines = False
+        # Service of the last file whose name contains a service number
+        self.service = 0
 
     # This is called for every file
     def _handle_file_parsing(self, file_name: str, *args: any, **kwargs):
@@ -123,133 +207,81 @@ class SubserviceParser(FileParser):
             self_print_parsing_info = args[0]
 
         # Read service from file name
-        service_match = re.search("Service[^0-9]*([0-9]{1,3})", file_name)
+        service_match = SERVICE_PATTERN.search(file_name)
         if service_match:
-            self.dict_entry_list[Clmns.SERVICE.value] = service_match.group(1)
-        self.dict_entry_list[Clmns.NAME.value] = " "
-        file = open(file_name, "r")
+            self.service = service_match.group(1)
         if self_print_parsing_info:
             print("Parsing " + file_name + " ...")
-        # Scans each line for possible variables
-        for line in file.readlines():
-            self.__handle_line_reading(line)
-
-    def __handle_line_reading(self, line):
-        """
-        Handles the reading of single lines.
-        :param line:
-        :return:
-        """
-        # Case insensitive matching
-        enum_match = re.search(r"[\s]*enum[\s]*Subservice([^\n]*)", line, re.IGNORECASE)
-        if enum_match:
-            self.subservice_enum_found = True
-        if self.subservice_enum_found:
-            self.__handle_enum_scanning(line)
-            self.last_line_list[2] = self.last_line_list[1]
-            self.last_line_list[1] = self.last_line_list[0]
-            self.last_line_list[0] = line
-
-    def __handle_enum_scanning(self, line: str):
-        """
-        Two-line reading. First check last line. For export command.
-        """
-        self.__scan_for_export_command(self.last_line_list[0])
-        subservice_match = self.__scan_subservices(line)
-        if subservice_match:
-            self.index = self.index + 1
-            dict_entry_tuple = tuple(self.dict_entry_list[: self.clmns_len])
-            self.mib_table.update({self.index: dict_entry_tuple})
-            self.__clear_tuple()
-
-    def __clear_tuple(self):
-        self.dict_entry_list[Clmns.NAME.value] = ""
-        self.dict_entry_list[Clmns.TYPE.value] = ""
-        self.dict_entry_list[Clmns.NUMBER.value] = ""
-        self.dict_entry_list[Clmns.COMMENT.value] = ""
-        self.possible_match_on_next_lines = False
-
-    def __scan_for_export_command(self, line: str) -> bool:
-        command_string = re.search(
-            r"([^\[]*)\[export\][: ]*\[([\w]*)\][\s]*([^\n]*)", line, re.IGNORECASE
-        )
-        if command_string:
-            # Check whether there is a separated export command
-            # (export command is not on same line as subservice definition)
-            # ugly solution but has worked so far.
-            string = command_string.group(1).lstrip()
-            if len(string) <= 8:
-                self.possible_match_on_next_lines = True
-                if self.__scan_for_type(line):
-                    self.__scan_for_comment(line)
-            return True
-        self.__add_possible_comment_string(line)
-        return False
-
-    def __add_possible_comment_string(self, line):
-        """
-        If no command was found, the line might be a continuation of a comment.
-        Strip whitespaces and comment symbols and add to comment buffer.
-        """
-        possible_multiline_comment = line.lstrip()
-        possible_multiline_comment = possible_multiline_comment.lstrip("/")
-        possible_multiline_comment = possible_multiline_comment.lstrip("<")
-        possible_multiline_comment = possible_multiline_comment.lstrip("!")
-        possible_multiline_comment = possible_multiline_comment.rstrip()
-        if len(possible_multiline_comment) > 0:
-            self.dict_entry_list[Clmns.COMMENT.value] += possible_multiline_comment
-
-    def __scan_subservices(self, line):
-        """
-        Scan for subservice match.
-        :param line:
-        :return:
-        """
-        subservice_match = re.search(
-            r"[\s]*([\w]*)[\s]*=[\s]*([0-9]{1,3})(?:,)?(?:[ /!<>]*([^\n]*))?", line
-        )
-        if subservice_match:
-            self.dict_entry_list[Clmns.NAME.value] = subservice_match.group(1)
-            self.dict_entry_list[Clmns.NUMBER.value] = subservice_match.group(2)
-            # I am assuming that an export string is longer than 7 chars.
-            if len(subservice_match.group(3)) > 7:
-                # Export command on same line overrides old commands. Read for comment.
-                if self.__process_comment_string(subservice_match.group(3)):
-                    return True
-            # Check whether exporting was commanded on last lines
-            return bool(self.possible_match_on_next_lines)
-        if re.search(r"}[\s]*;", line):
-            self.subservice_enum_found = False
-        return subservice_match
-
-    def __process_comment_string(self, comment_string) -> bool:
-        # look for packet type specifier
-        export_command_found = self.__scan_for_type(comment_string)
-        # Look for everything after [EXPORT] : [TYPESPECIFIER] as comment
-        if export_command_found:
-            self.__scan_for_comment(comment_string)
-        return export_command_found
-
-    def __scan_for_type(self, string) -> bool:
-        type_match = re.search(r"\[reply\]|\[tm\]", string, re.IGNORECASE)
-        if type_match:
-            self.dict_entry_list[Clmns.TYPE.value] = "TM"
-            return True
-        type_match = re.search(r"\[command\]|\[tc\]", string, re.IGNORECASE)
-        if type_match:
-            self.dict_entry_list[Clmns.TYPE.value] = "TC"
-            return True
-        self.dict_entry_list[Clmns.TYPE.value] = "Unspecified"
-        return False
-
-    def __scan_for_comment(self, comment_string):
-        comment_match = re.search(r":[\s]*\[[\w]*\][\s]*([^\n]*)", comment_string)
-        if comment_match:
-            self.dict_entry_list[Clmns.COMMENT.value] = comment_match.group(1)
+        # Most files of the tree do not define subservices. They are skipped with a
+        # substring check before they are tokenized.
+        with self._line_source(
+            file_name, SUBSERVICE_MARKERS, ignore_case=True
+        ) as lines:
+            declarations = scan_declarations(lines)
+        # Value of the next enumerator without initializer, None if it is unknown
+        next_number: Optional[int] = 0
+        for declaration in declarations:
+            if declaration.kind == DECL_ENUM:
+                next_number = 0
+                continue
+            if declaration.kind != DECL_ENUMERATOR:
+                continue
+            number = next_number
+            if declaration.value:
+                try:
+                    number = int(declaration.value, 0)
+                except ValueError:
+                    number = None
+            next_number = number + 1 if number is not None else None
+            if number is None or not SUBSERVICE_ENUM_PATTERN.match(declaration.parent):
+                continue
+            entry = self.__export_entry(declaration.name, number, declaration)
+            if entry is not None:
+                self.index = self.index + 1
+                self.mib_table.update({self.index: entry})
+
+    def __export_entry(
+        self, name: str, number: int, declaration: Declaration
+    ) -> Optional[tuple]:
+        # An export command on the same line overrides the one in the leading comment
+        for comment in (declaration.trailing_doc, declaration.doc):
+            comment_lines = comment.splitlines()
+            for index, comment_line in enumerate(comment_lines):
+                if not EXPORT_PATTERN.search(comment_line):
+                    continue
+                # Everything after [EXPORT] : [TYPESPECIFIER] is the comment, which may be
+                # continued on the following lines
+                description = ""
+                comment_match = COMMENT_PATTERN.search(comment_line)
+                if comment_match:
+                    description = comment_match.group(1)
+                description = " ".join(
+                    [description] + comment_lines[index + 1 :]
+                ).strip()
+                entry = list(range(len(SubserviceColumns)))
+                entry[Clmns.SERVICE.value] = self.service
+                entry[Clmns.NAME.value] = name
+                entry[Clmns.NUMBER.value] = str(number)
+                entry[Clmns.TYPE.value] = scan_for_type(comment_line)
+                entry[Clmns.COMMENT.value] = description
+                return tuple(entry)
+        return None
 
     def _post_parsing_operation(self):
         pass
 
 
+def scan_for_type(string: str) -> str:
+    """Return TM for a reply specifier, TC for a command specifier and Unspecified
+    otherwise. A reply specifier anywhere in the string wins over a command specifier.
+    """
+    packet_type = "Unspecified"
+    for type_match in TYPE_PATTERN.finditer(string):
+        if type_match.lastgroup == "tm":
+            return "TM"
+        packet_type = "TC"
+    return packet_type
+
+
 if __name__ == "__main__":
     main()
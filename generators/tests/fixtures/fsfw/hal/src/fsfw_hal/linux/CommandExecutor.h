@@ -0,0 +1,73 @@
+#ifndef FSFW_SRC_FSFW_OSAL_LINUX_COMMANDEXECUTOR_H_
+#define FSFW_SRC_FSFW_OSAL_LINUX_COMMANDEXECUTOR_H_
+
+#include <poll.h>
+
+#include <string>
+#include <vector>
+
+#include "fsfw/returnvalues/FwClassIds.h"
+#include "fsfw/returnvalues/returnvalue.h"
+
+class SimpleRingBuffer;
+template <typename T>
+class DynamicFIFO;
+
+/**
+ * @brief   Helper class to execute shell commands in blocking and non-blocking mode
+ */
+class CommandExecutor {
+ public:
+  enum class States { IDLE, COMMAND_LOADED, PENDING };
+
+  static constexpr uint8_t CLASS_ID = CLASS_ID::LINUX_OSAL;
+
+  //! [EXPORT] : [COMMENT] Execution of the current command has finished
+  static constexpr ReturnValue_t EXECUTION_FINISHED = returnvalue::makeCode(CLASS_ID, 0);
+
+  //! [EXPORT] : [COMMENT] Command is pending. This will also be returned if the user tries
+  //! to load another command but a command is still pending
+  static constexpr ReturnValue_t COMMAND_PENDING = returnvalue::makeCode(CLASS_ID, 1);
+  //! [EXPORT] : [COMMENT] Some bytes have been read from the executing process
+  static constexpr ReturnValue_t BYTES_READ = returnvalue::makeCode(CLASS_ID, 2);
+  //! [EXPORT] : [COMMENT] Command execution failed
+  static constexpr ReturnValue_t COMMAND_ERROR = returnvalue::makeCode(CLASS_ID, 3);
+  //! [EXPORT] : [COMMENT]
+  static constexpr ReturnValue_t NO_COMMAND_LOADED_OR_PENDING =
+      returnvalue::makeCode(CLASS_ID, 4);
+  static constexpr ReturnValue_t PCLOSE_CALL_ERROR = returnvalue::makeCode(CLASS_ID, 6);
+
+  /**
+   * Pass maximum reply size in the constructor
+   * @param maxSize
+   */
+  CommandExecutor(const size_t maxSize);
+
+  ReturnValue_t load(std::string command, bool blocking, bool printOutput = true);
+
+  ReturnValue_t execute();
+
+  ReturnValue_t check(bool& replyReceived);
+
+  States getCurrentState() const;
+
+  int getLastError() const;
+
+ private:
+  std::string currentCmd;
+  bool blocking = true;
+  FILE* currentCmdFile = nullptr;
+  int currentFd = 0;
+  bool printOutput = true;
+  std::vector<char> readVec;
+  struct pollfd waiter {};
+  SimpleRingBuffer* ringBuffer = nullptr;
+  DynamicFIFO<uint16_t>* sizesFifo = nullptr;
+
+  States state = States::IDLE;
+  int lastError = 0;
+
+  ReturnValue_t executeBlocking();
+};
+
+#endif /* FSFW_SRC_FSFW_OSAL_LINUX_COMMANDEXECUTOR_H_ */
@@ -0,0 +1,30 @@
+#ifndef CCSDSRETURNVALUESIF_H_
+#define CCSDSRETURNVALUESIF_H_
+
+#include "dllConf.h"
+#include "fsfw/returnvalues/HasReturnvaluesIF.h"
+/**
+ * This is a helper class to collect special return values that come up during CCSDS Handling.
+ * @ingroup ccsds_handling
+ */
+class CCSDSReturnValuesIF : public HasReturnvaluesIF {
+ public:
+  static const uint8_t INTERFACE_ID = CLASS_ID::CCSDS_HANDLER_IF;  //!< Basic ID of the interface.
+
+  static const ReturnValue_t BC_IS_SET_VR_COMMAND = MAKE_RETURN_CODE(0x01);
+  static const ReturnValue_t BC_IS_UNLOCK_COMMAND = MAKE_RETURN_CODE(0x02);
+  static const ReturnValue_t BC_ILLEGAL_COMMAND = MAKE_RETURN_CODE(0xB0);
+  static const ReturnValue_t BOARD_READING_NOT_FINISHED =
+      MAKE_RETURN_CODE(0xB1);  //! The CCSDS Board is not yet finished reading, it requires
+                               //! another cycle.
+
+  static const ReturnValue_t NS_POSITIVE_W = MAKE_RETURN_CODE(0xF0);
+  static const ReturnValue_t NS_NEGATIVE_W = MAKE_RETURN_CODE(0xF1);
+  static const ReturnValue_t NS_LOCKOUT = MAKE_RETURN_CODE(0xF2);
+  static const ReturnValue_t FARM_IN_LOCKOUT = MAKE_RETURN_CODE(0xF3);
+  static const ReturnValue_t FARM_IN_WAIT = MAKE_RETURN_CODE(0xF4);
+
+  virtual ~CCSDSReturnValuesIF() {}  //!< Empty virtual destructor
+};
+
+#endif /* CCSDSRETURNVALUESIF_H_ */
@@ -0,0 +1,46 @@
+#ifndef DATALINKLAYER_H_
+#define DATALINKLAYER_H_
+
+#include "CCSDSReturnValuesIF.h"
+#include "ClcwIF.h"
+#include "TcTransferFrame.h"
+#include "VirtualChannelReceptionIF.h"
+#include "fsfw/events/Event.h"
+
+class VirtualChannelReception;
+/**
+ * A complete representation of the CCSDS Data Link Layer.
+ * The operations of this layer are defined in the CCSDS TC Space Data Link Protocol
+ * document. It is configured to handle a VC Demultiplexing function. All reception
+ * steps are performed.
+ */
+class DataLinkLayer : public CCSDSReturnValuesIF {
+ public:
+  static const uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::SYSTEM_1;
+  //! [EXPORT] : [COMMENT] A RF available signal was detected. P1: raw RFA state, P2: 0
+  static const Event RF_AVAILABLE = MAKE_EVENT(0, severity::INFO);
+  //! [EXPORT] : [COMMENT] A previously found RF available signal was lost.
+  //! P1: raw RFA state, P2: 0
+  static const Event RF_LOST = MAKE_EVENT(1, severity::INFO);
+  static const Event BIT_LOCK = MAKE_EVENT(
+      2, severity::INFO);  //!< [EXPORT] : [COMMENT] A Bit Lock signal. Was detected. P1: raw BLO state, P2: 0
+  //! [EXPORT] : [COMMENT] A previously found Bit Lock signal was lost. P1: raw BLO state, P2: 0
+  static const Event BIT_LOCK_LOST = MAKE_EVENT(3, severity::INFO);
+  //	static const Event RF_CHAIN_LOST = MAKE_EVENT(4, severity::INFO); //!< The CCSDS Board
+  // detected that either bit lock or RF available or both are lost. No parameters.
+  //! [EXPORT] : [COMMENT] The CCSDS Board could not interpret a TC
+  static const Event FRAME_PROCESSING_FAILED = MAKE_EVENT(5, severity::LOW);
+  /**
+   * The Constructor sets the passed parameters to fixed values.
+   */
+  DataLinkLayer(uint8_t* set_frame_buffer, ClcwIF* setClcw, uint8_t set_start_sequence_length,
+                uint16_t set_scid);
+
+  ReturnValue_t processFrame(uint16_t length);
+
+ private:
+  uint8_t startSequenceLength = 0;
+  uint16_t spacecraftId;
+};
+
+#endif /* DATALINKLAYER_H_ */
@@ -0,0 +1,159 @@
+import unittest
+
+from utility.cpp_tokenizer import (
+    DECL_CLASS,
+    DECL_ENUM,
+    DECL_ENUMERATOR,
+    DECL_FIELD,
+    DECL_STATIC_CONST,
+    DECL_STRUCT,
+    export_comment,
+    scan_declarations,
+)
+
+
+def scan(source: str):
+    return scan_declarations(source.splitlines(keepends=True))
+
+
+class TestScanDeclarations(unittest.TestCase):
+    def test_leading_and_trailing_comments(self):
+        declarations = scan(
+            """
+enum Subservice: uint8_t {
+    //!< [EXPORT] : [COMMAND] Perform connection test
+    CONNECTION_TEST = 1,
+    CONNECTION_TEST_REPORT = 2, //!< [EXPORT] : [REPLY] Connection test reply
+    /* Block comment
+       over two lines */
+    EVENT_TRIGGER_TEST
+};
+"""
+        )
+        self.assertEqual(
+            [(d.kind, d.name, d.value) for d in declarations],
+            [
+                (DECL_ENUM, "Subservice", ""),
+                (DECL_ENUMERATOR, "CONNECTION_TEST", "1"),
+                (DECL_ENUMERATOR, "CONNECTION_TEST_REPORT", "2"),
+                (DECL_ENUMERATOR, "EVENT_TRIGGER_TEST", ""),
+            ],
+        )
+        self.assertEqual(declarations[0].type_name, "uint8_t")
+        self.assertEqual(
+            declarations[1].doc, "[EXPORT] : [COMMAND] Perform connection test"
+        )
+        self.assertEqual(declarations[1].trailing_doc, "")
+        self.assertEqual(declarations[2].doc, "")
+        self.assertEqual(
+            declarations[2].trailing_doc, "[EXPORT] : [REPLY] Connection test reply"
+        )
+        self.assertEqual(declarations[3].doc, "Block comment\nover two lines")
+        self.assertTrue(all(d.parent == "Subservice" for d in declarations[1:]))
+
+    def test_commented_out_declarations_are_skipped(self):
+        declarations = scan(
+            """
+// static const Event OLD = MAKE_EVENT(4, severity::INFO);
+/* static const Event OLDER = MAKE_EVENT(5, severity::INFO); */
+#define EVENT_ID(x) static const Event x = MAKE_EVENT(6, \\
+                                                     severity::INFO);
+static const Event NEW = MAKE_EVENT(7, severity::INFO);
+"""
+        )
+        self.assertEqual([d.name for d in declarations], ["NEW"])
+        self.assertEqual(
+            declarations[0].doc,
+            "static const Event OLD = MAKE_EVENT(4, severity::INFO);\n"
+            "static const Event OLDER = MAKE_EVENT(5, severity::INFO);",
+        )
+
+    def test_multi_line_declarations(self):
+        declarations = scan(
+            """
+class Foo {
+ public:
+  static constexpr uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::PUS_SERVICE_17;
+  //! [EXPORT] : [COMMENT] First line
+  //! second line
+  static constexpr Event TEST =
+      event::makeEvent(SUBSYSTEM_ID,
+                       2, severity::LOW);  //!< Trailing
+  void operation() {
+    static const int LOCAL = 1;
+  }
+};
+"""
+        )
+        self.assertEqual(
+            [(d.kind, d.name) for d in declarations],
+            [
+                (DECL_CLASS, "Foo"),
+                (DECL_STATIC_CONST, "SUBSYSTEM_ID"),
+                (DECL_STATIC_CONST, "TEST"),
+            ],
+        )
+        test = declarations[2]
+        self.assertEqual(test.type_name, "Event")
+        self.assertEqual(test.value, "event::makeEvent(SUBSYSTEM_ID, 2, severity::LOW)")
+        self.assertEqual(test.doc, "[EXPORT] : [COMMENT] First line\nsecond line")
+        self.assertEqual(test.trailing_doc, "Trailing")
+        self.assertEqual(test.line, 7)
+        self.assertEqual(test.parent, "Foo")
+
+    def test_namespace_scope_const_definitions(self):
+        declarations = scan(
+            """
+namespace events {
+constexpr uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::CORE;
+extern const int DECLARED_ONLY;
+}
+"""
+        )
+        self.assertEqual(len(declarations), 1)
+        self.assertEqual(declarations[0].kind, DECL_STATIC_CONST)
+        self.assertEqual(declarations[0].value, "SUBSYSTEM_ID::CORE")
+
+    def test_brace_initializers(self):
+        declarations = scan(
+            """
+static constexpr uint8_t VALUES[] = {1, 2,
+                                     3};  //!< Values
+constexpr std::array<int, 2> PAIR{4, {5}};
+struct Foo {
+  int a{1};
+  uint8_t b[3] = {0, 0, 0};
+  //! Documented
+  float c;
+};
+"""
+        )
+        self.assertEqual(
+            [(d.kind, d.name, d.type_name, d.value) for d in declarations],
+            [
+                (DECL_STATIC_CONST, "VALUES", "uint8_t", "{1, 2, 3}"),
+                (DECL_STATIC_CONST, "PAIR", "std::array<int, 2>", "{4, {5}}"),
+                (DECL_STRUCT, "Foo", "", ""),
+                (DECL_FIELD, "a", "int", ""),
+                (DECL_FIELD, "b", "uint8_t", ""),
+                (DECL_FIELD, "c", "float", ""),
+            ],
+        )
+        self.assertEqual(declarations[0].trailing_doc, "Values")
+        self.assertEqual(declarations[5].doc, "Documented")
+
+
+class TestExportComment(unittest.TestCase):
+    def test_description_is_joined_with_the_following_lines(self):
+        self.assertEqual(
+            export_comment("Intro\n[EXPORT] : [COMMENT] First line\nsecond line"),
+            "First line second line",
+        )
+
+    def test_missing_or_empty_command(self):
+        self.assertEqual(export_comment("Only a comment"), "")
+        self.assertEqual(export_comment("[EXPORT] : [COMMENT]"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+FSFWGEN_AVAILABLE = importlib.util.find_spec("fsfwgen") is not None
+if FSFWGEN_AVAILABLE:
+    from definitions import ROOT_DIR
+    from events.event_parser import EventParser
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures")
+SUBSYSTEMS = {"SYSTEM_1": ["79"], "PUS_SERVICE_17": ["17"], "CORE": [112]}
+
+
+def csv_row(event_id: int, entry: tuple) -> str:
+    return f"{event_id};{event_id:#06x};" + ";".join(entry)
+
+
+@unittest.skipUnless(FSFWGEN_AVAILABLE, "fsfwgen is not installed")
+class TestEventParser(unittest.TestCase):
+    def parse(self, source: str) -> dict:
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "Events.h")
+            with open(file_name, "w") as file:
+                file.write(source)
+            parser = EventParser([file_name], SUBSYSTEMS)
+            parser.obsw_root_path = directory
+            return parser.parse_files()
+
+    def test_full_id_is_subsystem_id_times_100_plus_number(self):
+        table = self.parse(
+            """
+namespace events {
+constexpr uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::PUS_SERVICE_17;
+//! [EXPORT] : [COMMENT] Connection test
+static constexpr Event TEST = MAKE_EVENT(0, severity::INFO);
+static constexpr Event OTHER = event::makeEvent(SUBSYSTEM_ID, 0x0A, severity::LOW);
+static constexpr Event CORE_EVENT = event::makeEvent(SUBSYSTEM_ID::CORE, 99,
+                                                     severity::HIGH);
+}
+"""
+        )
+        self.assertEqual(
+            table,
+            {
+                1700: ("TEST", "INFO", "Connection test", "Events.h"),
+                1710: ("OTHER", "LOW", "", "Events.h"),
+                11299: ("CORE_EVENT", "HIGH", "", "Events.h"),
+            },
+        )
+
+    def test_unknown_subsystem_is_skipped(self):
+        table = self.parse(
+            """
+static const uint8_t SUBSYSTEM_ID = SUBSYSTEM_ID::UNKNOWN;
+static const Event LOST = MAKE_EVENT(1, severity::LOW);
+"""
+        )
+        self.assertEqual(table, dict())
+
+    def test_fixture_matches_checked_in_csv(self):
+        file_name = os.path.join(
+            FIXTURE_DIR, "fsfw", "src", "fsfw", "datalinklayer", "DataLinkLayer.h"
+        )
+        parser = EventParser([file_name], SUBSYSTEMS)
+        parser.obsw_root_path = FIXTURE_DIR
+        rows = [
+            csv_row(event_id, entry)
+            for event_id, entry in sorted(parser.parse_files().items())
+        ]
+        with open(os.path.join(ROOT_DIR, "bsp_hosted_events.csv")) as file:
+            expected = [
+                line.rstrip("\n")
+                for line in file
+                if line.rstrip("\n").endswith("/DataLinkLayer.h")
+            ]
+        self.assertEqual(rows, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import importlib.util
+import os
+import pickle
+import tempfile
+import unittest
+
+FSFWGEN_AVAILABLE = importlib.util.find_spec("fsfwgen") is not None
+if FSFWGEN_AVAILABLE:
+    from utility.parse_cache import CACHE_VERSION, CachedTable, ParseCache
+
+
+@unittest.skipUnless(FSFWGEN_AVAILABLE, "fsfwgen is not installed")
+class TestParseCacheLoad(unittest.TestCase):
+    def load(self, content: bytes):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = os.path.join(directory, "cache")
+            with open(cache_file, "wb") as file:
+                file.write(content)
+            cache = ParseCache(cache_file=cache_file)
+            cache.load()
+        return cache
+
+    def test_current_version_is_loaded(self):
+        tables = {"events": CachedTable(context_digest="", units=dict())}
+        cache = self.load(pickle.dumps((CACHE_VERSION, tables)))
+        self.assertEqual(cache._tables, tables)
+
+    def test_other_versions_are_ignored(self):
+        tables = {"events": CachedTable(context_digest="", units=dict())}
+        cache = self.load(pickle.dumps((CACHE_VERSION - 1, tables)))
+        self.assertEqual(cache._tables, dict())
+
+    def test_unreadable_files_are_ignored(self):
+        for content in (
+            b"",
+            b"no pickle",
+            # Classes which were renamed or whose module was moved
+            b"cutility.parse_cache\nRemovedClass\n.",
+            b"cremoved_module\nCachedTable\n.",
+        ):
+            with self.subTest(content=content):
+                self.assertEqual(self.load(content)._tables, dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
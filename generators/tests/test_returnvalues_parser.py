@@ -0,0 +1,96 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+FSFWGEN_AVAILABLE = importlib.util.find_spec("fsfwgen") is not None
+if FSFWGEN_AVAILABLE:
+    from definitions import ROOT_DIR
+    from returnvalues.returnvalues_parser import (
+        BUILTIN_RETURNVALUES,
+        ReturnValueParser,
+    )
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures")
+# Interface table as parsed from the class ID headers, the names keep their leading space
+INTERFACES = {
+    "CCSDS_HANDLER_IF": [0x2B, " CCS"],
+    "LINUX_OSAL": [0x43, " UXOS"],
+}
+FIXTURE_FILES = [
+    os.path.join(
+        FIXTURE_DIR, "fsfw", "hal", "src", "fsfw_hal", "linux", "CommandExecutor.h"
+    ),
+    os.path.join(
+        FIXTURE_DIR, "fsfw", "src", "fsfw", "datalinklayer", "CCSDSReturnValuesIF.h"
+    ),
+]
+
+
+def csv_row(code: int, entry: tuple) -> str:
+    """Row of the CSV export of the returnvalue table."""
+    return f"{hex(code)};" + ";".join(entry)
+
+
+@unittest.skipUnless(FSFWGEN_AVAILABLE, "fsfwgen is not installed")
+class TestReturnValueParser(unittest.TestCase):
+    def test_fixture_matches_checked_in_csv(self):
+        parser = ReturnValueParser(INTERFACES, FIXTURE_FILES)
+        parser.obsw_root_path = FIXTURE_DIR
+        rows = [
+            csv_row(code, entry) for code, entry in parser.parse_files(True).items()
+        ]
+        with open(os.path.join(ROOT_DIR, "bsp_hosted_returnvalues.csv")) as file:
+            checked_in_rows = [line.rstrip("\n") for line in file]
+        # The fixtures contain all returnvalues of the command executor and a part of the
+        # CCSDS returnvalues
+        executor_rows = [
+            row
+            for row in checked_in_rows
+            if row.split(";")[4].endswith("/CommandExecutor.h")
+        ]
+        self.assertEqual(rows[:2], checked_in_rows[:2])
+        self.assertEqual(rows[2:8], executor_rows)
+        self.assertEqual(len(rows), 2 + 6 + 9)
+        for row in rows:
+            self.assertIn(row, checked_in_rows)
+
+    def test_builtin_returnvalues_are_always_present(self):
+        parser = ReturnValueParser(INTERFACES, [])
+        self.assertEqual(parser.parse_files(), BUILTIN_RETURNVALUES)
+        self.assertEqual(parser.mib_table[0x0][0], "OK")
+        self.assertEqual(parser.mib_table[0x1][0], "Failed")
+
+    def test_interface_resolution(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "Retvals.h")
+            with open(file_name, "w") as file:
+                file.write(
+                    """
+namespace retvals {
+static constexpr ReturnValue_t BEFORE_ID = MAKE_RETURN_CODE(1);
+static constexpr uint8_t INTERFACE_ID = CLASS_ID::LINUX_OSAL;
+//! [EXPORT] : [COMMENT] Macro
+static constexpr ReturnValue_t MACRO = MAKE_RETURN_CODE(0x10);
+static constexpr ReturnValue_t LOCAL = returnvalue::makeCode(INTERFACE_ID, 17);
+static constexpr ReturnValue_t DIRECT =
+    HasReturnvaluesIF::makeReturnCode(CLASS_ID::CCSDS_HANDLER_IF, 2);
+static constexpr ReturnValue_t ALIAS = returnvalue::OK;
+}
+"""
+                )
+            parser = ReturnValueParser(INTERFACES, [file_name])
+            parser.obsw_root_path = directory
+            table = parser.parse_files(True)
+        self.assertEqual(
+            {code: entry for code, entry in table.items() if code > 1},
+            {
+                0x4310: (" UXOS_Macro", "Macro", "0x10", "Retvals.h", "LINUX_OSAL"),
+                0x4311: (" UXOS_Local", "", "17", "Retvals.h", "LINUX_OSAL"),
+                0x2B02: (" CCS_Direct", "", "2", "Retvals.h", "CCSDS_HANDLER_IF"),
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import importlib.util
+import os
+import sqlite3
+import tempfile
+import unittest
+
+FSFWGEN_AVAILABLE = importlib.util.find_spec("fsfwgen") is not None
+if FSFWGEN_AVAILABLE:
+    from utility.sql_exporter import SqlExporter, SqlTable, hex_id
+
+
+@unittest.skipUnless(FSFWGEN_AVAILABLE, "fsfwgen is not installed")
+class TestSqlExporter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.directory.name, "mission.db")
+        self.table = SqlTable(
+            name="Objects",
+            columns=[
+                ("objectid", "TEXT"),
+                ("objectidInt", "INTEGER"),
+                ("name", "TEXT"),
+            ],
+            key_columns=["objectidInt"],
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def rows(self) -> list:
+        connection = sqlite3.connect(self.db_filename)
+        try:
+            return connection.execute(
+                f"{self.table.select_cmd} ORDER BY objectidInt"
+            ).fetchall()
+        finally:
+            connection.close()
+
+    def test_rows_are_upserted_and_deleted(self):
+        exporter = SqlExporter(self.db_filename)
+        exporter.export(
+            self.table,
+            [("0x4301cafe", 0x4301CAFE, "TEST"), ("0x53000000", 0x53000000, "PUS")],
+        )
+        exporter.export(self.table, [("0x4301cafe", 0x4301CAFE, "RENAMED")])
+        self.assertEqual(self.rows(), [("0x4301cafe", 0x4301CAFE, "RENAMED")])
+
+    def test_ids_with_different_hex_case_map_to_one_row(self):
+        exporter = SqlExporter(self.db_filename)
+        exporter.export(self.table, [("0x4301CAFE", "0x4301CAFE", "TEST")])
+        exporter.export(self.table, [("0x4301cafe", "0x4301cafe", "TEST")])
+        self.assertEqual(self.rows(), [("0x4301cafe", 0x4301CAFE, "TEST")])
+
+    def test_hex_id(self):
+        self.assertEqual(hex_id(0x4301CAFE, 8), "0x4301cafe")
+        self.assertEqual(hex_id(0x1, 4), "0x0001")
+
+
+if __name__ == "__main__":
+    unittest.main()
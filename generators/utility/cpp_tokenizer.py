@@ -0,0 +1,490 @@
+"""Lightweight C++ tokenizer for the generator parsers.
+
+The generators only need the declarations of headers together with their doc comments:
+enums and their enumerators, static const definitions, structs, classes and their fields.
+Const definitions at namespace scope have internal linkage as well, so they are collected as
+static const definitions even without the static keyword.
+Instead of matching every line, or a moving window of lines, against a set of regular
+expressions, the lines of a header are split into tokens in one pass, and the declarations
+are collected from the token stream with a small scope stack.
+
+Comments are attached to declarations like this: a comment which starts on the same line as
+the end of a declaration, for example after the comma of an enumerator or the opening brace of
+a struct, is a trailing comment of that declaration. All other comments are leading comments
+of the next declaration. Comments inside a declaration which is not finished yet belong to
+that declaration as trailing comments as well. Preprocessor lines are skipped.
+"""
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+TOKEN_COMMENT = "comment"
+TOKEN_IDENT = "ident"
+TOKEN_NUMBER = "number"
+TOKEN_STRING = "string"
+TOKEN_PUNCT = "punct"
+
+DECL_ENUM = "enum"
+DECL_ENUMERATOR = "enumerator"
+DECL_STATIC_CONST = "static_const"
+DECL_STRUCT = "struct"
+DECL_CLASS = "class"
+DECL_FIELD = "field"
+
+# Unterminated block comments and unterminated strings only match the later alternatives
+TOKEN_PATTERN = re.compile(
+    r"(?P<comment>//.*|/\*.*?\*/)"
+    r"|(?P<open_comment>/\*)"
+    r"|(?P<string>\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')"
+    r"|(?P<ident>[A-Za-z_]\w*)"
+    r"|(?P<number>\.?[0-9](?:[\w.]|'(?=\w))*)"
+    r"|(?P<punct>::|[^\s\w])"
+)
+COMMENT_MARKER_PATTERN = re.compile(r"^[\s/*!<]*")
+EXPORT_COMMENT_PATTERN = re.compile(r"\[EXPORT\][\s]*:[\s]*\[COMMENT\][\s]*")
+ACCESS_SPECIFIERS = ("public", "protected", "private")
+# Statements starting with these keywords never declare a field
+NON_FIELD_KEYWORDS = {
+    "typedef",
+    "using",
+    "friend",
+    "template",
+    "return",
+    "static_assert",
+    "enum",
+    "struct",
+    "class",
+    "union",
+    "namespace",
+}
+CONST_KEYWORDS = ("const", "constexpr")
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    line: int
+
+
+class Declaration(NamedTuple):
+    """Declaration of a header.
+
+    The type is the underlying type of enums, the base clause of structs and classes, and
+    the declared type of static const definitions and fields. The value is the initializer
+    text of enumerators and static const definitions. The parent is the name of the
+    enclosing enum, struct or class, or an empty string.
+    """
+
+    kind: str
+    name: str
+    type_name: str
+    value: str
+    doc: str
+    trailing_doc: str
+    line: int
+    parent: str
+
+    @property
+    def comment(self) -> str:
+        """Leading and trailing comment, separated by a line break."""
+        return "\n".join(text for text in (self.doc, self.trailing_doc) if text)
+
+
+def tokenize(lines: Iterable[str]) -> Iterator[Token]:
+    """Yield the tokens of the lines of a C++ source. Whitespace and preprocessor lines are
+    dropped. Block comments are yielded as one token, on the line where they start."""
+    block: Optional[List[str]] = None
+    block_line = 0
+    in_directive = False
+    for line_number, line in enumerate(lines, start=1):
+        pos = 0
+        if block is not None:
+            end = line.find("*/")
+            if end < 0:
+                block.append(line)
+                continue
+            block.append(line[: end + 2])
+            yield Token(TOKEN_COMMENT, "".join(block), block_line)
+            block = None
+            pos = end + 2
+        elif in_directive or line.lstrip().startswith("#"):
+            # Directives may be continued on the next line with a backslash
+            in_directive = line.rstrip("\r\n").endswith("\\")
+            continue
+        for match in TOKEN_PATTERN.finditer(line, pos):
+            kind = match.lastgroup
+            if kind == "open_comment":
+                block = [line[match.start() :]]
+                block_line = line_number
+                break
+            yield Token(kind, match.group(), line_number)
+    if block is not None:
+        yield Token(TOKEN_COMMENT, "".join(block), block_line)
+
+
+def comment_text(comment: str) -> str:
+    """Return the text of a comment token without comment markers like //!< or the leading
+    asterisks of block comments. The lines of block comments are kept."""
+    if comment.startswith("/*"):
+        comment = comment[2:]
+        if comment.endswith("*/"):
+            comment = comment[:-2]
+    text_lines = [
+        COMMENT_MARKER_PATTERN.sub("", text_line).rstrip()
+        for text_line in comment.splitlines()
+    ]
+    return "\n".join(text_line for text_line in text_lines if text_line)
+
+
+def export_comment(comment: str) -> str:
+    """Return the description behind the first [EXPORT] : [COMMENT] command of a comment
+    text, joined with the following lines, or an empty string if there is no command."""
+    export_match = EXPORT_COMMENT_PATTERN.search(comment)
+    if not export_match:
+        return ""
+    return " ".join(comment[export_match.end() :].split())
+
+
+class _Scope(NamedTuple):
+    kind: str
+    name: str
+
+
+class _Statement:
+    """Tokens of a declaration which is not finished yet."""
+
+    def __init__(self, doc: List[str]):
+        self.tokens: List[Token] = []
+        self.doc = doc
+        self.trailing_doc: List[str] = []
+
+    @property
+    def idents(self) -> List[str]:
+        return [token.text for token in self.tokens if token.kind == TOKEN_IDENT]
+
+
+class DeclarationScanner:
+    """Collects the declarations from the token stream of a header in one pass."""
+
+    def __init__(self):
+        self.declarations: List[Declaration] = []
+        self._scopes: List[_Scope] = []
+        self._statement: Optional[_Statement] = None
+        self._pending_doc: List[str] = []
+        # Declaration which may still get a trailing comment, and the line where it ended
+        self._last_index: Optional[int] = None
+        self._last_line = 0
+        # Statements which contain a brace initializer are continued after the braces
+        self._suspended: List[Optional[_Statement]] = []
+
+    def scan(self, lines: Iterable[str]) -> List[Declaration]:
+        for token in tokenize(lines):
+            self.feed(token)
+        if self.scope is not None and self.scope.kind == DECL_ENUM:
+            self.__finish_enumerator(0)
+        return self.declarations
+
+    @property
+    def scope(self) -> Optional[_Scope]:
+        return self._scopes[-1] if self._scopes else None
+
+    def feed(self, token: Token):
+        scope = self.scope
+        if scope is not None and scope.kind in ("block", "init"):
+            if token.kind != TOKEN_COMMENT:
+                self.__handle_skipped_scope(token)
+            return
+        if token.kind == TOKEN_COMMENT:
+            self.__handle_comment(token)
+            return
+        if token.text == "{":
+            self.__open_scope(token)
+        elif token.text == "}":
+            self.__close_scope(token)
+        elif scope is not None and scope.kind == DECL_ENUM:
+            if token.text == ",":
+                self.__finish_enumerator(token.line)
+            else:
+                self.__append(token)
+        elif token.text == ";":
+            self.__finish_statement(token.line)
+        elif token.text == ":" and self.__is_access_specifier():
+            # Comments in front of an access specifier belong to the next declaration
+            self._pending_doc = self._statement.doc + self._pending_doc
+            self._statement = None
+        else:
+            self.__append(token)
+
+    def __is_access_specifier(self) -> bool:
+        tokens = self._statement.tokens if self._statement is not None else []
+        return len(tokens) == 1 and tokens[0].text in ACCESS_SPECIFIERS
+
+    def __handle_comment(self, token: Token):
+        text = comment_text(token.text)
+        if not text:
+            return
+        if self._statement is not None and self._statement.tokens:
+            self._statement.trailing_doc.append(text)
+        elif self._last_index is not None and token.line == self._last_line:
+            declaration = self.declarations[self._last_index]
+            self.declarations[self._last_index] = declaration._replace(
+                trailing_doc="\n".join(
+                    text_part
+                    for text_part in (declaration.trailing_doc, text)
+                    if text_part
+                )
+            )
+        else:
+            self._pending_doc.append(text)
+
+    def __append(self, token: Token):
+        if self._statement is None:
+            self._statement = _Statement(self._pending_doc)
+            self._pending_doc = []
+            self._last_index = None
+        self._statement.tokens.append(token)
+
+    def __emit(self, statement: _Statement, end_line: int, **fields):
+        parent = ""
+        for scope in reversed(self._scopes):
+            if scope.kind in (DECL_ENUM, DECL_STRUCT, DECL_CLASS):
+                parent = scope.name
+                break
+        line = statement.tokens[0].line if statement.tokens else end_line
+        self.declarations.append(
+            Declaration(
+                doc="\n".join(statement.doc),
+                trailing_doc="\n".join(statement.trailing_doc),
+                line=line,
+                parent=parent,
+                **fields,
+            )
+        )
+        self._last_index = len(self.declarations) - 1
+        self._last_line = end_line
+
+    def __open_scope(self, token: Token):
+        statement = self._statement or _Statement(self._pending_doc)
+        self._statement = None
+        self._pending_doc = []
+        idents = statement.idents
+        texts = [statement_token.text for statement_token in statement.tokens]
+        if "=" in texts or (texts and texts[-1] in (",", "(")):
+            self.__open_initializer(statement, token)
+            return
+        if "enum" in idents:
+            name, type_name = self.__type_head(statement, "enum")
+            self.__emit(
+                statement,
+                token.line,
+                kind=DECL_ENUM,
+                name=name,
+                type_name=type_name,
+                value="",
+            )
+            self._scopes.append(_Scope(DECL_ENUM, name))
+            return
+        for keyword in (DECL_STRUCT, DECL_CLASS, "union"):
+            if keyword in idents and "(" not in texts:
+                name, base = self.__type_head(statement, keyword)
+                if keyword != "union":
+                    self.__emit(
+                        statement,
+                        token.line,
+                        kind=keyword,
+                        name=name,
+                        type_name=base,
+                        value="",
+                    )
+                self._scopes.append(_Scope(keyword, name))
+                return
+        if "namespace" in idents:
+            self._scopes.append(_Scope("namespace", ""))
+            return
+        if (
+            len(texts) >= 2
+            and statement.tokens[-1].kind == TOKEN_IDENT
+            and "(" not in texts
+        ):
+            # Direct list initialization like uint8_t values{1, 2}
+            self.__open_initializer(statement, token)
+            return
+        # Function bodies and other blocks do not contain declarations of interest
+        self._suspended.append(None)
+        self._scopes.append(_Scope("block", ""))
+
+    def __open_initializer(self, statement: _Statement, token: Token):
+        """Brace initializer. Its tokens are part of the statement, which continues after
+        the closing brace."""
+        statement.tokens.append(token)
+        self._suspended.append(statement)
+        self._scopes.append(_Scope("init", ""))
+
+    def __close_scope(self, token: Token):
+        if not self._scopes:
+            self._statement = None
+            return
+        if self.scope.kind == DECL_ENUM:
+            # Comments behind the closing brace do not belong to the last enumerator
+            self.__finish_enumerator(0)
+        self._scopes.pop()
+        self._statement = None
+        self._last_index = None
+
+    def __handle_skipped_scope(self, token: Token):
+        if self.scope.kind == "init":
+            self._suspended[-1].tokens.append(token)
+        if token.text == "{":
+            self._scopes.append(_Scope(self.scope.kind, ""))
+        elif token.text == "}":
+            self._scopes.pop()
+            if self.scope is None or self.scope.kind not in ("block", "init"):
+                # Left the outermost skipped scope
+                self._statement = self._suspended.pop()
+
+    def __finish_enumerator(self, end_line: int):
+        statement = self._statement
+        self._statement = None
+        if statement is None or not statement.tokens:
+            return
+        if statement.tokens[0].kind != TOKEN_IDENT:
+            return
+        value = ""
+        texts = [token.text for token in statement.tokens]
+        if "=" in texts:
+            value = _join_tokens(statement.tokens[texts.index("=") + 1 :])
+        self.__emit(
+            statement,
+            end_line or statement.tokens[-1].line,
+            kind=DECL_ENUMERATOR,
+            name=statement.tokens[0].text,
+            type_name="",
+            value=value,
+        )
+
+    def __finish_statement(self, end_line: int):
+        statement = self._statement
+        self._statement = None
+        if statement is None or not statement.tokens:
+            return
+        scope = self.scope
+        idents = statement.idents
+        texts = [token.text for token in statement.tokens]
+        at_namespace_scope = scope is None or scope.kind == "namespace"
+        if ("static" in idents or at_namespace_scope) and any(
+            kw in idents for kw in CONST_KEYWORDS
+        ):
+            initializer = _initializer_index(texts)
+            if initializer is None or "(" in texts[:initializer]:
+                return
+            # The value of a direct list initialization starts with its brace
+            value_start = initializer + 1 if texts[initializer] == "=" else initializer
+            name_index = initializer - 1
+            while name_index > 0 and statement.tokens[name_index].kind != TOKEN_IDENT:
+                name_index -= 1
+            type_tokens = [
+                token
+                for token in statement.tokens[:name_index]
+                if token.text not in ("static", "inline") + CONST_KEYWORDS
+            ]
+            self.__emit(
+                statement,
+                end_line,
+                kind=DECL_STATIC_CONST,
+                name=statement.tokens[name_index].text,
+                type_name=_join_tokens(type_tokens),
+                value=_join_tokens(statement.tokens[value_start:]),
+            )
+            return
+        if scope is None or scope.kind not in (DECL_STRUCT, DECL_CLASS, "union"):
+            return
+        initializer = _initializer_index(texts)
+        if initializer is not None:
+            texts = texts[:initializer]
+        if idents and idents[0] in NON_FIELD_KEYWORDS or "(" in texts:
+            return
+        # Skip array sizes and bit field widths behind the name
+        for delimiter in ("[", ":"):
+            if delimiter in texts:
+                texts = texts[: texts.index(delimiter)]
+        tokens = statement.tokens[: len(texts)]
+        if len(tokens) < 2 or tokens[-1].kind != TOKEN_IDENT:
+            return
+        self.__emit(
+            statement,
+            end_line,
+            kind=DECL_FIELD,
+            name=tokens[-1].text,
+            type_name=_join_tokens(tokens[:-1]),
+            value="",
+        )
+
+    @staticmethod
+    def __type_head(statement: _Statement, keyword: str):
+        """Return the name and the type or base clause which follow a keyword."""
+        tokens = statement.tokens
+        index = next(i for i, token in enumerate(tokens) if token.text == keyword) + 1
+        # enum class and enum struct
+        if index < len(tokens) and tokens[index].text in (DECL_CLASS, DECL_STRUCT):
+            index += 1
+        name = ""
+        if index < len(tokens) and tokens[index].kind == TOKEN_IDENT:
+            name = tokens[index].text
+            index += 1
+        # Skip attributes like final
+        while index < len(tokens) and tokens[index].text != ":":
+            index += 1
+        return name, _join_tokens(tokens[index + 1 :])
+
+
+def scan_declarations(lines: Iterable[str]) -> List[Declaration]:
+    """Return all declarations of the lines of a header, in source order."""
+    return DeclarationScanner().scan(lines)
+
+
+def _initializer_index(texts: List[str]) -> Optional[int]:
+    """Return the index of the = or the brace which starts the initializer of a
+    statement, or None if it has no initializer."""
+    for index, text in enumerate(texts):
+        if text in ("=", "{"):
+            return index
+    return None
+
+
+def _join_tokens(tokens: List[Token]) -> str:
+    """Join tokens with single spaces, except around punctuation which is usually written
+    without them."""
+    text = ""
+    previous: Optional[Token] = None
+    for token in tokens:
+        if previous is not None and _needs_space(previous, token):
+            text += " "
+        text += token.text
+        previous = token
+    return text
+
+
+def _needs_space(previous: Token, token: Token) -> bool:
+    if previous.kind == TOKEN_PUNCT and previous.text in (
+        "::",
+        "<",
+        "(",
+        "[",
+        "{",
+        "~",
+        "!",
+    ):
+        return False
+    if token.kind == TOKEN_PUNCT and token.text in (
+        "::",
+        "<",
+        ">",
+        "(",
+        ")",
+        "[",
+        "]",
+        "}",
+        ",",
+        ";",
+    ):
+        return False
+    return True
@@ -0,0 +1,229 @@
+"""Table based backend for the C++ translation files.
+
+The default generators of fsfwgen emit one switch case per event or object. This backend emits
+a constexpr array sorted by ID instead, which is binary searched, so the lookup cost only
+grows logarithmically and the code size does not grow with one case per entry. A second
+constexpr array, sorted by name, allows to look up the ID of a name.
+
+The generated functions keep the signatures of the switch based files, so the two backends
+can be exchanged without touching any user code.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+TRANSLATION_BACKEND_SWITCH = "switch"
+TRANSLATION_BACKEND_TABLE = "table"
+
+
+def write_event_translation_table(
+    file_name: str,
+    header_file_name: Optional[str],
+    event_list: Iterable[Tuple[int, Tuple]],
+    date_string: str,
+):
+    """Write translateEvents.cpp and translateEvents.h
+
+    :param header_file_name: Header file, or None to only write the source file
+    :param event_list: List of event IDs and event tuples. The name is the first element
+        of the event tuple.
+    """
+    entries = sorted({event[0]: event[1][0] for event in event_list}.items())
+    source = _translation_source(
+        brief="event",
+        include="translateEvents.h",
+        entries=[(f"{event_id}", name) for event_id, name in entries],
+        date_string=date_string,
+        entry_type="EventTranslation",
+        id_type="EventId_t",
+        table_name="EVENT",
+        translate_signature="const char *translateEvents(Event event)",
+        id_expression="static_cast<EventId_t>(event & 0xFFFF)",
+        unknown_string="UNKNOWN_EVENT",
+        reverse_signature="bool translateEventName(const char *name, EventId_t &eventId)",
+        reverse_result="eventId",
+    )
+    header = _translation_header(
+        guard="FSFWCONFIG_EVENTS_TRANSLATEEVENTS_H_",
+        include='#include "fsfw/events/Event.h"',
+        declarations=[
+            "const char *translateEvents(Event event);",
+            "",
+            "/**",
+            " * Look up the ID of an event by its name.",
+            " * @return false if no event with this name exists",
+            " */",
+            "bool translateEventName(const char *name, EventId_t &eventId);",
+        ],
+    )
+    _write_file(file_name, source)
+    if header_file_name is not None:
+        _write_file(header_file_name, header)
+
+
+def write_object_translation_table(
+    file_name: str,
+    header_file_name: Optional[str],
+    list_of_entries: Iterable[Tuple[str, List[str]]],
+    date_string: str,
+):
+    """Write translateObjects.cpp and translateObjects.h
+
+    :param header_file_name: Header file, or None to only write the source file
+    :param list_of_entries: List of object ID hex strings and object entries. The name is
+        the first element of an object entry.
+    """
+    entries = sorted(
+        (int(object_id, 16), object_id, entry[0])
+        for object_id, entry in dict(list_of_entries).items()
+    )
+    source = _translation_source(
+        brief="object",
+        include="translateObjects.h",
+        entries=[(object_id, name) for _, object_id, name in entries],
+        date_string=date_string,
+        entry_type="ObjectTranslation",
+        id_type="object_id_t",
+        table_name="OBJECT",
+        translate_signature="const char *translateObject(object_id_t object)",
+        id_expression="object",
+        unknown_string="UNKNOWN_OBJECT",
+        reverse_signature=(
+            "bool translateObjectName(const char *name, object_id_t &objectId)"
+        ),
+        reverse_result="objectId",
+    )
+    header = _translation_header(
+        guard="FSFWCONFIG_OBJECTS_TRANSLATEOBJECTS_H_",
+        include="#include <fsfw/objectmanager/SystemObjectIF.h>",
+        declarations=[
+            "const char *translateObject(object_id_t object);",
+            "",
+            "/**",
+            " * Look up the ID of an object by its name.",
+            " * @return false if no object with this name exists",
+            " */",
+            "bool translateObjectName(const char *name, object_id_t &objectId);",
+        ],
+    )
+    _write_file(file_name, source)
+    if header_file_name is not None:
+        _write_file(header_file_name, header)
+
+
+def _translation_source(
+    brief: str,
+    include: str,
+    entries: List[Tuple[str, str]],
+    date_string: str,
+    entry_type: str,
+    id_type: str,
+    table_name: str,
+    translate_signature: str,
+    id_expression: str,
+    unknown_string: str,
+    reverse_signature: str,
+    reverse_result: str,
+) -> str:
+    # Names are sorted like strcmp compares them. Duplicate names resolve to the lowest ID.
+    name_index = sorted(
+        range(len(entries)), key=lambda index: (entries[index][1].encode(), index)
+    )
+    count = len(entries)
+    # Zero sized arrays are not allowed, so empty tables contain one unused element
+    table_rows = (
+        "\n".join(f'    {{{entry_id}, "{name}"}},' for entry_id, name in entries)
+        or '    {0, ""},'
+    )
+    index_rows = "\n".join(f"    {index}," for index in name_index) or "    0,"
+    return f"""/**
+ * @brief    Auto-generated {brief} translation file. Contains {count} translations.
+ * @details
+ * Generated on: {date_string}
+ */
+#include "{include}"
+
+#include <cstddef>
+#include <cstring>
+
+namespace {{
+
+struct {entry_type} {{
+  {id_type} id;
+  const char *name;
+}};
+
+constexpr size_t NUM_{table_name}_TRANSLATIONS = {count};
+
+// Sorted by ID
+constexpr {entry_type} {table_name}_TRANSLATIONS[] = {{
+{table_rows}
+}};
+
+// Indexes into {table_name}_TRANSLATIONS, sorted by name
+constexpr size_t {table_name}_NAME_INDEX[] = {{
+{index_rows}
+}};
+
+}}  // namespace
+
+{translate_signature} {{
+  const {id_type} id = {id_expression};
+  size_t low = 0;
+  size_t high = NUM_{table_name}_TRANSLATIONS;
+  while (low < high) {{
+    const size_t mid = low + (high - low) / 2;
+    if ({table_name}_TRANSLATIONS[mid].id < id) {{
+      low = mid + 1;
+    }} else {{
+      high = mid;
+    }}
+  }}
+  if (low < NUM_{table_name}_TRANSLATIONS && {table_name}_TRANSLATIONS[low].id == id) {{
+    return {table_name}_TRANSLATIONS[low].name;
+  }}
+  return "{unknown_string}";
+}}
+
+{reverse_signature} {{
+  if (name == nullptr) {{
+    return false;
+  }}
+  size_t low = 0;
+  size_t high = NUM_{table_name}_TRANSLATIONS;
+  while (low < high) {{
+    const size_t mid = low + (high - low) / 2;
+    const char *midName = {table_name}_TRANSLATIONS[{table_name}_NAME_INDEX[mid]].name;
+    if (std::strcmp(midName, name) < 0) {{
+      low = mid + 1;
+    }} else {{
+      high = mid;
+    }}
+  }}
+  if (low == NUM_{table_name}_TRANSLATIONS) {{
+    return false;
+  }}
+  const {entry_type} &translation = {table_name}_TRANSLATIONS[{table_name}_NAME_INDEX[low]];
+  if (std::strcmp(translation.name, name) == 0) {{
+    {reverse_result} = translation.id;
+    return true;
+  }}
+  return false;
+}}
+"""
+
+
+def _translation_header(guard: str, include: str, declarations: List[str]) -> str:
+    declaration_lines = "\n".join(declarations)
+    return f"""#ifndef {guard}
+#define {guard}
+
+{include}
+
+{declaration_lines}
+
+#endif /* {guard} */
+"""
+
+
+def _write_file(file_name: str, content: str):
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write(content)
@@ -0,0 +1,120 @@
+"""Streaming line source for the generator parsers.
+
+The parsers only look at one line at a time, so a file does not need to be read into a line
+list. A line source iterates the lines of a file lazily and closes the file when its context
+is left, even if parsing fails. Optionally, the file is checked for marker strings like
+[EXPORT] first: the check runs on a memory map of the file, and files without any marker
+yield no lines at all, without being decoded or split.
+"""
+import mmap
+import re
+from typing import Iterable, Iterator, Optional, Sequence
+
+EMPTY_LINES: Iterator[str] = iter(())
+
+
+def _markers_pattern(
+    markers: Sequence[str], ignore_case: bool = False
+) -> Optional["re.Pattern[bytes]"]:
+    """Return a bytes pattern which finds any of the markers, or None if no case
+    insensitive search is needed. Case sensitive markers are found with plain
+    substring searches."""
+    if not ignore_case:
+        return None
+    return re.compile(
+        b"|".join(re.escape(marker.encode()) for marker in markers), re.IGNORECASE
+    )
+
+
+def text_contains(text: str, markers: Sequence[str], ignore_case: bool = False) -> bool:
+    """Check whether a text which is already in memory contains any of the markers."""
+    if ignore_case:
+        text = text.lower()
+        return any(marker.lower() in text for marker in markers)
+    return any(marker in text for marker in markers)
+
+
+class LineSource:
+    """Context manager which yields the lines of a file lazily and closes the file on exit.
+
+    :param file_name: File to read
+    :param markers: If not empty, the file only yields lines if it contains any of these
+        strings
+    :param ignore_case: Match the markers case insensitive
+    :param use_mmap: Search the markers on a memory map of the file instead of reading it
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        markers: Sequence[str] = (),
+        ignore_case: bool = False,
+        use_mmap: bool = True,
+    ):
+        self.file_name = file_name
+        self.markers = tuple(markers)
+        self.ignore_case = ignore_case
+        self.use_mmap = use_mmap
+        self._file = None
+
+    def __enter__(self) -> Iterator[str]:
+        self._file = open(self.file_name, "r", encoding="utf-8")
+        try:
+            if self.markers and not self.__contains_marker():
+                return EMPTY_LINES
+        except BaseException:
+            self.close()
+            raise
+        return iter(self._file)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __contains_marker(self) -> bool:
+        pattern = _markers_pattern(self.markers, self.ignore_case)
+        if self.use_mmap:
+            try:
+                with mmap.mmap(
+                    self._file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as content:
+                    return self.__search(content, pattern)
+            except ValueError:
+                # Empty files can not be mapped
+                return False
+            except OSError:
+                # Not mappable, for example a pipe. Fall back to reading the file.
+                pass
+        content = self._file.buffer.read()
+        self._file.seek(0)
+        return self.__search(content, pattern)
+
+    def __search(self, content, pattern: Optional["re.Pattern[bytes]"]) -> bool:
+        if pattern is not None:
+            return pattern.search(content) is not None
+        return any(content.find(marker.encode()) >= 0 for marker in self.markers)
+
+
+class CachedLineSource:
+    """Line source for lines which are already in memory, with the same marker check."""
+
+    def __init__(
+        self, lines: Iterable[str], markers: Sequence[str] = (), ignore_case=False
+    ):
+        self.lines = lines
+        self.markers = tuple(markers)
+        self.ignore_case = ignore_case
+
+    def __enter__(self) -> Iterator[str]:
+        if self.markers and not text_contains(
+            "".join(self.lines), self.markers, self.ignore_case
+        ):
+            return EMPTY_LINES
+        return iter(self.lines)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1,77 @@
+"""Compact binary lookup tables for the TMTC client.
+
+Besides the CSV files, the generators write the event, object and returnvalue tables into a
+binary file which the TMTC client memory maps and binary searches without parsing it.
+All integers are little endian. The file layout is:
+
+- Header: magic ``FSLT``, format version (u16), field count F (u16), entry count N (u32)
+- Field names: F string references
+- IDs: N sorted u32 values
+- Records: N * F string references, the fields of entry i are located at record i
+- String blob: UTF-8 encoded strings, each string is stored only once
+
+A string reference is the offset of the string inside the blob (u32) and its length in bytes
+(u32). The loader in tmtc/utility/lookup_table.py mirrors this definition.
+"""
+import struct
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from fsfwgen.core import get_console_logger
+
+LOGGER = get_console_logger()
+
+LOOKUP_TABLE_MAGIC = b"FSLT"
+LOOKUP_TABLE_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+STRING_REF = struct.Struct("<II")
+ID = struct.Struct("<I")
+
+
+def write_lookup_table(
+    file_name: str,
+    fields: Sequence[str],
+    entries: Iterable[Tuple[int, Sequence[str]]],
+):
+    """Write a binary lookup table.
+
+    :param file_name: Output file
+    :param fields: Names of the string fields of each entry
+    :param entries: ID and field values of each entry. The order does not matter.
+    """
+    table: Dict[int, Sequence[str]] = dict()
+    for entry_id, values in entries:
+        if len(values) != len(fields):
+            raise ValueError(
+                f"Entry {entry_id:#010x} has {len(values)} fields, "
+                f"expected {len(fields)}"
+            )
+        if entry_id in table and table[entry_id] != values:
+            LOGGER.warning(
+                f"LookupTable: Duplicate ID {entry_id:#010x} in {file_name}, "
+                f"keeping {values[0]}"
+            )
+        table[entry_id] = values
+    blob = bytearray()
+    string_offsets: Dict[str, int] = dict()
+
+    def string_ref(string) -> bytes:
+        string = "" if string is None else str(string)
+        encoded = string.encode("utf-8")
+        offset = string_offsets.get(string)
+        if offset is None:
+            offset = len(blob)
+            string_offsets[string] = offset
+            blob.extend(encoded)
+        return STRING_REF.pack(offset, len(encoded))
+
+    sorted_ids = sorted(table)
+    parts: List[bytes] = [
+        HEADER.pack(LOOKUP_TABLE_MAGIC, LOOKUP_TABLE_VERSION, len(fields), len(table))
+    ]
+    parts.extend(string_ref(field) for field in fields)
+    parts.extend(ID.pack(entry_id) for entry_id in sorted_ids)
+    for entry_id in sorted_ids:
+        parts.extend(string_ref(value) for value in table[entry_id])
+    parts.append(bytes(blob))
+    with open(file_name, "wb") as file:
+        file.write(b"".join(parts))
@@ -0,0 +1,171 @@
+"""Query API for the generated mission database.
+
+The exporters store every ID twice: as an indexed integer column and as a hex string in one
+format for all tables, lower case with a 0x prefix and padded to the width of the ID type,
+for example 0x4301cafe for objects and 0x089a for events and returnvalues. All lookups go through the integer and name indexes with a fixed set of SQL
+statements, which are compiled once and then served from the statement cache of the
+connection.
+
+Example:
+
+>>> from utility.mission_db import lookup_event, lookup_retval, lookup_object
+>>> lookup_object(0x53000000).name
+'PUS_DISTRIBUTOR'
+"""
+import sqlite3
+import threading
+from typing import List, NamedTuple, Optional
+
+
+class EventEntry(NamedTuple):
+    event_id: int
+    name: str
+    severity: str
+    description: str
+    file: str
+
+
+class RetvalEntry(NamedTuple):
+    code: int
+    name: str
+    interface: str
+    file: str
+    description: str
+
+
+class ObjectEntry(NamedTuple):
+    object_id: int
+    name: str
+
+
+SELECT_EVENT = (
+    "SELECT eventidInt, name, severity, description, file FROM Events "
+    "WHERE eventidInt=?"
+)
+SELECT_EVENTS_BY_NAME = (
+    "SELECT eventidInt, name, severity, description, file FROM Events "
+    "WHERE name=? ORDER BY eventidInt"
+)
+SELECT_RETVAL = (
+    "SELECT codeInt, name, interface, file, description FROM Returnvalues "
+    "WHERE codeInt=?"
+)
+SELECT_RETVALS_BY_NAME = (
+    "SELECT codeInt, name, interface, file, description FROM Returnvalues "
+    "WHERE name=? ORDER BY codeInt"
+)
+SELECT_OBJECT = "SELECT objectidInt, name FROM Objects WHERE objectidInt=?"
+SELECT_OBJECTS_BY_NAME = (
+    "SELECT objectidInt, name FROM Objects WHERE name=? ORDER BY objectidInt"
+)
+
+
+class MissionDatabase:
+    """Read-only access to the mission database. The connection is shared between threads
+    and guarded by a lock.
+
+    :param db_filename: Path of the database generated by the exporters
+    """
+
+    def __init__(self, db_filename: str):
+        self.db_filename = db_filename
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            f"file:{db_filename}?mode=ro", uri=True, check_same_thread=False
+        )
+
+    def lookup_event(self, event_id: int) -> Optional[EventEntry]:
+        row = self.__fetch_one(SELECT_EVENT, event_id)
+        return EventEntry(*row) if row is not None else None
+
+    def lookup_retval(self, code: int) -> Optional[RetvalEntry]:
+        row = self.__fetch_one(SELECT_RETVAL, code)
+        return RetvalEntry(*row) if row is not None else None
+
+    def lookup_object(self, object_id: int) -> Optional[ObjectEntry]:
+        row = self.__fetch_one(SELECT_OBJECT, object_id)
+        return ObjectEntry(*row) if row is not None else None
+
+    def find_events(self, name: str) -> List[EventEntry]:
+        """Reverse lookup. Event names are only unique within a subsystem, so all
+        matching events are returned."""
+        return [
+            EventEntry(*row) for row in self.__fetch_all(SELECT_EVENTS_BY_NAME, name)
+        ]
+
+    def find_retvals(self, name: str) -> List[RetvalEntry]:
+        """Reverse lookup. Returnvalue names are only unique within an interface, so all
+        matching returnvalues are returned."""
+        return [
+            RetvalEntry(*row) for row in self.__fetch_all(SELECT_RETVALS_BY_NAME, name)
+        ]
+
+    def find_objects(self, name: str) -> List[ObjectEntry]:
+        return [
+            ObjectEntry(*row) for row in self.__fetch_all(SELECT_OBJECTS_BY_NAME, name)
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __fetch_one(self, statement: str, value) -> Optional[tuple]:
+        with self._lock:
+            return self._connection.execute(statement, (value,)).fetchone()
+
+    def __fetch_all(self, statement: str, value) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(statement, (value,)).fetchall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_DEFAULT_DATABASE: Optional[MissionDatabase] = None
+
+
+def open_database(db_filename: Optional[str] = None) -> MissionDatabase:
+    """Open the database used by the module level lookup functions. Without a file name,
+    the database generated into the generators folder is used."""
+    global _DEFAULT_DATABASE
+    if db_filename is None:
+        from definitions import DATABASE_NAME, ROOT_DIR
+
+        db_filename = f"{ROOT_DIR}/{DATABASE_NAME}"
+    if _DEFAULT_DATABASE is not None:
+        _DEFAULT_DATABASE.close()
+    _DEFAULT_DATABASE = MissionDatabase(db_filename)
+    return _DEFAULT_DATABASE
+
+
+def _default_database() -> MissionDatabase:
+    if _DEFAULT_DATABASE is None:
+        return open_database()
+    return _DEFAULT_DATABASE
+
+
+def lookup_event(event_id: int) -> Optional[EventEntry]:
+    return _default_database().lookup_event(event_id)
+
+
+def lookup_retval(code: int) -> Optional[RetvalEntry]:
+    return _default_database().lookup_retval(code)
+
+
+def lookup_object(object_id: int) -> Optional[ObjectEntry]:
+    return _default_database().lookup_object(object_id)
+
+
+def find_events(name: str) -> List[EventEntry]:
+    return _default_database().find_events(name)
+
+
+def find_retvals(name: str) -> List[RetvalEntry]:
+    return _default_database().find_retvals(name)
+
+
+def find_objects(name: str) -> List[ObjectEntry]:
+    return _default_database().find_objects(name)
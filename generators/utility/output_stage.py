@@ -0,0 +1,99 @@
+"""Write-if-changed output stage for the generated files.
+
+The generators write their files into temporary locations handed out by the stage. When the
+stage is committed, every file is compared with the existing one, ignoring the generation
+timestamp. Unchanged files and their copies are not touched, so the build system does not
+recompile and relink targets which include them.
+"""
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+from fsfwgen.core import get_console_logger
+
+LOGGER = get_console_logger()
+
+TIMESTAMP_MARKER = b"Generated on:"
+TEMPORARY_SUFFIX = ".new"
+
+
+class OutputStage:
+    """Collects generated files and only writes and copies the ones which changed.
+
+    Example:
+
+    >>> with OutputStage() as output:
+    ...     write_translation_file(output.path(CPP_FILENAME, CPP_COPY_DESTINATION), ...)
+    """
+
+    def __init__(self):
+        self._staged_files: List[Tuple[str, Tuple[str, ...]]] = []
+        self.written_files: List[str] = []
+
+    def path(self, file_name: str, *copy_destinations: Optional[str]) -> str:
+        """Stage a generated file.
+
+        :param file_name: Final location of the generated file
+        :param copy_destinations: Files or directories the generated file is copied to.
+            None entries are ignored, which allows to disable copies with a flag.
+        :return: Temporary file name the generator should write to
+        """
+        destinations = tuple(
+            destination for destination in copy_destinations if destination is not None
+        )
+        self._staged_files.append((file_name, destinations))
+        return f"{file_name}{TEMPORARY_SUFFIX}"
+
+    def commit(self) -> List[str]:
+        """Move all changed files into place and copy them to their destinations.
+
+        :return: List of all files which were written
+        """
+        for file_name, destinations in self._staged_files:
+            temporary_file = f"{file_name}{TEMPORARY_SUFFIX}"
+            if not os.path.isfile(temporary_file):
+                continue
+            if file_content_equal(temporary_file, file_name):
+                os.remove(temporary_file)
+            else:
+                os.replace(temporary_file, file_name)
+                self.written_files.append(file_name)
+            for destination in destinations:
+                if os.path.isdir(destination) or destination.endswith("/"):
+                    destination = os.path.join(destination, os.path.basename(file_name))
+                if not file_content_equal(file_name, destination):
+                    shutil.copyfile(file_name, destination)
+                    self.written_files.append(destination)
+        self._staged_files = []
+        if self.written_files:
+            LOGGER.info(f"OutputStage: Updated {len(self.written_files)} files")
+        return self.written_files
+
+    def discard(self):
+        for file_name, _ in self._staged_files:
+            temporary_file = f"{file_name}{TEMPORARY_SUFFIX}"
+            if os.path.isfile(temporary_file):
+                os.remove(temporary_file)
+        self._staged_files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def file_content_equal(first_file: str, second_file: str) -> bool:
+    """Compare two generated files, ignoring the lines containing the generation timestamp.
+    Binary files are compared byte by byte."""
+    if not os.path.isfile(first_file) or not os.path.isfile(second_file):
+        return False
+    return _read_without_timestamp(first_file) == _read_without_timestamp(second_file)
+
+
+def _read_without_timestamp(file_name: str) -> List[bytes]:
+    with open(file_name, "rb") as file:
+        return [line for line in file if TIMESTAMP_MARKER not in line]
@@ -0,0 +1,233 @@
+"""Persistent incremental cache for the generator parse results.
+
+The parse results of every header are stored together with the modification time, the size
+and a content hash of the header. On a rerun, only headers which actually changed are parsed
+again and their entries are merged with the cached entries of all other headers.
+Headers which need to be parsed can be distributed across a process pool.
+"""
+import hashlib
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fsfwgen.core import get_console_logger
+from fsfwgen.parserbase.parser import FileParser
+
+from utility.source_scanner import SourceScanner
+
+LOGGER = get_console_logger()
+
+# Increment this when the layout of the cache or of the cached tables changes
+CACHE_VERSION = 3
+
+ParserFactory = Callable[[List[str]], FileParser]
+
+
+@dataclass
+class CachedUnit:
+    """Parse result of a group of files which are always parsed together. This is a single
+    header for most parsers."""
+
+    stamps: Tuple[Tuple[int, int], ...]
+    digest: str
+    table: Optional[dict]
+
+
+@dataclass
+class CachedTable:
+    context_digest: str
+    units: Dict[Tuple[str, ...], CachedUnit]
+
+
+class ParseCache:
+    """Incremental parsing front end for the generic file parsers.
+
+    If no cache file is supplied, nothing is persisted and all files are parsed on
+    every run. If more than one job is configured, the files which need to be parsed are
+    split across a pool of worker processes.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, jobs: int = 1):
+        self.cache_file = cache_file
+        self.jobs = max(jobs, 1)
+        self._tables: Dict[str, CachedTable] = dict()
+
+    def load(self):
+        if self.cache_file is None or not os.path.isfile(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "rb") as file:
+                version, tables = pickle.load(file)
+        # Unpickling fails with AttributeError or ImportError if a pickled class was
+        # renamed or moved
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            ImportError,
+        ):
+            LOGGER.warning(f"ParseCache: Could not read {self.cache_file}, ignoring it")
+            return
+        if version == CACHE_VERSION:
+            self._tables = tables
+
+    def save(self):
+        if self.cache_file is None:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "wb") as file:
+            pickle.dump((CACHE_VERSION, self._tables), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.cache_file)
+
+    def clear(self):
+        self._tables = dict()
+
+    def parse(
+        self,
+        table_name: str,
+        file_list: List[str],
+        parser_factory: ParserFactory,
+        scanner: SourceScanner,
+        context: Any = None,
+        parse_args: tuple = (),
+        split_files: bool = True,
+    ) -> dict:
+        """Parse a list of files, re-using the cached results of unchanged files.
+
+        :param table_name: Unique name of the resulting table inside the cache
+        :param file_list: Files to parse
+        :param parser_factory: Creates a parser for a given list of files
+        :param scanner: Used to read the file contents
+        :param context: Everything besides the file contents the parse result depends on,
+            for example the subsystem table for events. All cached entries of the table are
+            dropped if it changes.
+        :param parse_args: Positional arguments passed to the parse_files call of the parser
+        :param split_files: If True, every file is parsed and cached on its own. Set to False
+            for parsers which carry state from one file into the next.
+        :return: Merged table of all files
+        """
+        context_digest = hashlib.sha1(repr(context).encode()).hexdigest()
+        cached_table = self._tables.get(table_name)
+        if cached_table is None or cached_table.context_digest != context_digest:
+            cached_table = CachedTable(context_digest=context_digest, units=dict())
+        if split_files:
+            unit_list = [(file_name,) for file_name in file_list]
+        else:
+            unit_list = [tuple(file_list)]
+
+        unit_keys = [
+            tuple(os.path.realpath(file_name) for file_name in unit)
+            for unit in unit_list
+        ]
+        new_units = dict()
+        pending_units = []
+        pending_keys = []
+        for unit, key in zip(unit_list, unit_keys):
+            if key in new_units:
+                continue
+            cached_unit = self.__validate_unit(
+                cached_table.units.get(key), unit, scanner
+            )
+            if cached_unit.table is None:
+                pending_units.append(unit)
+                pending_keys.append(key)
+            new_units[key] = cached_unit
+        parsed_tables = self.__parse_units(
+            pending_units, parser_factory, scanner, parse_args
+        )
+        for key, table in zip(pending_keys, parsed_tables):
+            new_units[key].table = table
+        # The merge is always done in the order of the file list, no matter which files were
+        # parsed, cached or distributed across worker processes.
+        merged_table = dict()
+        for unit, key in zip(unit_list, unit_keys):
+            self.__merge_table(table_name, merged_table, new_units[key].table, unit)
+        parsed_count = len(pending_units)
+        cached_table.units = new_units
+        self._tables[table_name] = cached_table
+        LOGGER.info(
+            f"ParseCache: {table_name}: Parsed {parsed_count} of {len(new_units)} "
+            f"file groups, {len(new_units) - parsed_count} were cached"
+        )
+        return merged_table
+
+    def __parse_units(
+        self,
+        units: List[Tuple[str, ...]],
+        parser_factory: ParserFactory,
+        scanner: SourceScanner,
+        parse_args: tuple,
+    ) -> List[dict]:
+        if self.jobs == 1 or len(units) <= 1:
+            return [
+                dict(
+                    scanner.attach(parser_factory(list(unit))).parse_files(*parse_args)
+                )
+                for unit in units
+            ]
+        # Use a few chunks per worker so that one chunk of large headers does not stall
+        # the whole pool
+        chunk_count = min(len(units), self.jobs * 4)
+        chunk_size = math.ceil(len(units) / chunk_count)
+        chunks = [units[i : i + chunk_size] for i in range(0, len(units), chunk_size)]
+        tables = []
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            for chunk_tables in executor.map(
+                parse_units_in_worker,
+                [parser_factory] * len(chunks),
+                chunks,
+                [parse_args] * len(chunks),
+            ):
+                tables.extend(chunk_tables)
+        return tables
+
+    @staticmethod
+    def __validate_unit(
+        cached_unit: Optional[CachedUnit], unit: Tuple[str, ...], scanner: SourceScanner
+    ) -> CachedUnit:
+        """Return the cached unit if it is still valid. Otherwise, a new unit without a table
+        is returned. Files are only read if their modification time or size changed."""
+        stamps = []
+        for file_name in unit:
+            stat = os.stat(file_name)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        stamps = tuple(stamps)
+        if cached_unit is not None and cached_unit.stamps == stamps:
+            return cached_unit
+        digest = hashlib.sha1()
+        for file_name in unit:
+            digest.update("".join(scanner.lines(file_name)).encode())
+        digest = digest.hexdigest()
+        if cached_unit is not None and cached_unit.digest == digest:
+            cached_unit.stamps = stamps
+            return cached_unit
+        return CachedUnit(stamps=stamps, digest=digest, table=None)
+
+    @staticmethod
+    def __merge_table(
+        table_name: str, merged_table: dict, table: dict, unit: Tuple[str, ...]
+    ):
+        for key, entry in table.items():
+            if key in merged_table and merged_table[key] != entry:
+                LOGGER.warning(
+                    f"ParseCache: {table_name}: Duplicate entry {key} in {unit[0]}"
+                )
+            merged_table[key] = entry
+
+
+def parse_units_in_worker(
+    parser_factory: ParserFactory, units: List[Tuple[str, ...]], parse_args: tuple
+) -> List[dict]:
+    """Parse a chunk of file groups inside a worker process. The parser factory needs to be
+    picklable, so it has to be a module level function or a partial of one."""
+    scanner = SourceScanner()
+    return [
+        dict(scanner.attach(parser_factory(list(unit))).parse_files(*parse_args))
+        for unit in units
+    ]
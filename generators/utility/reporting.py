@@ -0,0 +1,66 @@
+"""Console and log output of the generators.
+
+In the default interactive mode, parsed tables are pretty printed to the console. In batch
+mode, which is intended for CI runs and build hooks, nothing but the log messages is printed.
+Table dumps and the execution time of every stage are written as JSON lines into an optional
+structured log file instead.
+"""
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from fsfwgen.core import get_console_logger
+from fsfwgen.utility.printer import PrettyPrinter
+
+LOGGER = get_console_logger()
+
+BATCH_MODE = False
+LOG_FILE: Optional[str] = None
+STAGE_TIMES: Dict[str, float] = dict()
+
+
+def configure(batch_mode: bool, log_file: Optional[str] = None):
+    global BATCH_MODE, LOG_FILE
+    BATCH_MODE = batch_mode
+    LOG_FILE = log_file
+    STAGE_TIMES.clear()
+    if LOG_FILE is not None:
+        # Start a new log for every run
+        open(LOG_FILE, "w").close()
+
+
+def dump_table(name: str, table: Any):
+    """Pretty print a table in interactive mode and write it to the structured log,
+    if one is configured."""
+    if not BATCH_MODE:
+        PrettyPrinter.pprint(table)
+    if isinstance(table, dict):
+        table = list(table.items())
+    _write_log_record({"type": "table", "name": name, "entries": table})
+
+
+@contextmanager
+def stage(name: str):
+    """Measure the execution time of a generator stage."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        STAGE_TIMES[name] = STAGE_TIMES.get(name, 0.0) + duration
+        _write_log_record({"type": "stage", "name": name, "seconds": duration})
+
+
+def report_stage_times():
+    """Log the accumulated execution times of all stages."""
+    for name, duration in STAGE_TIMES.items():
+        LOGGER.info(f"Stage {name}: {duration * 1000:.1f} ms")
+
+
+def _write_log_record(record: dict):
+    if LOG_FILE is None:
+        return
+    with open(LOG_FILE, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record, default=str))
+        file.write("\n")
@@ -0,0 +1,129 @@
+"""Shared header scanner for the generators.
+
+The event, returnvalue, object and subservice parsers all work on header files which are
+located in overlapping source trees (bsp_hosted, fsfw and example_common). Instead of every
+generator walking these trees on its own, one scanner lists each directory once and keeps
+the text of the headers it read in memory.
+
+The parsers of this package read through the scanner, so the many headers searched for
+events, returnvalues, subservices and packet content are read once. The content hashes of
+the parse cache are taken from the scanner as well. The fsfwgen parsers for the object,
+subsystem and interface definitions open their files themselves in their regular parsing
+mode. These few definition files are therefore read a second time when they are parsed.
+"""
+import os
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from fsfwgen.parserbase.parser import FileParser
+
+from utility.line_source import CachedLineSource
+
+
+class SourceScanner:
+    """Lists and reads header files once and shares the result between parsers."""
+
+    def __init__(self):
+        # Directory listings, keyed by the real path of the directory. Each entry is a tuple
+        # of the entry name and whether it is a file or a directory.
+        self._dir_listings: Dict[str, List[Tuple[str, bool, bool]]] = dict()
+        # File contents, keyed by the real path of the file
+        self._lines: Dict[str, List[str]] = dict()
+
+    @property
+    def files_read(self) -> int:
+        return len(self._lines)
+
+    def header_files(
+        self, destinations: Union[str, List[str]], search_recursively: bool = True
+    ) -> List[str]:
+        """Return all header files in the given destinations. The list has the same order
+        and path format as the one returned by FileListParser.parse_header_files, but
+        directories which were already listed before are not walked again.
+
+        :param destinations: Directory or list of directories to search
+        :param search_recursively: Also search all subdirectories
+        :return: List of header file paths
+        """
+        if isinstance(destinations, (str, os.PathLike)):
+            destinations = [destinations]
+        header_files = []
+        for destination in destinations:
+            self.__collect_header_files(
+                str(destination), search_recursively, header_files
+            )
+        return header_files
+
+    def lines(self, file_name: str) -> List[str]:
+        """Return all lines of a file. The file is only read on the first request."""
+        key = os.path.realpath(file_name)
+        lines = self._lines.get(key)
+        if lines is None:
+            with open(file_name, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+            self._lines[key] = lines
+        return lines
+
+    def line_source(
+        self, file_name: str, markers: Sequence[str] = (), ignore_case: bool = False
+    ) -> CachedLineSource:
+        """Return a line source which serves the cached lines of a file, see LineSource."""
+        return CachedLineSource(self.lines(file_name), markers, ignore_case)
+
+    def forget(self, file_names: Iterable[str]):
+        """Drop the cached content of changed files, and the listings of their directories
+        in case files were added or removed. For a directory, the cached contents and
+        listings of everything below it are dropped, for example when the watcher lost
+        track of the changes inside a watched directory."""
+        directory_prefixes = []
+        for file_name in file_names:
+            key = os.path.realpath(file_name)
+            self._lines.pop(key, None)
+            self._dir_listings.pop(os.path.dirname(key), None)
+            if os.path.isdir(key):
+                self._dir_listings.pop(key, None)
+                directory_prefixes.append(key.rstrip(os.sep) + os.sep)
+        if directory_prefixes:
+            prefixes = tuple(directory_prefixes)
+            for cache in (self._lines, self._dir_listings):
+                for key in [key for key in cache if key.startswith(prefixes)]:
+                    del cache[key]
+
+    def attach(self, parser: FileParser) -> FileParser:
+        """Serve the file contents for a parser from the scanner instead of the file system.
+        The parsers of this package read through their _line_source hook, which is replaced
+        by the cached line source of the scanner. The _open_file hook of the generic file
+        parser is only used in its moving window mode and replaced as well. Parsers which
+        open their files themselves, like the regular mode parsers of fsfwgen, still read
+        from the file system.
+
+        :return: The attached parser, for convenience
+        """
+        parser._open_file = self.lines
+        parser._line_source = self.line_source
+        return parser
+
+    def __collect_header_files(
+        self, base_directory: str, search_recursively: bool, header_files: List[str]
+    ):
+        if base_directory[-1] != "/":
+            base_directory += "/"
+        local_header_files = []
+        for entry_name, is_file, is_dir in self.__list_dir(base_directory):
+            if is_file and entry_name.endswith(".h") and entry_name[0] not in "._":
+                local_header_files.append(base_directory + entry_name)
+            elif is_dir and search_recursively:
+                self.__collect_header_files(
+                    base_directory + entry_name, search_recursively, header_files
+                )
+        header_files.extend(local_header_files)
+
+    def __list_dir(self, directory: str) -> List[Tuple[str, bool, bool]]:
+        key = os.path.realpath(directory)
+        listing = self._dir_listings.get(key)
+        if listing is None:
+            listing = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    listing.append((entry.name, entry.is_file(), entry.is_dir()))
+            self._dir_listings[key] = listing
+        return listing
@@ -0,0 +1,190 @@
+"""SQL export engine for the mission database.
+
+All tables are written in bulk inside one transaction per export. Instead of dropping and
+recreating the tables, rows are inserted or updated by their natural key and only the rows
+which actually changed are touched. The database runs in WAL mode, so readers of the database
+always see either the old or the new table content, but never an empty table.
+
+Every table carries a schema version. If the version stored in the database does not match,
+the table is recreated inside the export transaction.
+"""
+import sqlite3
+from typing import Any, Iterable, List, Sequence, Tuple
+
+from fsfwgen.core import get_console_logger
+
+LOGGER = get_console_logger()
+
+SCHEMA_VERSION_TABLE = "SchemaVersion"
+
+
+class SqlTable:
+    """Definition of a table in the mission database.
+
+    :param name: Table name
+    :param columns: Column names and SQL types, without the implicit id column
+    :param key_columns: Columns which form the natural key of a row. IDs are keyed by
+        their integer column, so differently formatted IDs always map to the same row.
+    :param indexes: Additional indexes. Each index is a tuple of the index name, the
+        indexed columns and whether the index is unique.
+    :param version: Schema version. Increment it whenever the columns or indexes change.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[Tuple[str, str]],
+        key_columns: Sequence[str],
+        indexes: Sequence[Tuple[str, Sequence[str], bool]] = (),
+        version: int = 1,
+    ):
+        self.name = name
+        self.columns = list(columns)
+        self.column_names = [column[0] for column in self.columns]
+        self.key_columns = list(key_columns)
+        self.key_indexes = [self.column_names.index(key) for key in self.key_columns]
+        self.indexes = list(indexes)
+        self.version = version
+
+    @property
+    def create_cmd(self) -> str:
+        column_definitions = "".join(
+            f"    {name:<16}{sql_type},\n" for name, sql_type in self.columns
+        )
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.name}(\n"
+            f"    id              INTEGER PRIMARY KEY,\n"
+            f"{column_definitions}"
+            f"    UNIQUE({', '.join(self.key_columns)})\n"
+            f")"
+        )
+
+    @property
+    def create_index_cmds(self) -> List[str]:
+        return [
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+            f"{self.name}_{index_name} ON {self.name}({', '.join(columns)})"
+            for index_name, columns, unique in self.indexes
+        ]
+
+    @property
+    def select_cmd(self) -> str:
+        return f"SELECT {', '.join(self.column_names)} FROM {self.name}"
+
+    @property
+    def upsert_cmd(self) -> str:
+        updates = ", ".join(
+            f"{name}=excluded.{name}"
+            for name in self.column_names
+            if name not in self.key_columns
+        )
+        conflict_action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+        return (
+            f"INSERT INTO {self.name}({', '.join(self.column_names)}) "
+            f"VALUES({', '.join('?' * len(self.column_names))}) "
+            f"ON CONFLICT({', '.join(self.key_columns)}) {conflict_action}"
+        )
+
+    @property
+    def delete_cmd(self) -> str:
+        condition = " AND ".join(f"{name}=?" for name in self.key_columns)
+        return f"DELETE FROM {self.name} WHERE {condition}"
+
+    def key(self, row: tuple) -> tuple:
+        return tuple(row[index] for index in self.key_indexes)
+
+    def normalize(self, row: Iterable[Any]) -> tuple:
+        """Convert a row to the values SQLite will store, so new rows can be compared with
+        the rows read back from the database."""
+        return tuple(
+            _to_sql_value(value, sql_type)
+            for value, (_, sql_type) in zip(row, self.columns)
+        )
+
+
+class SqlExporter:
+    """Writes tables into the mission database."""
+
+    def __init__(self, db_filename: str):
+        self.db_filename = db_filename
+
+    def export(self, table: SqlTable, rows: Iterable[Iterable[Any]]):
+        """Bring a table in the database in line with the given rows. Rows are matched by
+        their natural key. New and changed rows are upserted, rows which do not exist
+        anymore are deleted. Everything is done inside one transaction.
+        """
+        new_rows = dict()
+        for row in rows:
+            row = table.normalize(row)
+            new_rows[table.key(row)] = row
+        # Transactions are handled explicitly, so that schema changes are part of them
+        connection = sqlite3.connect(self.db_filename, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.__update_schema(connection, table)
+                old_rows = {
+                    table.key(row): row
+                    for row in connection.execute(table.select_cmd).fetchall()
+                }
+                changed_rows = [
+                    row for key, row in new_rows.items() if old_rows.get(key) != row
+                ]
+                removed_keys = [key for key in old_rows if key not in new_rows]
+                connection.executemany(table.upsert_cmd, changed_rows)
+                connection.executemany(table.delete_cmd, removed_keys)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.close()
+        LOGGER.info(
+            f"SqlExporter: {table.name}: {len(changed_rows)} rows upserted, "
+            f"{len(removed_keys)} rows deleted, {len(new_rows)} rows total"
+        )
+
+    @staticmethod
+    def __update_schema(connection: sqlite3.Connection, table: SqlTable):
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE}("
+            f"tableName TEXT PRIMARY KEY, version INTEGER)"
+        )
+        stored_version = connection.execute(
+            f"SELECT version FROM {SCHEMA_VERSION_TABLE} WHERE tableName=?",
+            (table.name,),
+        ).fetchone()
+        if stored_version is None or stored_version[0] != table.version:
+            LOGGER.info(
+                f"SqlExporter: Creating table {table.name} with schema version "
+                f"{table.version}"
+            )
+            connection.execute(f"DROP TABLE IF EXISTS {table.name}")
+            connection.execute(
+                f"INSERT OR REPLACE INTO {SCHEMA_VERSION_TABLE}(tableName, version) "
+                f"VALUES(?, ?)",
+                (table.name, table.version),
+            )
+        connection.execute(table.create_cmd)
+        for create_index_cmd in table.create_index_cmds:
+            connection.execute(create_index_cmd)
+
+
+def hex_id(value: int, digits: int) -> str:
+    """Text form of the IDs in the mission database: lower case hex with a 0x prefix,
+    padded to the number of hex digits of the ID type."""
+    return f"{value:#0{digits + 2}x}"
+
+
+def _to_sql_value(value: Any, sql_type: str) -> Any:
+    if value is None:
+        return None
+    if sql_type == "INTEGER":
+        if isinstance(value, str):
+            try:
+                return int(value.strip(), 0)
+            except ValueError:
+                return value
+        return int(value)
+    return str(value)
@@ -0,0 +1,216 @@
+"""File system watcher used by the watch mode of the generators.
+
+On Linux, the watcher uses inotify through the C library. On all other systems, or if inotify
+is not available, it falls back to polling the modification times of the headers.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from fsfwgen.core import get_console_logger
+
+LOGGER = get_console_logger()
+
+POLL_INTERVAL = 0.5
+# Changes arriving within this time after the first change are handled together
+DEBOUNCE_TIME = 0.1
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+)
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+class HeaderWatcher:
+    """Watches a list of directories and single files for changed headers.
+
+    :param paths: Directories, which are watched recursively, or single files
+    :param ignored_files: Files which are never reported, for example generated headers
+        which are located inside one of the watched directories.
+    """
+
+    def __init__(self, paths: Iterable[str], ignored_files: Iterable[str] = ()):
+        self.paths = [os.path.realpath(path) for path in paths]
+        self.ignored_files = {os.path.realpath(path) for path in ignored_files}
+        self._inotify = None
+        self._watch_descriptors: Dict[int, str] = dict()
+        self._snapshot: Dict[str, tuple] = dict()
+        if sys.platform.startswith("linux"):
+            self._inotify = self.__init_inotify()
+        if self._inotify is None:
+            LOGGER.info("HeaderWatcher: Polling for header changes")
+            self._snapshot = self.__take_snapshot()
+        else:
+            LOGGER.info(
+                f"HeaderWatcher: Watching {len(self._watch_descriptors)} directories"
+            )
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until at least one header changed or the timeout expired.
+
+        :return: Real paths of all changed headers
+        """
+        start_time = time.monotonic()
+        while True:
+            if self._inotify is not None:
+                changed_files = self.__read_inotify_events(POLL_INTERVAL)
+            else:
+                time.sleep(POLL_INTERVAL)
+                changed_files = self.__poll_changes()
+            if changed_files:
+                time.sleep(DEBOUNCE_TIME)
+                if self._inotify is not None:
+                    changed_files |= self.__read_inotify_events(0)
+                else:
+                    changed_files |= self.__poll_changes()
+                return changed_files
+            if timeout is not None and time.monotonic() - start_time > timeout:
+                return set()
+
+    @staticmethod
+    def covers(changed_file: str, paths: Iterable[str]) -> bool:
+        """Check whether a changed file is one of the given files or is located below one of
+        the given directories."""
+        for path in paths:
+            path = os.path.realpath(path)
+            if changed_file == path or changed_file.startswith(path + os.sep):
+                return True
+        return False
+
+    def __is_relevant(self, file_name: str) -> bool:
+        return (
+            file_name.endswith(".h")
+            and file_name not in self.ignored_files
+            and self.covers(file_name, self.paths)
+        )
+
+    def __init_inotify(self):
+        library_name = ctypes.util.find_library("c")
+        if library_name is None:
+            return None
+        try:
+            libc = ctypes.CDLL(library_name, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        self._inotify = (libc, fd)
+        for path in self.paths:
+            if os.path.isdir(path):
+                for directory, _, _ in os.walk(path):
+                    self.__add_watch(directory)
+            else:
+                # Single files are watched through their directory, because editors often
+                # replace files instead of writing them in place
+                self.__add_watch(os.path.dirname(path))
+        return self._inotify
+
+    def __add_watch(self, directory: str):
+        libc, fd = self._inotify
+        wd = libc.inotify_add_watch(fd, directory.encode(), INOTIFY_MASK)
+        if wd < 0:
+            LOGGER.warning(
+                f"HeaderWatcher: Can not watch {directory}: "
+                f"{os.strerror(ctypes.get_errno())}"
+            )
+            return
+        self._watch_descriptors[wd] = directory
+
+    def __read_inotify_events(self, timeout: float) -> Set[str]:
+        _, fd = self._inotify
+        changed_files = set()
+        while True:
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if not readable:
+                return changed_files
+            # Only wait for the first batch of events
+            timeout = 0
+            try:
+                buffer = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                return changed_files
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, name_len = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name = buffer[offset : offset + name_len].rstrip(b"\0").decode()
+                offset += name_len
+                if mask & IN_Q_OVERFLOW:
+                    # Changes were lost, so everything below the watched paths is reported.
+                    # The source scanner drops all cached contents below a directory.
+                    LOGGER.warning("HeaderWatcher: Event queue overflow")
+                    changed_files |= set(self.paths)
+                    continue
+                directory = self._watch_descriptors.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and self.covers(
+                        path, self.paths
+                    ):
+                        for new_directory, _, _ in os.walk(path):
+                            self.__add_watch(new_directory)
+                    continue
+                if self.__is_relevant(path):
+                    changed_files.add(path)
+
+    def __take_snapshot(self) -> Dict[str, tuple]:
+        snapshot = dict()
+        for path in self.paths:
+            if os.path.isdir(path):
+                for directory, _, file_names in os.walk(path):
+                    for file_name in file_names:
+                        self.__add_to_snapshot(
+                            snapshot, os.path.join(directory, file_name)
+                        )
+            else:
+                self.__add_to_snapshot(snapshot, path)
+        return snapshot
+
+    def __add_to_snapshot(self, snapshot: Dict[str, tuple], file_name: str):
+        if not self.__is_relevant(file_name):
+            return
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return
+        snapshot[file_name] = (stat.st_mtime_ns, stat.st_size)
+
+    def __poll_changes(self) -> Set[str]:
+        snapshot = self.__take_snapshot()
+        changed_files = {
+            file_name
+            for file_name in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(file_name) != self._snapshot.get(file_name)
+        }
+        self._snapshot = snapshot
+        return changed_files
+
+
+def affected_targets(
+    changed_files: Set[str], targets: Dict[str, List[str]]
+) -> List[str]:
+    """Return the names of all targets which contain at least one of the changed files,
+    in the order of the target dictionary."""
+    return [
+        name
+        for name, paths in targets.items()
+        if any(
+            HeaderWatcher.covers(changed_file, paths) for changed_file in changed_files
+        )
+    ]
@@ -0,0 +1,222 @@
+"""Local UDP stand-in for the hosted OBSW.
+
+The stand-in binds to the UDP address of the hosted OBSW and sends telemetry to the client
+which sent the last telecommand, like the UDP bridge of the OBSW does. It answers every
+telecommand with acceptance, start and completion success reports and streams telemetry at a
+fixed rate. The telemetry is either synthesized or replayed from a binary raw log.
+
+Synthesized telemetry packets are housekeeping reports. The first bytes of their source data
+contain a marker, a sequence number and the monotonic send time in nanoseconds, so the
+receiver can detect drops and measure the latency. Replayed housekeeping reports do not carry
+the marker and are not used for latency measurements.
+
+Run it standalone to test tmtcc.py against it:
+
+    python3 -m benchmark.obsw_standin --rate 1000 --duration 30
+"""
+import argparse
+import json
+import socket
+import struct
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from crcmod.predefined import mkPredefinedCrcFun
+from spacepackets.ecss.pus_1_verification import (
+    RequestId,
+    Service1Tm,
+    Subservices,
+    VerificationParams,
+)
+from spacepackets.ecss.tm import PusTelemetry
+
+DEFAULT_ADDRESS = ("127.0.0.1", 7301)
+DEFAULT_APID = 0xEF
+# Marker, sequence number and monotonic send time in nanoseconds
+STAMP = struct.Struct("!4sIQ")
+STAMP_MARKER = b"SIOB"
+STAMP_SERVICE = 3
+STAMP_SUBSERVICE = 25
+# Packets are sent in bursts with this interval
+BURST_INTERVAL = 0.001
+CRC16 = mkPredefinedCrcFun("crc-ccitt-false")
+# Offset of the source data of a telemetry packet with the default secondary header
+STAMP_OFFSET = (
+    len(PusTelemetry(service=STAMP_SERVICE, subservice=STAMP_SUBSERVICE, apid=0).pack())
+    - 2
+)
+
+
+class StandInResult(NamedTuple):
+    sent: int
+    sent_bytes: int
+    telecommands: int
+    duration: float
+
+
+class ObswStandIn:
+    """Sends telemetry to the client at a fixed rate.
+
+    :param address: Address to bind to
+    :param apid: APID of the telemetry
+    :param packet_size: Size of the synthesized telemetry packets
+    :param replay_packets: Telemetry packets to replay instead of synthesized packets.
+        Replayed packets do not carry a send time.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = DEFAULT_ADDRESS,
+        apid: int = DEFAULT_APID,
+        packet_size: int = 64,
+        replay_packets: Optional[List[bytes]] = None,
+    ):
+        self.apid = apid
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(address)
+        self.client_address: Optional[Tuple[str, int]] = None
+        self.telecommands = 0
+        self._replay_packets = replay_packets
+        # The source data start at the stamp offset and end before the CRC
+        source_data_len = max(STAMP.size, packet_size - STAMP_OFFSET - 2)
+        self._template = PusTelemetry(
+            service=STAMP_SERVICE,
+            subservice=STAMP_SUBSERVICE,
+            apid=apid,
+            source_data=bytes(source_data_len),
+        ).pack()
+
+    def wait_for_client(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the client sent its first telecommand."""
+        self.socket.settimeout(timeout)
+        try:
+            self.__handle_telecommand(*self.socket.recvfrom(4096))
+        except socket.timeout:
+            return False
+        finally:
+            self.socket.setblocking(False)
+        return True
+
+    def run(self, rate: float, duration: float) -> StandInResult:
+        """Send telemetry with the given rate in packets per second."""
+        self.socket.setblocking(False)
+        packets = self.__packets()
+        sent = 0
+        sent_bytes = 0
+        start = time.monotonic()
+        end = start + duration
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+            self.__poll_telecommands()
+            due = int((now - start) * rate)
+            while sent < due and self.client_address is not None:
+                packet = next(packets)
+                try:
+                    self.socket.sendto(packet, self.client_address)
+                except BlockingIOError:
+                    break
+                sent += 1
+                sent_bytes += len(packet)
+            time.sleep(BURST_INTERVAL)
+        return StandInResult(
+            sent=sent,
+            sent_bytes=sent_bytes,
+            telecommands=self.telecommands,
+            duration=time.monotonic() - start,
+        )
+
+    def close(self):
+        self.socket.close()
+
+    def __packets(self) -> Iterator[bytes]:
+        if self._replay_packets:
+            while True:
+                yield from self._replay_packets
+        packet = bytearray(self._template)
+        sequence = 0
+        while True:
+            STAMP.pack_into(
+                packet, STAMP_OFFSET, STAMP_MARKER, sequence, time.monotonic_ns()
+            )
+            struct.pack_into("!H", packet, len(packet) - 2, CRC16(packet[:-2]))
+            yield bytes(packet)
+            sequence = (sequence + 1) & 0xFFFFFFFF
+
+    def __poll_telecommands(self):
+        while True:
+            try:
+                self.__handle_telecommand(*self.socket.recvfrom(4096))
+            except (BlockingIOError, InterruptedError):
+                return
+
+    def __handle_telecommand(self, data: bytes, address: Tuple[str, int]):
+        self.client_address = address
+        self.telecommands += 1
+        if len(data) < 4:
+            return
+        req_id = RequestId.unpack(data[:4])
+        for subservice in (
+            Subservices.TM_ACCEPTANCE_SUCCESS,
+            Subservices.TM_START_SUCCESS,
+            Subservices.TM_COMPLETION_SUCCESS,
+        ):
+            report = Service1Tm(
+                subservice=subservice,
+                verif_params=VerificationParams(req_id),
+                apid=self.apid,
+            )
+            self.socket.sendto(report.pack(), address)
+
+
+def read_stamp(packet: bytes) -> Optional[Tuple[int, int]]:
+    """Return the sequence number and send time of a synthesized packet, or None for other
+    packets."""
+    if (
+        len(packet) < STAMP_OFFSET + STAMP.size
+        or packet[7] != STAMP_SERVICE
+        or packet[8] != STAMP_SUBSERVICE
+    ):
+        return None
+    marker, sequence, send_time = STAMP.unpack_from(packet, STAMP_OFFSET)
+    if marker != STAMP_MARKER:
+        return None
+    return sequence, send_time
+
+
+def load_replay_packets(file_name: str) -> List[bytes]:
+    """Load the telemetry packets of a binary raw log."""
+    from utility.raw_log import PACKET_TYPE_TM, read_raw_log
+
+    return [
+        packet
+        for _, packet_type, packet in read_raw_log(file_name)
+        if packet_type == PACKET_TYPE_TM
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local UDP stand-in for the OBSW")
+    parser.add_argument("--rate", type=float, default=1000, help="Packets per second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds")
+    parser.add_argument("--size", type=int, default=64, help="Packet size in bytes")
+    parser.add_argument("--replay", help="Replay the TM of this binary raw log")
+    parser.add_argument("--ip", default=DEFAULT_ADDRESS[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_ADDRESS[1])
+    args = parser.parse_args()
+    replay_packets = load_replay_packets(args.replay) if args.replay else None
+    stand_in = ObswStandIn(
+        address=(args.ip, args.port),
+        packet_size=args.size,
+        replay_packets=replay_packets,
+    )
+    print(f"Waiting for the first telecommand on {args.ip}:{args.port}")
+    stand_in.wait_for_client()
+    result = stand_in.run(args.rate, args.duration)
+    stand_in.close()
+    print(json.dumps(result._asdict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Telemetry throughput benchmark of the TMTC client.
+
+The OBSW stand-in runs in a separate process and streams telemetry to a client which is
+assembled from the same components as the pipeline of tmtcc.py: the UDP communication
+interface, optionally with its receive thread, the TM listener and an APID handler which
+unpacks every packet, passes verification reports to the verificator, prints a summary to the
+TMTC file logger and writes the packet to the raw logger. The loggers write into a temporary
+directory.
+
+The benchmark runs one scenario for every combination of telemetry rate and packet size and
+writes one JSON object per scenario and line, with the throughput, drop rate and latency
+percentiles of the client. Run it from the tmtc folder while no hosted OBSW is running:
+
+    python3 -m benchmark.tm_throughput --rates 1000 10000 --sizes 64 1024 --duration 5
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from spacepackets.ccsds.time import CdsShortTimestamp
+from spacepackets.ecss import PusTelecommand, PusVerificator
+from spacepackets.ecss.pus_1_verification import Service1Tm, UnpackParams
+from spacepackets.ecss.tm import PusTelemetry
+from tmtccmd.com_if.tcpip_utils import EthAddr
+from tmtccmd.com_if.udp import UdpComIF
+from tmtccmd.logging.pus import RawTmtcTimedLogWrapper, TimedLogWhen
+from tmtccmd.pus import VerificationWrapper
+from tmtccmd.tm import CcsdsTmHandler, SpecificApidHandlerBase
+from tmtccmd.tm.ccsds_tm_listener import CcsdsTmListener
+from tmtccmd.util.tmtc_printer import FsfwTmTcPrinter
+
+from benchmark.obsw_standin import (
+    DEFAULT_APID,
+    ObswStandIn,
+    load_replay_packets,
+    read_stamp,
+)
+
+CONFIG_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "tmtc_conf.json"
+)
+# Sleep time of the listener mode of tmtcc.py
+DEFAULT_POLL_INTERVAL = 0.8
+# Time the stand-in waits for the telecommand of the client
+CLIENT_TIMEOUT = 5.0
+# Telemetry arriving after the stand-in stopped is received until the socket was quiet for
+# this time
+DRAIN_TIMEOUT = 0.5
+# Every telecommand is answered with this many verification reports
+REPORTS_PER_TC = 3
+PERCENTILES = (50, 90, 99)
+
+
+class BenchmarkApidHandler(SpecificApidHandlerBase):
+    """Handles telemetry like the PUS handler of the client and records the arrival of the
+    synthesized packets."""
+
+    def __init__(
+        self,
+        apid: int,
+        verif_wrapper: VerificationWrapper,
+        printer: FsfwTmTcPrinter,
+        raw_logger,
+    ):
+        super().__init__(apid, None)
+        self.verif_wrapper = verif_wrapper
+        self.printer = printer
+        self.raw_logger = raw_logger
+        self.received = 0
+        self.received_bytes = 0
+        self.completed = 0
+        self.latencies: List[int] = []
+
+    def handle_tm(self, packet: bytes, _user_args: any):
+        tm_packet = PusTelemetry.unpack(packet, time_reader=CdsShortTimestamp.empty())
+        if tm_packet.service == 1:
+            srv_1_tm = Service1Tm.unpack(packet, UnpackParams())
+            res = self.verif_wrapper.add_tm(srv_1_tm)
+            if res is not None:
+                self.verif_wrapper.log_to_file(srv_1_tm, res)
+                if res.completed:
+                    self.completed += 1
+        self.printer.file_logger.info(self.printer.generic_short_string(tm_packet))
+        if self.raw_logger is not None:
+            self.raw_logger.log_tm(tm_packet)
+        self.received += 1
+        self.received_bytes += len(packet)
+        stamp = read_stamp(packet)
+        if stamp is not None:
+            self.latencies.append(time.monotonic_ns() - stamp[1])
+
+
+def load_udp_address(file_name: str = CONFIG_FILE) -> Tuple[str, int, int]:
+    """Return the address and maximum receive size of the UDP interface configuration."""
+    with open(file_name) as file:
+        cfg = json.load(file)
+    return (
+        cfg["tcpip_udp_ip_addr"],
+        cfg["tcpip_udp_port"],
+        cfg["tcpip_udp_recv_max_size"],
+    )
+
+
+def percentiles(values: List[int]) -> dict:
+    """Return the percentiles and the maximum of nanosecond values in microseconds."""
+    if not values:
+        return dict()
+    values = sorted(values)
+    result = {
+        f"p{percentile}": values[
+            min(len(values) - 1, round(percentile / 100 * (len(values) - 1)))
+        ]
+        / 1000
+        for percentile in PERCENTILES
+    }
+    result["max"] = values[-1] / 1000
+    return result
+
+
+def run_stand_in(
+    address: Tuple[str, int],
+    rate: float,
+    duration: float,
+    packet_size: int,
+    replay_file: Optional[str],
+    ready,
+    results,
+):
+    replay_packets = load_replay_packets(replay_file) if replay_file else None
+    stand_in = ObswStandIn(
+        address=address, packet_size=packet_size, replay_packets=replay_packets
+    )
+    ready.set()
+    try:
+        if stand_in.wait_for_client(CLIENT_TIMEOUT):
+            results.put(stand_in.run(rate, duration)._asdict())
+        else:
+            results.put(None)
+    finally:
+        stand_in.close()
+
+
+def close_raw_logger(raw_logger):
+    """Close the raw logger of a scenario. The text raw logger adds its file handler to the
+    raw logger of tmtccmd, which is shared by all scenarios, so the handler is removed.
+    """
+    if hasattr(raw_logger, "close"):
+        raw_logger.close()
+        return
+    for handler in list(raw_logger.logger.handlers):
+        if getattr(handler, "baseFilename", None) == raw_logger.file_name:
+            raw_logger.logger.removeHandler(handler)
+            handler.close()
+
+
+def run_scenario(
+    args: argparse.Namespace, rate: float, packet_size: int, log_dir: str
+) -> dict:
+    ip_addr, port, max_recv_size = load_udp_address()
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=run_stand_in,
+        args=(
+            (ip_addr, port),
+            rate,
+            args.duration,
+            packet_size,
+            args.replay,
+            ready,
+            results,
+        ),
+        daemon=True,
+    )
+    process.start()
+    if not ready.wait(CLIENT_TIMEOUT):
+        process.terminate()
+        raise RuntimeError("OBSW stand-in did not start")
+
+    file_logger = logging.getLogger(f"tm-benchmark-{rate}-{packet_size}")
+    file_logger.propagate = False
+    file_logger.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(os.path.join(log_dir, "tmtc.log"))
+    file_logger.addHandler(file_handler)
+    printer = FsfwTmTcPrinter(file_logger)
+    verif_wrapper = VerificationWrapper(
+        pus_verificator=PusVerificator(), console_logger=None, file_logger=file_logger
+    )
+    raw_logger = None
+    if args.raw_log == "binary":
+        from utility.raw_log import BinaryRawTmtcLogWrapper
+
+        raw_logger = BinaryRawTmtcLogWrapper(log_dir=log_dir)
+    elif args.raw_log == "text":
+        raw_logger = RawTmtcTimedLogWrapper(
+            when=TimedLogWhen.PER_HOUR,
+            interval=2,
+            file_name=Path(log_dir) / "raw-tmtc.log",
+        )
+    apid_handler = BenchmarkApidHandler(
+        DEFAULT_APID, verif_wrapper, printer, raw_logger
+    )
+    ccsds_handler = CcsdsTmHandler(generic_handler=None)
+    ccsds_handler.add_apid_handler(apid_handler)
+    listener = CcsdsTmListener(ccsds_handler)
+    com_if = UdpComIF(
+        "udp", send_address=EthAddr(ip_addr, port), max_recv_size=max_recv_size
+    )
+    if args.rx_thread:
+        from utility.tm_receiver import ReceiveThreadComIF
+
+        com_if = ReceiveThreadComIF(com_if, slot_count=args.rx_slots)
+    com_if.open()
+
+    ping = PusTelecommand(service=17, subservice=1, apid=DEFAULT_APID)
+    verif_wrapper.add_tc(ping)
+    com_if.send(ping.pack())
+    cpu_start = time.process_time()
+    while process.is_alive():
+        listener.operation(com_if)
+        time.sleep(args.poll_interval)
+    while com_if.data_available(DRAIN_TIMEOUT):
+        listener.operation(com_if)
+    cpu_time = time.process_time() - cpu_start
+    stand_in_result = results.get(timeout=CLIENT_TIMEOUT)
+    process.join()
+    com_if.close()
+    if raw_logger is not None:
+        close_raw_logger(raw_logger)
+    file_logger.removeHandler(file_handler)
+    file_handler.close()
+    if stand_in_result is None:
+        raise RuntimeError("OBSW stand-in did not receive the telecommand")
+
+    expected = (
+        stand_in_result["sent"] + REPORTS_PER_TC * stand_in_result["telecommands"]
+    )
+    dropped = max(0, expected - apid_handler.received)
+    duration = stand_in_result["duration"]
+    return {
+        "rate": rate,
+        "packet_size": packet_size,
+        "replay": args.replay,
+        "raw_log": args.raw_log,
+        "rx_thread": args.rx_thread,
+        "poll_interval": args.poll_interval,
+        "duration": duration,
+        "sent": expected,
+        "received": apid_handler.received,
+        "dropped": dropped,
+        "drop_rate": dropped / expected if expected else 0.0,
+        "packets_per_second": apid_handler.received / duration,
+        "bytes_per_second": apid_handler.received_bytes / duration,
+        "client_cpu_time": cpu_time,
+        "verified_tcs": apid_handler.completed,
+        "latency_us": percentiles(apid_handler.latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Telemetry throughput benchmark of the TMTC client"
+    )
+    parser.add_argument(
+        "--rates", type=float, nargs="+", default=[1000], help="Packets per second"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[64], help="Packet sizes in bytes"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=5, help="Seconds per scenario"
+    )
+    parser.add_argument("--replay", help="Replay the TM of this binary raw log")
+    parser.add_argument(
+        "--raw-log",
+        choices=["text", "binary", "none"],
+        default="text",
+        help="Raw logger of the client",
+    )
+    parser.add_argument(
+        "--rx-thread", action="store_true", help="Receive in a separate thread"
+    )
+    parser.add_argument("--rx-slots", type=int, default=1024)
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Sleep time between listener operations",
+    )
+    parser.add_argument("--output", help="Append the results to this file")
+    args = parser.parse_args()
+    output = open(args.output, "a") if args.output else sys.stdout
+    try:
+        for rate in args.rates:
+            for packet_size in args.sizes:
+                with tempfile.TemporaryDirectory(prefix="tm-benchmark-") as log_dir:
+                    result = run_scenario(args, rate, packet_size, log_dir)
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,57 @@
-from typing import Optional
+import os
+from typing import Optional, TYPE_CHECKING
 
 from common_tmtc.config.definitions import TM_SP_IDS
 from common_tmtc.config.hook_implementation import CommonFsfwHookBase
-from common_tmtc.pus_tc.cmd_definitions import common_fsfw_service_op_code_dict
 from tmtccmd.com_if import ComInterface
 from tmtccmd.config import TmtcDefinitionWrapper
+from utility.lazy_definitions import LazyTmtcDefinitionWrapper
+
+if TYPE_CHECKING:
+    from tmtccmd.pus.pus_5_event import EventDictT
+    from tmtccmd.util.obj_id import ObjectIdDictT
+    from tmtccmd.util.retval import RetvalDictT
+    from utility.multi_target import TargetConfig
+
+EVENTS_CSV = os.path.join(os.path.dirname(os.path.realpath(__file__)), "events.csv")
 
 
 class FsfwHookBase(CommonFsfwHookBase):
+    # Number of ring buffer slots of the TM receive thread. The thread is only used for the
+    # UDP interface and disabled if this is 0.
+    rx_thread_slots: int = 0
+    _tmtc_defs: Optional[LazyTmtcDefinitionWrapper] = None
+
     def get_tmtc_definitions(self) -> TmtcDefinitionWrapper:
-        return common_fsfw_service_op_code_dict()
+        if self._tmtc_defs is None:
+            self._tmtc_defs = LazyTmtcDefinitionWrapper(
+                _build_tmtc_definitions, source_packages=["common_tmtc"]
+            )
+        return self._tmtc_defs
+
+    def get_object_ids(self) -> "ObjectIdDictT":
+        from utility.lookup_table import get_object_id_dict
+
+        # The binary tables are used if the generators created them
+        object_ids = get_object_id_dict()
+        return object_ids if object_ids is not None else super().get_object_ids()
+
+    def get_retval_dict(self) -> "RetvalDictT":
+        from utility.lookup_table import get_retval_dict
+
+        retvals = get_retval_dict()
+        return retvals if retvals is not None else super().get_retval_dict()
+
+    def get_event_dict(self) -> "EventDictT":
+        """Return the event dictionary used to print event reports."""
+        from utility.lookup_table import get_event_dict
+
+        events = get_event_dict()
+        if events is None:
+            from tmtccmd.fsfw import parse_fsfw_events_csv
+
+            events = parse_fsfw_events_csv(EVENTS_CSV) or dict()
+        return events
 
     def assign_communication_interface(self, com_if_key: str) -> Optional[ComInterface]:
         from tmtccmd.config.com_if import (
@@ -22,4 +64,38 @@ class FsfwHookBase(CommonFsfwHookBase):
             json_cfg_path=self.cfg_path,
             space_packet_ids=TM_SP_IDS,
         )
-        return create_com_interface_default(cfg)
+        return self.__wrap_com_interface(create_com_interface_default(cfg))
+
+    def create_target_com_interface(self, target: "TargetConfig") -> ComInterface:
+        """Create the communication interface of a target of the multi-target client."""
+        from tmtccmd.com_if.tcpip_utils import EthAddr, TcpIpType
+        from tmtccmd.config.com_if import TcpipCfg, create_default_tcpip_interface
+
+        cfg = TcpipCfg(
+            if_type=TcpIpType.UDP if target.com_if_key == "udp" else TcpIpType.TCP,
+            com_if_key=target.com_if_key,
+            json_cfg_path=self.cfg_path,
+            send_addr=EthAddr(target.ip_addr, target.port),
+            max_recv_buf_len=target.recv_max_size,
+            space_packet_ids=TM_SP_IDS,
+        )
+        com_if = create_default_tcpip_interface(cfg)
+        com_if.initialize()
+        return self.__wrap_com_interface(com_if)
+
+    def __wrap_com_interface(self, com_if: Optional[ComInterface]):
+        if self.rx_thread_slots <= 0:
+            return com_if
+        from tmtccmd.com_if.udp import UdpComIF
+
+        if isinstance(com_if, UdpComIF):
+            from utility.tm_receiver import ReceiveThreadComIF
+
+            com_if = ReceiveThreadComIF(com_if, slot_count=self.rx_thread_slots)
+        return com_if
+
+
+def _build_tmtc_definitions() -> TmtcDefinitionWrapper:
+    from common_tmtc.pus_tc.cmd_definitions import common_fsfw_service_op_code_dict
+
+    return common_fsfw_service_op_code_dict()
@@ -0,0 +1,268 @@
+import os
+import tempfile
+import unittest
+import zlib
+from typing import Dict, List
+
+from spacepackets import PacketType, SpacePacket, SpacePacketHeader
+from spacepackets.cfdp import (
+    ChecksumType,
+    ConditionCode,
+    Direction,
+    PduConfig,
+    TransmissionMode,
+)
+from spacepackets.cfdp.pdu import EofPdu, FileDataPdu, MetadataPdu
+from spacepackets.cfdp.pdu.finished import (
+    DeliveryCode,
+    FileDeliveryStatus,
+    FinishedParams,
+    FinishedPdu,
+)
+from spacepackets.cfdp.pdu.helper import PduFactory
+from spacepackets.util import UnsignedByteField
+from tmtccmd.cfdp import CfdpUserBase, IndicationCfg, LocalEntityCfg, RemoteEntityCfg
+from tmtccmd.cfdp.handler import CfdpInCcsdsHandler
+from tmtccmd.cfdp.mib import DefaultFaultHandlerBase
+from tmtccmd.tm import CcsdsTmHandler, GenericApidHandlerBase
+from tmtccmd.util.seqcnt import SeqCountProvider
+
+from utility.cfdp_upload import CfdpUploader
+from utility.tm_dispatch import TmDispatcher
+
+LOCAL_ID = UnsignedByteField(1, 2)
+REMOTE_ID = UnsignedByteField(2, 2)
+CFDP_APID = 0x7E
+SEGMENT_LEN = 256
+FILE_SIZES = (3000, 700)
+
+
+class FaultHandler(DefaultFaultHandlerBase):
+    def notice_of_suspension_cb(self, cond: ConditionCode):
+        pass
+
+    def notice_of_cancellation_cb(self, cond: ConditionCode):
+        pass
+
+    def abandoned_cb(self, cond: ConditionCode):
+        pass
+
+    def ignore_cb(self, cond: ConditionCode):
+        pass
+
+
+class CfdpUser(CfdpUserBase):
+    def __init__(self):
+        super().__init__()
+        self.finished = []
+
+    def transaction_indication(self, transaction_id):
+        pass
+
+    def eof_sent_indication(self, transaction_id):
+        pass
+
+    def transaction_finished_indication(self, params):
+        self.finished.append(params)
+
+    def metadata_recv_indication(self, params):
+        pass
+
+    def file_segment_recv_indication(self, params):
+        pass
+
+    def report_indication(self, transaction_id, status_report):
+        pass
+
+    def suspended_indication(self, transaction_id, cond_code):
+        pass
+
+    def resumed_indication(self, transaction_id, progress):
+        pass
+
+    def fault_indication(self, transaction_id, cond_code, progress):
+        pass
+
+    def abandoned_indication(self, transaction_id, cond_code, progress):
+        pass
+
+    def eof_recv_indication(self, transaction_id):
+        pass
+
+
+class CfdpTmHandler(GenericApidHandlerBase):
+    """Records the PDUs which take the regular path of the client to the CFDP handler."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.pdus = []
+
+    def handle_tm(self, apid: int, packet: bytes, _user_args: any):
+        self.pdus.append(PduFactory.from_raw(packet[6:]))
+
+
+class RecordingComIF:
+    def __init__(self):
+        self.sent: List[bytes] = []
+
+    def send(self, data: bytes):
+        self.sent.append(bytes(data))
+
+
+def reply_space_packet(pdu) -> bytes:
+    raw = pdu.pack()
+    sp_header = SpacePacketHeader(
+        packet_type=PacketType.TM, apid=CFDP_APID, seq_count=0, data_len=len(raw) - 1
+    )
+    return SpacePacket(sp_header, None, raw).pack()
+
+
+def finished_pdu(transaction_seq_num: UnsignedByteField) -> FinishedPdu:
+    return FinishedPdu(
+        params=FinishedParams(
+            delivery_code=DeliveryCode.DATA_COMPLETE,
+            delivery_status=FileDeliveryStatus.FILE_RETAINED,
+            condition_code=ConditionCode.NO_ERROR,
+        ),
+        pdu_conf=PduConfig(
+            source_entity_id=LOCAL_ID,
+            dest_entity_id=REMOTE_ID,
+            transaction_seq_num=transaction_seq_num,
+            trans_mode=TransmissionMode.UNACKNOWLEDGED,
+            direction=Direction.TOWARDS_SENDER,
+        ),
+    )
+
+
+class TestConcurrentUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.contents: Dict[str, bytes] = dict()
+        self.files = []
+        for index, size in enumerate(FILE_SIZES):
+            file_name = os.path.join(self.tmp_dir.name, f"file{index}.bin")
+            content = os.urandom(size)
+            with open(file_name, "wb") as file:
+                file.write(content)
+            self.contents[f"/tmp/dest/file{index}.bin"] = content
+            self.files.append(file_name)
+        self.user = CfdpUser()
+        remote_cfg = RemoteEntityCfg(
+            entity_id=REMOTE_ID,
+            max_file_segment_len=SEGMENT_LEN,
+            closure_requested=True,
+            crc_on_transmission=False,
+            default_transmission_mode=TransmissionMode.UNACKNOWLEDGED,
+            crc_type=ChecksumType.CRC_32,
+            check_limit=None,
+        )
+        self.handler = CfdpInCcsdsHandler(
+            cfg=LocalEntityCfg(LOCAL_ID, IndicationCfg(), FaultHandler()),
+            user=self.user,
+            remote_cfgs=[remote_cfg],
+            ccsds_apid=CFDP_APID,
+            cfdp_seq_cnt_provider=SeqCountProvider(16),
+            ccsds_seq_cnt_provider=SeqCountProvider(14),
+        )
+        self.com_if = RecordingComIF()
+        self.uploader = CfdpUploader(
+            self.handler, self.com_if, window_size=4, max_transactions=2
+        )
+        self.cfdp_tm_handler = CfdpTmHandler()
+        self.dispatcher = TmDispatcher(
+            CcsdsTmHandler(generic_handler=self.cfdp_tm_handler),
+            subservice_table={},
+        )
+        self.uploader.register(self.dispatcher)
+
+    def tearDown(self):
+        self.uploader.filestore.release()
+        self.tmp_dir.cleanup()
+
+    def sent_pdus(self) -> list:
+        pdus = [PduFactory.from_raw(packet[6:]) for packet in self.com_if.sent]
+        self.com_if.sent.clear()
+        return pdus
+
+    def send_until_eof(self) -> list:
+        """Run the uploader until all transactions sent their EOF PDU, without replying.
+
+        :return: All sent PDUs
+        """
+        pdus = []
+        for _ in range(100):
+            sent = self.uploader.operation()
+            self.assertLessEqual(sent, self.uploader.window_size)
+            pdus.extend(self.sent_pdus())
+            if sent == 0:
+                break
+        return pdus
+
+    def test_uploaded_files_match_the_sources(self):
+        self.assertEqual(self.uploader.put_files(self.files, "/tmp/dest", 2), 2)
+        pdus = self.send_until_eof()
+        dest_files = dict()
+        received = dict()
+        eof_pdus = dict()
+        for pdu in pdus:
+            seq_num = pdu.transaction_seq_num.value
+            if isinstance(pdu, MetadataPdu):
+                dest_files[seq_num] = pdu.dest_file_name
+                received[seq_num] = bytearray(pdu.file_size)
+            elif isinstance(pdu, FileDataPdu):
+                self.assertLessEqual(len(pdu.file_data), SEGMENT_LEN)
+                data = received[seq_num]
+                data[pdu.offset : pdu.offset + len(pdu.file_data)] = pdu.file_data
+            elif isinstance(pdu, EofPdu):
+                eof_pdus[seq_num] = pdu
+        self.assertEqual(sorted(dest_files.values()), sorted(self.contents))
+        for seq_num, dest_file in dest_files.items():
+            content = self.contents[dest_file]
+            self.assertEqual(bytes(received[seq_num]), content)
+            self.assertEqual(eof_pdus[seq_num].file_size, len(content))
+            self.assertEqual(
+                eof_pdus[seq_num].file_checksum, zlib.crc32(content).to_bytes(4, "big")
+            )
+
+    def test_replies_reach_their_transaction(self):
+        self.uploader.put_files(self.files, "/tmp/dest", 2)
+        seq_nums = []
+        for pdu in self.send_until_eof():
+            if isinstance(pdu, MetadataPdu):
+                seq_nums.append(pdu.transaction_seq_num)
+        self.assertEqual(len(seq_nums), 2)
+        # The replies take the same path as the telemetry received by the client
+        self.dispatcher.handle_packet(
+            CFDP_APID, reply_space_packet(finished_pdu(seq_nums[1]))
+        )
+        self.uploader.operation()
+        self.assertEqual(
+            [params.transaction_id.seq_num for params in self.user.finished],
+            [seq_nums[1]],
+        )
+        self.assertTrue(self.uploader.busy)
+        self.dispatcher.handle_packet(
+            CFDP_APID, reply_space_packet(finished_pdu(seq_nums[0]))
+        )
+        self.uploader.operation()
+        self.assertFalse(self.uploader.busy)
+        self.assertEqual(len(self.user.finished), 2)
+        # The uploader consumed both replies
+        self.assertEqual(self.cfdp_tm_handler.pdus, [])
+
+    def test_other_pdus_are_passed_to_the_cfdp_handler(self):
+        self.uploader.put_files(self.files, "/tmp/dest", 2)
+        self.send_until_eof()
+        unknown_seq_num = UnsignedByteField(0x7FFF, 2)
+        self.dispatcher.handle_packet(
+            CFDP_APID, reply_space_packet(finished_pdu(unknown_seq_num))
+        )
+        self.assertEqual(len(self.cfdp_tm_handler.pdus), 1)
+        self.assertEqual(
+            self.cfdp_tm_handler.pdus[0].transaction_seq_num, unknown_seq_num
+        )
+        self.assertEqual(self.user.finished, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import struct
+import tempfile
+import unittest
+from typing import Dict, Sequence
+
+from utility.lookup_table import (
+    HEADER,
+    ID,
+    LOOKUP_TABLE_MAGIC,
+    LOOKUP_TABLE_VERSION,
+    STRING_REF,
+    LookupTable,
+    LookupTableDict,
+)
+
+FIELDS = ("Name", "Severity")
+ENTRIES = {
+    0x089A: ("STORE_SEND_READ_FAILED", "LOW"),
+    0x0898: ("STORE_SEND_WRITE_FAILED", "LOW"),
+    0x2BD2: ("TEST", "INFO"),
+}
+
+
+def write_table(file_name: str, fields: Sequence[str], entries: Dict[int, tuple]):
+    """Write a table in the layout of the generators, see write_lookup_table in generators/utility/lookup_table.py"""
+    blob = bytearray()
+
+    def string_ref(string: str) -> bytes:
+        encoded = string.encode()
+        ref = STRING_REF.pack(len(blob), len(encoded))
+        blob.extend(encoded)
+        return ref
+
+    parts = [
+        HEADER.pack(LOOKUP_TABLE_MAGIC, LOOKUP_TABLE_VERSION, len(fields), len(entries))
+    ]
+    parts.extend(string_ref(field) for field in fields)
+    parts.extend(ID.pack(entry_id) for entry_id in sorted(entries))
+    for entry_id in sorted(entries):
+        parts.extend(string_ref(value) for value in entries[entry_id])
+    parts.append(bytes(blob))
+    with open(file_name, "wb") as file:
+        file.write(b"".join(parts))
+
+
+class TestLookupTable(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.tmp_dir.name, "events.bin")
+        write_table(self.file_name, FIELDS, ENTRIES)
+        self.table = LookupTable(self.file_name)
+
+    def tearDown(self):
+        self.table.close()
+        self.tmp_dir.cleanup()
+
+    def test_lookup(self):
+        self.assertEqual(self.table.fields, FIELDS)
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.ids(), sorted(ENTRIES))
+        for entry_id, fields in ENTRIES.items():
+            self.assertIn(entry_id, self.table)
+            self.assertEqual(self.table.lookup(entry_id), fields)
+            self.assertEqual(self.table.name(entry_id), fields[0])
+            self.assertEqual(self.table.lookup_field(entry_id, "Severity"), fields[1])
+        self.assertEqual(self.table.as_dict(), ENTRIES)
+
+    def test_unknown_ids(self):
+        for entry_id in (0, 0x0899, 0xFFFFFFFF):
+            self.assertNotIn(entry_id, self.table)
+            self.assertIsNone(self.table.lookup(entry_id))
+            self.assertIsNone(self.table.name(entry_id))
+
+    def test_invalid_file(self):
+        file_name = os.path.join(self.tmp_dir.name, "invalid.bin")
+        with open(file_name, "wb") as file:
+            file.write(struct.pack("<4sHHI", b"XXXX", LOOKUP_TABLE_VERSION, 0, 0))
+        with self.assertRaises(ValueError):
+            LookupTable(file_name)
+
+    def test_dict_view(self):
+        view = LookupTableDict(
+            self.table,
+            lambda entry_id, fields: fields[0],
+            key_to_id=lambda key: int(key, 16) if isinstance(key, str) else None,
+            id_to_key=lambda entry_id: f"{entry_id:#06x}",
+        )
+        self.assertEqual(len(view), 3)
+        self.assertEqual(list(view), ["0x0898", "0x089a", "0x2bd2"])
+        self.assertEqual(view["0x2bd2"], "TEST")
+        self.assertIn("0x0898", view)
+        self.assertNotIn(0x0898, view)
+        self.assertEqual(view.get("0x0001"), None)
+        with self.assertRaises(KeyError):
+            view["0x0001"]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from spacepackets.ecss import PusTelecommand
+from spacepackets.ecss.tm import PusTelemetry
+from tmtccmd.logging.pus import TimedLogWhen
+
+from utility.raw_log import (
+    PACKET_TYPE_TC,
+    PACKET_TYPE_TM,
+    BinaryRawTmtcLogWrapper,
+    _writev_all,
+    read_raw_log,
+)
+from utility.tc_pipeline import TcEntry, load_tc_file
+
+
+class TestBinaryRawLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_packets_are_read_back_in_order(self):
+        logger = BinaryRawTmtcLogWrapper(
+            when=TimedLogWhen.PER_DAY, log_dir=self.tmp_dir.name
+        )
+        tc = PusTelecommand(service=17, subservice=1, apid=0xEF)
+        tm = PusTelemetry(service=17, subservice=2, apid=0xEF)
+        logger.log_tc(tc)
+        logger.log_tm(tm)
+        logger.log_raw(PACKET_TYPE_TM, b"\x01\x02")
+        logger.close()
+        self.assertEqual(logger.counter, 3)
+        records = list(read_raw_log(logger.file_name))
+        self.assertEqual(
+            [(packet_type, packet) for _, packet_type, packet in records],
+            [
+                (PACKET_TYPE_TC, tc.pack()),
+                (PACKET_TYPE_TM, tm.pack()),
+                (PACKET_TYPE_TM, b"\x01\x02"),
+            ],
+        )
+        timestamps = [timestamp for timestamp, _, _ in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(list(read_raw_log(logger.file_name, timestamps[-1] + 1)), [])
+        self.assertEqual(
+            len(list(read_raw_log(logger.file_name, start_time=timestamps[0]))), 3
+        )
+
+    def test_telecommands_of_a_raw_log_can_be_sent_again(self):
+        logger = BinaryRawTmtcLogWrapper(
+            when=TimedLogWhen.PER_DAY, log_dir=self.tmp_dir.name
+        )
+        logger.log_tc(PusTelecommand(service=17, subservice=1, apid=0xEF))
+        logger.log_tm(PusTelemetry(service=17, subservice=2, apid=0xEF))
+        logger.log_tc(
+            PusTelecommand(service=8, subservice=128, app_data=b"\x00\xff", apid=0xEF)
+        )
+        logger.close()
+        self.assertEqual(
+            load_tc_file(logger.file_name),
+            [TcEntry(0, 17, 1, b""), TcEntry(2, 8, 128, b"\x00\xff")],
+        )
+
+    def test_invalid_file(self):
+        file_name = os.path.join(self.tmp_dir.name, "invalid.bin")
+        with open(file_name, "wb") as file:
+            file.write(b"XXXX\x01\x00\x00\x00")
+        with self.assertRaises(ValueError):
+            list(read_raw_log(file_name))
+
+
+class TestWritevAll(unittest.TestCase):
+    def test_more_buffers_than_one_call_accepts(self):
+        buffers = [bytes([index % 256]) * (index % 7 + 1) for index in range(5000)]
+        with tempfile.TemporaryFile() as file:
+            _writev_all(file.fileno(), list(buffers))
+            file.seek(0)
+            self.assertEqual(file.read(), b"".join(buffers))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from spacepackets.ecss import PusTelecommand
+from spacepackets.ecss.tm import PusTelemetry
+from tmtccmd.tm import CcsdsTmHandler, GenericApidHandlerBase
+
+from utility.tc_pipeline import TcEntry, TcPipeline, load_tc_file
+from utility.tm_dispatch import TmDispatcher
+
+APID = 0xEF
+
+
+class RecordingComIF:
+    def __init__(self):
+        self.sent: List[bytes] = []
+
+    def send(self, data: bytes):
+        self.sent.append(data)
+
+    def data_available(self, timeout: float = 0) -> int:
+        return 0
+
+
+class RecordingHandler(GenericApidHandlerBase):
+    def __init__(self):
+        super().__init__(None)
+        self.packets: List[Tuple[int, bytes]] = []
+
+    def handle_tm(self, apid: int, packet: bytes, _user_args: any):
+        self.packets.append((apid, packet))
+
+
+def report(tc: bytes, subservice: int, error_code: int = 0) -> bytes:
+    source_data = bytearray(tc[:4])
+    if subservice % 2 == 0:
+        source_data += error_code.to_bytes(2, "big")
+    return PusTelemetry(
+        service=1, subservice=subservice, source_data=source_data, apid=APID
+    ).pack()
+
+
+class TestTcPipeline(unittest.TestCase):
+    def setUp(self):
+        self.com_if = RecordingComIF()
+        self.generic_handler = RecordingHandler()
+        self.dispatcher = TmDispatcher(
+            CcsdsTmHandler(generic_handler=self.generic_handler), subservice_table={}
+        )
+        self.entries = [TcEntry(line, 17, 1, bytes()) for line in range(1, 4)]
+        self.pipeline = TcPipeline(
+            self.com_if,
+            self.entries,
+            apid=APID,
+            window_size=2,
+            progress_interval=None,
+        )
+        self.pipeline.register(self.dispatcher)
+
+    def test_window_limits_the_telecommands_in_flight(self):
+        self.assertEqual(self.pipeline.operation(), 2)
+        self.assertEqual(self.pipeline.operation(), 0)
+        for tc in self.com_if.sent:
+            self.assertEqual(PusTelecommand.unpack(tc).apid, APID)
+        self.dispatcher.handle_packet(APID, report(self.com_if.sent[0], 1))
+        self.dispatcher.handle_packet(APID, report(self.com_if.sent[0], 7))
+        self.assertEqual(self.pipeline.operation(), 1)
+        for tc in self.com_if.sent[1:]:
+            self.dispatcher.handle_packet(APID, report(tc, 7))
+        self.assertFalse(self.pipeline.busy)
+        self.assertTrue(self.pipeline.succeeded)
+        self.assertEqual(self.pipeline.stats().completed, 3)
+
+    def test_only_reports_of_the_pipeline_are_consumed(self):
+        self.pipeline.operation()
+        own_report = report(self.com_if.sent[0], 1)
+        foreign_tc = PusTelecommand(service=17, subservice=1, apid=APID + 1).pack()
+        foreign_report = report(foreign_tc, 1)
+        self.dispatcher.handle_packet(APID, own_report)
+        self.dispatcher.handle_packet(APID, foreign_report)
+        self.assertEqual(self.generic_handler.packets, [(APID, foreign_report)])
+        self.assertTrue(self.pipeline.records[0].accepted)
+        self.assertEqual(self.pipeline.stats().unknown_reports, 1)
+
+    def test_failure_reports(self):
+        self.pipeline.operation()
+        with self.assertLogs(level="WARNING"):
+            self.dispatcher.handle_packet(
+                APID, report(self.com_if.sent[0], 2, error_code=0x4301)
+            )
+        record = self.pipeline.records[0]
+        self.assertEqual(record.failed_subservice, 2)
+        self.assertEqual(record.error_code, 0x4301)
+        self.assertEqual(self.pipeline.stats().failed, 1)
+        self.assertEqual(self.pipeline.stats().outstanding, 1)
+
+    def test_timeout(self):
+        self.pipeline.timeout = 0
+        self.pipeline.operation()
+        with self.assertLogs(level="WARNING"):
+            self.pipeline.operation()
+        self.assertEqual(self.pipeline.stats().timed_out, 2)
+
+
+class TestLoadTcFile(unittest.TestCase):
+    def test_command_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "commands.txt")
+            with open(file_name, "w") as file:
+                file.write("# Connection test\n17;1\n\n8; 128; 00ff\n")
+            self.assertEqual(
+                load_tc_file(file_name),
+                [
+                    TcEntry(2, 17, 1, bytes()),
+                    TcEntry(4, 8, 128, bytes([0x00, 0xFF])),
+                ],
+            )
+
+    def test_invalid_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "commands.txt")
+            with open(file_name, "w") as file:
+                file.write("17;x\n")
+            with self.assertRaises(ValueError):
+                load_tc_file(file_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
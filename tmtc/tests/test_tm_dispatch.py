@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from spacepackets.ecss import PusTelemetry
+from tmtccmd.tm import CcsdsTmHandler, GenericApidHandlerBase
+
+from utility.tm_dispatch import (
+    SubserviceEntry,
+    TmCounter,
+    TmDispatcher,
+    load_subservice_table,
+)
+
+APID = 0xEF
+SUBSERVICE_TABLE = {
+    (17, 1): SubserviceEntry(17, 1, "CONNECTION_TEST", "TC"),
+    (17, 2): SubserviceEntry(17, 2, "CONNECTION_TEST_REPORT", "TM"),
+    (1, 1): SubserviceEntry(1, 1, "ACCEPTANCE_SUCCESS", "TM"),
+}
+
+
+class RecordingHandler(GenericApidHandlerBase):
+    def __init__(self):
+        super().__init__(None)
+        self.packets: List[Tuple[int, bytes]] = []
+
+    def handle_tm(self, apid: int, packet: bytes, _user_args: any):
+        self.packets.append((apid, packet))
+
+
+def pus_tm(service: int, subservice: int, apid: int = APID) -> bytes:
+    return PusTelemetry(service=service, subservice=subservice, apid=apid).pack()
+
+
+class TestTmDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.generic_handler = RecordingHandler()
+        self.dispatcher = TmDispatcher(
+            CcsdsTmHandler(generic_handler=self.generic_handler),
+            subservice_table=SUBSERVICE_TABLE,
+        )
+
+    def test_packets_are_passed_through_without_raw_handlers(self):
+        packet = pus_tm(17, 2)
+        self.dispatcher.handle_packet(APID, packet)
+        self.assertEqual(self.generic_handler.packets, [(APID, packet)])
+
+    def test_raw_handler_sees_service_and_subservice(self):
+        counter = TmCounter()
+        self.dispatcher.add_raw_handler(counter)
+        self.dispatcher.handle_packet(APID, pus_tm(17, 2))
+        self.dispatcher.handle_packet(APID, pus_tm(17, 2))
+        self.dispatcher.handle_packet(APID + 1, pus_tm(5, 1, apid=APID + 1))
+        # Packets without a secondary header, for example CFDP PDUs
+        self.dispatcher.handle_packet(APID, bytes(8))
+        self.assertEqual(
+            counter.counts,
+            {(APID, 17, 2): 2, (APID + 1, 5, 1): 1, (APID, None, None): 1},
+        )
+        self.assertEqual(len(self.generic_handler.packets), 4)
+
+    def test_consumed_packets_skip_the_apid_handlers(self):
+        counter = TmCounter()
+        self.dispatcher.add_raw_handler(counter, service=1, subservice=1, consume=True)
+        acceptance = pus_tm(1, 1)
+        test_report = pus_tm(17, 2)
+        self.dispatcher.handle_packet(APID, acceptance)
+        self.dispatcher.handle_packet(APID, test_report)
+        self.assertEqual(counter.counts, {(APID, 1, 1): 1})
+        self.assertEqual(self.generic_handler.packets, [(APID, test_report)])
+
+    def test_apid_specific_handlers(self):
+        counter = TmCounter()
+        self.dispatcher.add_raw_handler(counter, apid=APID, service=17)
+        self.dispatcher.handle_packet(APID, pus_tm(17, 2))
+        self.dispatcher.handle_packet(APID + 1, pus_tm(17, 2, apid=APID + 1))
+        self.assertEqual(counter.counts, {(APID, 17, 2): 1})
+
+    def test_subservice_names(self):
+        self.assertEqual(
+            self.dispatcher.subservice_name(17, 2), "CONNECTION_TEST_REPORT"
+        )
+        self.assertIsNone(self.dispatcher.subservice_name(17, 3))
+
+
+class TestLoadSubserviceTable(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "subservices.csv")
+            with open(file_name, "w") as file:
+                file.write("17;1;CONNECTION_TEST;TC\n17;2;CONNECTION_TEST_REPORT;TM\n")
+            self.assertEqual(
+                load_subservice_table(file_name),
+                {
+                    (17, 1): SubserviceEntry(17, 1, "CONNECTION_TEST", "TC"),
+                    (17, 2): SubserviceEntry(17, 2, "CONNECTION_TEST_REPORT", "TM"),
+                },
+            )
+
+    def test_missing_table(self):
+        self.assertEqual(load_subservice_table("does-not-exist.csv"), dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
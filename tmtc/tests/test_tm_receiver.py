@@ -0,0 +1,67 @@
+import unittest
+
+from utility.tm_receiver import ReceiverStats, SlotRingBuffer
+
+
+def write(ring_buffer: SlotRingBuffer, packet: bytes) -> bool:
+    slot = ring_buffer.write_slot()
+    if slot is None:
+        ring_buffer.drop()
+        return False
+    slot[: len(packet)] = packet
+    ring_buffer.commit(len(packet))
+    return True
+
+
+class TestSlotRingBuffer(unittest.TestCase):
+    def test_packets_are_drained_in_order(self):
+        ring_buffer = SlotRingBuffer(slot_count=4, slot_size=8)
+        slot = ring_buffer.write_slot()
+        slot[:3] = b"abc"
+        self.assertTrue(ring_buffer.commit(3))
+        self.assertTrue(write(ring_buffer, b"12345678"))
+        self.assertEqual(len(ring_buffer), 2)
+        self.assertEqual(ring_buffer.drain(), [b"abc", b"12345678"])
+        self.assertEqual(len(ring_buffer), 0)
+        self.assertEqual(ring_buffer.drain(), [])
+
+    def test_wrap_around(self):
+        ring_buffer = SlotRingBuffer(slot_count=3, slot_size=4)
+        drained = []
+        for index in range(10):
+            self.assertTrue(write(ring_buffer, bytes([index]) * (index % 4 + 1)))
+            if index % 2:
+                drained.extend(ring_buffer.drain())
+        drained.extend(ring_buffer.drain())
+        self.assertEqual(
+            drained, [bytes([index]) * (index % 4 + 1) for index in range(10)]
+        )
+
+    def test_full_buffer_drops_packets(self):
+        ring_buffer = SlotRingBuffer(slot_count=2, slot_size=4)
+        self.assertEqual(
+            [write(ring_buffer, bytes([index])) for index in range(4)],
+            [True, True, False, False],
+        )
+        self.assertEqual(
+            ring_buffer.stats(),
+            ReceiverStats(received=2, dropped=2, depth=2, high_water_mark=2),
+        )
+        self.assertEqual(ring_buffer.drain(max_packets=1), [b"\x00"])
+        self.assertTrue(write(ring_buffer, b"\x04"))
+        self.assertEqual(ring_buffer.drain(), [b"\x01", b"\x04"])
+        self.assertEqual(
+            ring_buffer.stats(),
+            ReceiverStats(received=3, dropped=2, depth=0, high_water_mark=2),
+        )
+
+    def test_drained_packets_are_copies(self):
+        ring_buffer = SlotRingBuffer(slot_count=1, slot_size=4)
+        write(ring_buffer, b"old")
+        packets = ring_buffer.drain()
+        write(ring_buffer, b"new")
+        self.assertEqual(packets, [b"old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
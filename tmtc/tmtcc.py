@@ -1,51 +1,420 @@
 #!/usr/bin/env python3
 """TMTC commander for FSFW Example"""
+import argparse
+import atexit
 import sys
 import time
-from spacepackets.ecss import PusVerificator
+from typing import List, Optional, Tuple
 
-import tmtccmd
-from common_tmtc.common import setup_params, setup_tmtc_handlers, setup_backend
-from config.hook import FsfwHookBase
-from tmtccmd import get_console_logger
-from tmtccmd.core import BackendRequest
-from tmtccmd.logging.pus import (
-    RegularTmtcLogWrapper,
-    RawTmtcTimedLogWrapper,
-    TimedLogWhen,
-)
-from tmtccmd.pus import VerificationWrapper
-from tmtccmd.util.tmtc_printer import FsfwTmTcPrinter
+from utility.startup_profile import StartupProfiler
 
+START_TIME = time.perf_counter()
 
-LOGGER = get_console_logger()
+# The modules of tmtccmd and of this client are imported in main, so the startup profiler
+# can measure their import time
+LOGGER = None
 
 
-def main():
-    setup_wrapper = setup_params(FsfwHookBase())
-    tmtc_logger = RegularTmtcLogWrapper()
-    printer = FsfwTmTcPrinter(tmtc_logger.logger)
-    raw_logger = RawTmtcTimedLogWrapper(when=TimedLogWhen.PER_HOUR, interval=2)
-    pus_verificator = PusVerificator()
-    verif_wrapper = VerificationWrapper(
-        console_logger=get_console_logger(),
-        file_logger=printer.file_logger,
-        pus_verificator=pus_verificator,
-    )
-    ccsds_handler, tc_handler = setup_tmtc_handlers(
-        verif_wrapper=verif_wrapper, raw_logger=raw_logger, printer=printer
-    )
-    tmtccmd.setup(setup_wrapper)
-    backend = setup_backend(
-        setup_wrapper=setup_wrapper, ccsds_handler=ccsds_handler, tc_handler=tc_handler
+def parse_service_key(value: str) -> Tuple[int, Optional[int]]:
+    service, _, subservice = value.partition(":")
+    try:
+        return int(service, 0), int(subservice, 0) if subservice else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid service key {value}")
+
+
+def parse_client_args() -> argparse.Namespace:
+    """Parse the options of this client. They are removed from the command line before
+    the tmtccmd argument parser sees it."""
+    from utility.defaults import (
+        DEFAULT_MAX_TRANSACTIONS,
+        DEFAULT_SLOT_COUNT,
+        DEFAULT_TC_APID,
+        DEFAULT_TC_TIMEOUT,
+        DEFAULT_TC_WINDOW,
+    )
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="Run the event driven asyncio main loop instead of the polling loop",
+    )
+    parser.add_argument(
+        "--cfdp-window",
+        type=int,
+        default=0,
+        help="Send CFDP uploads at line rate, in bursts of up to this many PDUs between "
+        "telemetry checks. Default: 0, which keeps the regular CFDP handling",
+    )
+    parser.add_argument(
+        "--cfdp-put",
+        nargs="+",
+        metavar="PATH",
+        help="Upload these files, or all files of these directories, with concurrent "
+        "CFDP transactions and close the client afterwards",
+    )
+    parser.add_argument(
+        "--cfdp-dest-dir",
+        default=".",
+        help="Directory of the uploaded files on the remote entity. Default: .",
+    )
+    parser.add_argument(
+        "--cfdp-dest-id",
+        type=int,
+        help="Entity ID of the remote entity. Required for --cfdp-put",
+    )
+    parser.add_argument(
+        "--cfdp-parallel",
+        type=int,
+        default=DEFAULT_MAX_TRANSACTIONS,
+        help=f"Maximum number of concurrent CFDP uploads. "
+        f"Default: {DEFAULT_MAX_TRANSACTIONS}",
+    )
+    parser.add_argument(
+        "--tc-batch",
+        metavar="FILE",
+        help="Send the telecommands of this command file or binary raw log pipelined and "
+        "close the client once all of them are verified",
     )
+    parser.add_argument(
+        "--tc-window",
+        type=int,
+        default=DEFAULT_TC_WINDOW,
+        help=f"Maximum number of batch telecommands in flight. Default: {DEFAULT_TC_WINDOW}",
+    )
+    parser.add_argument(
+        "--tc-rate",
+        type=float,
+        default=0,
+        help="Maximum number of batch telecommands per second. Default: 0, no limit",
+    )
+    parser.add_argument(
+        "--tc-timeout",
+        type=float,
+        default=DEFAULT_TC_TIMEOUT,
+        help=f"Seconds after which a batch telecommand without completion report fails. "
+        f"Default: {DEFAULT_TC_TIMEOUT}",
+    )
+    parser.add_argument(
+        "--tc-apid",
+        type=lambda value: int(value, 0),
+        default=DEFAULT_TC_APID,
+        help=f"APID of the batch telecommands. Default: {DEFAULT_TC_APID:#x}",
+    )
+    parser.add_argument(
+        "--raw-log",
+        choices=["text", "binary"],
+        default="text",
+        help="Format of the raw TM/TC log. The binary log is written by a background "
+        "thread. Default: text",
+    )
+    parser.add_argument(
+        "--tm-bypass",
+        action="append",
+        default=[],
+        metavar="SERVICE[:SUBSERVICE]",
+        type=parse_service_key,
+        help="Only count telemetry of this service or subservice instead of decoding and "
+        "printing it. It is still written to the binary raw log. Can be repeated",
+    )
+    parser.add_argument(
+        "--rx-thread",
+        action="store_true",
+        help="Receive UDP telemetry in a separate thread with a ring buffer",
+    )
+    parser.add_argument(
+        "--rx-slots",
+        type=int,
+        default=DEFAULT_SLOT_COUNT,
+        help=f"Number of packets the receive ring buffer holds. "
+        f"Default: {DEFAULT_SLOT_COUNT}",
+    )
+    parser.add_argument(
+        "--targets",
+        metavar="FILE",
+        help="Serve all OBSW instances of this targets file in one process, each with its "
+        "own communication interface, verificator and log folder. A TC batch is sent to "
+        "every target",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Log the duration of the startup phases before entering the main loop",
+    )
+    client_args, remaining_args = parser.parse_known_args()
+    if client_args.cfdp_put and client_args.cfdp_dest_id is None:
+        parser.error("--cfdp-put requires --cfdp-dest-id")
+    sys.argv = sys.argv[:1] + remaining_args
+    return client_args
+
+
+def setup_tm_bypass(
+    dispatcher,
+    service_keys: List[Tuple[int, Optional[int]]],
+    raw_logger,
+):
+    from utility.raw_log import BinaryRawTmtcLogWrapper, PACKET_TYPE_TM
+    from utility.tm_dispatch import TmCounter
+
+    counter = TmCounter()
+    for service, subservice in service_keys:
+        dispatcher.add_raw_handler(
+            counter, service=service, subservice=subservice, consume=True
+        )
+        if isinstance(raw_logger, BinaryRawTmtcLogWrapper):
+            dispatcher.add_raw_handler(
+                lambda apid, service, subservice, packet: raw_logger.log_raw(
+                    PACKET_TYPE_TM, bytes(packet)
+                ),
+                service=service,
+                subservice=subservice,
+            )
+    atexit.register(counter.log_counts, dispatcher)
+
+
+def setup_tc_pipeline(
+    client_args: argparse.Namespace, entries, dispatcher, com_if, raw_logger, **kwargs
+):
+    from utility.tc_pipeline import TcPipeline
+
+    pipeline = TcPipeline(
+        com_if,
+        entries,
+        apid=client_args.tc_apid,
+        window_size=client_args.tc_window,
+        rate=client_args.tc_rate,
+        timeout=client_args.tc_timeout,
+        raw_logger=raw_logger,
+        **kwargs,
+    )
+    pipeline.register(dispatcher)
+    return pipeline
+
+
+def setup_multi_target_client(client_args: argparse.Namespace, hook, handler_factory):
+    """Create the targets of the targets file, each with its own handlers and logs.
+
+    :param handler_factory: Creates the TM and TC handlers of a target from its verificator,
+        raw logger and printer
+    """
+    from spacepackets.ecss import PusVerificator
+    from tmtccmd.logging.pus import TimedLogWhen
+    from tmtccmd.pus import VerificationWrapper
+    from tmtccmd.util.tmtc_printer import FsfwTmTcPrinter
+    from utility.multi_target import (
+        MultiTargetClient,
+        Target,
+        load_targets,
+        target_file_logger,
+        target_log_dir,
+        target_raw_logger,
+    )
+    from utility.tc_pipeline import load_tc_file
+    from utility.tm_dispatch import TmDispatcher, load_subservice_table
+
+    subservice_table = load_subservice_table()
+    entries = load_tc_file(client_args.tc_batch) if client_args.tc_batch else None
+    targets = []
+    for config in load_targets(client_args.targets):
+        file_logger = target_file_logger(config.name)
+        log_dir = target_log_dir(config.name)
+        if client_args.raw_log == "binary":
+            from utility.raw_log import BinaryRawTmtcLogWrapper
+
+            raw_logger = BinaryRawTmtcLogWrapper(
+                when=TimedLogWhen.PER_HOUR, interval=2, log_dir=log_dir
+            )
+            atexit.register(raw_logger.close)
+        else:
+            raw_logger = target_raw_logger(
+                config.name, when=TimedLogWhen.PER_HOUR, interval=2
+            )
+        # Verification results only go to the log of the target
+        verif_wrapper = VerificationWrapper(
+            console_logger=None,
+            file_logger=file_logger,
+            pus_verificator=PusVerificator(),
+        )
+        ccsds_handler, _ = handler_factory(
+            verif_wrapper=verif_wrapper,
+            raw_logger=raw_logger,
+            printer=FsfwTmTcPrinter(file_logger),
+        )
+        dispatcher = TmDispatcher(ccsds_handler, subservice_table=subservice_table)
+        if client_args.tm_bypass:
+            setup_tm_bypass(dispatcher, client_args.tm_bypass, raw_logger)
+        com_if = hook.create_target_com_interface(config)
+        pipeline = None
+        if entries is not None:
+            pipeline = setup_tc_pipeline(
+                client_args,
+                entries,
+                dispatcher,
+                com_if,
+                raw_logger,
+                name=config.name,
+                progress_interval=None,
+            )
+        targets.append(Target(config, com_if, dispatcher, verif_wrapper, pipeline))
+    return MultiTargetClient(targets, exit_after_batch=entries is not None)
+
+
+def log_startup_profile(profiler: StartupProfiler, hook):
+    defs_source = hook.get_tmtc_definitions().source or "not loaded"
+    LOGGER.info(f"Startup profile, TMTC definitions {defs_source}:")
+    for line in profiler.report():
+        LOGGER.info(line)
+
+
+def main():
+    global LOGGER
+    profiler = StartupProfiler(START_TIME)
+    with profiler.phase("tmtccmd imports"):
+        import tmtccmd
+        from spacepackets.ecss import PusVerificator
+        from tmtccmd import get_console_logger
+        from tmtccmd.core import BackendRequest
+        from tmtccmd.logging.pus import (
+            RegularTmtcLogWrapper,
+            RawTmtcTimedLogWrapper,
+            TimedLogWhen,
+        )
+        from tmtccmd.pus import VerificationWrapper
+        from tmtccmd.util.tmtc_printer import FsfwTmTcPrinter
+    with profiler.phase("common_tmtc imports"):
+        from common_tmtc.common import setup_params, setup_tmtc_handlers, setup_backend
+        from config.hook import FsfwHookBase
+    LOGGER = get_console_logger()
+    with profiler.phase("Client arguments"):
+        client_args = parse_client_args()
+    with profiler.phase("Setup parameters"):
+        hook = FsfwHookBase()
+        if client_args.rx_thread:
+            hook.rx_thread_slots = client_args.rx_slots
+        setup_wrapper = setup_params(hook)
+    if client_args.targets:
+        import asyncio
+
+        with profiler.phase("Targets"):
+            client = setup_multi_target_client(client_args, hook, setup_tmtc_handlers)
+        if client_args.profile_startup:
+            log_startup_profile(profiler, hook)
+        try:
+            sys.exit(asyncio.run(client.run()))
+        except KeyboardInterrupt:
+            sys.exit(0)
+    with profiler.phase("Handlers"):
+        tmtc_logger = RegularTmtcLogWrapper()
+        printer = FsfwTmTcPrinter(tmtc_logger.logger)
+        if client_args.raw_log == "binary":
+            from utility.raw_log import BinaryRawTmtcLogWrapper
+
+            raw_logger = BinaryRawTmtcLogWrapper(when=TimedLogWhen.PER_HOUR, interval=2)
+            atexit.register(raw_logger.close)
+        else:
+            raw_logger = RawTmtcTimedLogWrapper(when=TimedLogWhen.PER_HOUR, interval=2)
+        pus_verificator = PusVerificator()
+        verif_wrapper = VerificationWrapper(
+            console_logger=get_console_logger(),
+            file_logger=printer.file_logger,
+            pus_verificator=pus_verificator,
+        )
+        ccsds_handler, tc_handler = setup_tmtc_handlers(
+            verif_wrapper=verif_wrapper, raw_logger=raw_logger, printer=printer
+        )
+        dispatcher = None
+        if (
+            client_args.tm_bypass
+            or client_args.tc_batch
+            or client_args.cfdp_window > 0
+            or client_args.cfdp_put
+        ):
+            from utility.tm_dispatch import TmDispatcher
+
+            dispatcher = TmDispatcher(ccsds_handler)
+            ccsds_handler = dispatcher
+        if client_args.tm_bypass:
+            setup_tm_bypass(dispatcher, client_args.tm_bypass, raw_logger)
+    with profiler.phase("tmtccmd setup"):
+        tmtccmd.setup(setup_wrapper)
+    with profiler.phase("Backend"):
+        backend = setup_backend(
+            setup_wrapper=setup_wrapper,
+            ccsds_handler=ccsds_handler,
+            tc_handler=tc_handler,
+        )
+    uploader = None
+    if client_args.cfdp_window > 0 or client_args.cfdp_put:
+        from utility.cfdp_upload import CfdpUploader, DEFAULT_WINDOW_SIZE
+
+        uploader = CfdpUploader(
+            tc_handler.cfdp_in_ccsds_wrapper.handler,
+            backend.com_if,
+            window_size=client_args.cfdp_window or DEFAULT_WINDOW_SIZE,
+            max_transactions=client_args.cfdp_parallel,
+        )
+        uploader.register(dispatcher)
+    if client_args.cfdp_put:
+        file_count = uploader.put_files(
+            client_args.cfdp_put,
+            dest_dir=client_args.cfdp_dest_dir,
+            dest_id=client_args.cfdp_dest_id,
+        )
+        LOGGER.info(f"Uploading {file_count} files with CFDP")
+    pipeline = None
+    if client_args.tc_batch:
+        from utility.tc_pipeline import load_tc_file
+
+        entries = load_tc_file(client_args.tc_batch)
+        pipeline = setup_tc_pipeline(
+            client_args, entries, dispatcher, backend.com_if, raw_logger
+        )
+        LOGGER.info(
+            f"Sending {len(entries)} telecommands with up to {client_args.tc_window} "
+            f"in flight"
+        )
+    if client_args.profile_startup:
+        log_startup_profile(profiler, hook)
+    if client_args.async_mode:
+        import asyncio
+        from utility.async_client import AsyncClient
+
+        client = AsyncClient(
+            backend,
+            tc_handler,
+            uploader=uploader,
+            exit_after_upload=bool(client_args.cfdp_put),
+            pipeline=pipeline,
+        )
+        try:
+            sys.exit(asyncio.run(client.run()))
+        except KeyboardInterrupt:
+            sys.exit(0)
     try:
         while True:
             state = backend.periodic_op(None)
             tc_handler.cfdp_in_ccsds_wrapper.handler.fsm()
             if state.request == BackendRequest.TERMINATION_NO_ERROR:
                 sys.exit(0)
-            elif state.request == BackendRequest.DELAY_IDLE:
+            if uploader is not None and uploader.busy:
+                # Upload at line rate, telemetry is checked between the windows
+                uploader.operation()
+                continue
+            if client_args.cfdp_put:
+                LOGGER.info("CFDP uploads done, closing client")
+                sys.exit(0)
+            if pipeline is not None:
+                if pipeline.busy:
+                    backend.poll_tm()
+                    pipeline.operation()
+                    pipeline.wait()
+                    continue
+                pipeline.log_progress()
+                LOGGER.info("TC batch done, closing client")
+                sys.exit(0 if pipeline.succeeded else 1)
+            if state.request == BackendRequest.DELAY_IDLE:
                 LOGGER.info("TMTC Client in IDLE mode")
                 time.sleep(3.0)
             elif state.request == BackendRequest.DELAY_LISTENER:
@@ -0,0 +1,177 @@
+"""Event driven main loop for the TMTC client.
+
+The regular main loop of tmtcc.py polls the backend and sleeps a fixed time depending on the
+backend request. This loop runs on asyncio instead and only wakes up if there is work:
+
+- The socket of the communication interface became readable, or the receive thread of the
+  interface stored new packets
+- The delay requested by the TC sender expired
+- The service interval of the CFDP handler expired, also while the client is idle, or a
+  CFDP upload is in progress
+- A TC batch is in progress and its window or rate limit allows sending the next telecommand
+
+Communication interfaces which do not expose a selectable socket, like the TCP interface of
+tmtccmd which receives in its own thread, are polled with a short interval instead.
+"""
+import asyncio
+import socket
+from typing import Optional
+
+from tmtccmd import get_console_logger
+from tmtccmd.core import BackendRequest, TmMode
+from tmtccmd.core.ccsds_backend import CcsdsTmtcBackend
+from utility.cfdp_upload import CfdpUploader
+from utility.tc_pipeline import TcPipeline
+
+LOGGER = get_console_logger()
+
+# The CFDP handler does not expose the expiry of its timers, so it is serviced at least with
+# this interval while the client listens for telemetry or is idle
+CFDP_SERVICE_INTERVAL = 0.1
+# Poll interval for communication interfaces without a selectable socket
+POLL_INTERVAL = 0.02
+
+
+class AsyncClient:
+    """Runs the backend and the CFDP handler of the TMTC client on an asyncio loop.
+
+    :param backend: Backend returned by setup_backend
+    :param tc_handler: TC handler, which also owns the CFDP handler
+    :param uploader: Optional uploader, which sends the CFDP source PDUs
+    :param exit_after_upload: Return once the uploader is done
+    :param pipeline: Optional TC pipeline. The client returns once all its telecommands are
+        verified.
+    """
+
+    def __init__(
+        self,
+        backend: CcsdsTmtcBackend,
+        tc_handler,
+        uploader: Optional[CfdpUploader] = None,
+        exit_after_upload: bool = False,
+        pipeline: Optional[TcPipeline] = None,
+    ):
+        self.backend = backend
+        self.tc_handler = tc_handler
+        self.uploader = uploader
+        self.exit_after_upload = exit_after_upload
+        self.pipeline = pipeline
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_up_event: Optional[asyncio.Event] = None
+        self._reader_fd: Optional[int] = None
+        self._com_if_notifies = False
+
+    def wake_up(self):
+        """Request a backend operation. Can be called from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake_up_event.set)
+
+    async def run(self) -> int:
+        """Run the client until the backend requests termination.
+
+        :return: Exit code
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake_up_event = asyncio.Event()
+        idle_logged = False
+        try:
+            while True:
+                # Events arriving while the backend runs must wake up the next wait
+                self._wake_up_event.clear()
+                state = self.backend.periodic_op(None)
+                self.tc_handler.cfdp_in_ccsds_wrapper.handler.fsm()
+                self.__update_reader()
+                if state.request == BackendRequest.TERMINATION_NO_ERROR:
+                    return 0
+                if self.uploader is not None and self.uploader.busy:
+                    self.uploader.operation()
+                    await asyncio.sleep(0)
+                    continue
+                if self.exit_after_upload:
+                    LOGGER.info("CFDP uploads done, closing client")
+                    return 0
+                if self.pipeline is not None:
+                    if self.pipeline.busy:
+                        self.backend.poll_tm()
+                        self.pipeline.operation()
+                        await self.__wait_for_pipeline()
+                        continue
+                    self.pipeline.log_progress()
+                    LOGGER.info("TC batch done, closing client")
+                    return 0 if self.pipeline.succeeded else 1
+                if state.request == BackendRequest.DELAY_IDLE:
+                    if not idle_logged:
+                        LOGGER.info("TMTC Client in IDLE mode")
+                        idle_logged = True
+                    await self.__wait(CFDP_SERVICE_INTERVAL)
+                    continue
+                idle_logged = False
+                if state.request == BackendRequest.DELAY_LISTENER:
+                    if self.tc_handler.cfdp_done():
+                        LOGGER.info("CFDP transaction done, closing client")
+                        return 0
+                    await self.__wait(CFDP_SERVICE_INTERVAL)
+                elif state.request == BackendRequest.DELAY_CUSTOM:
+                    await self.__wait(state.next_delay.total_seconds())
+                else:
+                    # Give other tasks and callbacks a chance to run
+                    await asyncio.sleep(0)
+        finally:
+            self.__remove_reader()
+            self._loop = None
+
+    async def __wait(self, timeout: Optional[float]):
+        if (
+            self._reader_fd is None
+            and not self._com_if_notifies
+            and self.backend.tm_mode == TmMode.LISTENER
+        ):
+            timeout = POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL)
+        try:
+            await asyncio.wait_for(self._wake_up_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def __wait_for_pipeline(self):
+        delay = self.pipeline.next_delay()
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        # The socket is only watched in listener mode, which the pipeline does not require
+        try:
+            await asyncio.wait_for(
+                self._wake_up_event.wait(), min(delay, POLL_INTERVAL)
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    def __update_reader(self):
+        """Register the socket of the communication interface with the loop. The socket is
+        looked up after every operation, because interfaces may reopen their socket. It is
+        only watched in listener mode, because the backend does not read it otherwise.
+        """
+        com_if = self.backend.com_if
+        if hasattr(com_if, "data_callback"):
+            # The interface receives in its own thread and notifies about new packets
+            com_if.data_callback = self.wake_up
+            self._com_if_notifies = True
+            return
+        com_if_socket = getattr(com_if, "udp_socket", None)
+        fd = None
+        if (
+            self.backend.tm_mode == TmMode.LISTENER
+            and isinstance(com_if_socket, socket.socket)
+            and com_if_socket.fileno() >= 0
+        ):
+            fd = com_if_socket.fileno()
+        if fd == self._reader_fd:
+            return
+        self.__remove_reader()
+        if fd is not None:
+            self._loop.add_reader(fd, self._wake_up_event.set)
+            self._reader_fd = fd
+
+    def __remove_reader(self):
+        if self._reader_fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._reader_fd)
+        self._reader_fd = None
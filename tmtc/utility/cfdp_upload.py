@@ -0,0 +1,380 @@
+"""High throughput CFDP file upload.
+
+The CFDP source handler of tmtccmd generates one PDU per state machine call, and the main loop
+of tmtcc.py only calls the state machine once per iteration, followed by a sleep. Uploading a
+software image of a few hundred kilobytes therefore takes minutes.
+
+The uploader pumps the source handler directly and sends the generated PDUs in windows. A
+window is a burst of PDUs sent by one call, after which the main loop gets the chance to
+process telemetry, for example Finished PDUs. Unacknowledged transfers carry no
+acknowledgement per PDU, so the window can not limit the PDUs in flight. It ends early if
+the send buffer of the socket is full, so the upload runs at the rate the link accepts.
+Several files can be uploaded by concurrent transactions, which share the window.
+
+Source files are read through a memory map. File data PDUs reference the mapped file, and
+the PDU header and the file segment are sent with a single scatter-gather send call, so the
+file content is not copied on the way to the socket.
+"""
+import mmap
+import os
+import posixpath
+import socket
+import struct
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from spacepackets import PacketType, SpacePacketHeader
+from spacepackets.ccsds.spacepacket import SPACE_PACKET_HEADER_SIZE
+from spacepackets.cfdp import Direction, GenericPduPacket, PduFactory, PduType
+from spacepackets.cfdp.pdu import FileDataPdu, PduHolder
+from spacepackets.util import UnsignedByteField
+from tmtccmd import get_console_logger
+from tmtccmd.cfdp.defs import CfdpStates
+from tmtccmd.cfdp.filestore import HostFilestore
+from tmtccmd.cfdp.handler import CfdpInCcsdsHandler, SourceHandler
+from tmtccmd.cfdp.request import PutRequest, PutRequestCfg
+from tmtccmd.com_if import ComInterface
+from utility.defaults import DEFAULT_MAX_TRANSACTIONS
+from utility.tm_dispatch import TmDispatcher
+
+LOGGER = get_console_logger()
+
+DEFAULT_WINDOW_SIZE = 32
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class MmapFilestore(HostFilestore):
+    """Host filestore which serves file reads from memory maps. The returned data are
+    memoryviews into the mapped file, which stay valid until the file is released."""
+
+    def __init__(self):
+        super().__init__()
+        self._maps: Dict[str, Tuple[os.stat_result, mmap.mmap, memoryview]] = dict()
+
+    def read_data(
+        self, file: Path, offset: Optional[int], read_len: Optional[int] = None
+    ) -> Buffer:
+        if not file.exists():
+            raise FileNotFoundError(file)
+        return self.__read(str(file), offset or 0, read_len)
+
+    def read_from_opened_file(self, bytes_io: BinaryIO, offset: int, read_len: int):
+        name = getattr(bytes_io, "name", None)
+        if not isinstance(name, str):
+            return super().read_from_opened_file(bytes_io, offset, read_len)
+        return self.__read(name, offset, read_len)
+
+    def release(self, file: Optional[Path] = None):
+        """Unmap a file, or all files if no file is given."""
+        keys = list(self._maps) if file is None else [os.path.abspath(file)]
+        for key in keys:
+            entry = self._maps.pop(key, None)
+            if entry is None:
+                continue
+            _, file_map, view = entry
+            try:
+                view.release()
+                file_map.close()
+            except BufferError:
+                # A PDU still references the file. The map is closed once it is collected.
+                pass
+
+    def __read(self, name: str, offset: int, read_len: Optional[int]) -> Buffer:
+        view = self.__map(name)
+        if view is None:
+            # Empty files can not be mapped
+            return bytes()
+        if read_len is None:
+            return view[offset:]
+        return view[offset : offset + read_len]
+
+    def __map(self, name: str) -> Optional[memoryview]:
+        key = os.path.abspath(name)
+        stat = os.stat(key)
+        entry = self._maps.get(key)
+        if entry is not None:
+            old_stat = entry[0]
+            if (old_stat.st_size, old_stat.st_mtime_ns) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                return entry[2]
+            # The file changed since it was mapped
+            self.release(Path(key))
+        if stat.st_size == 0:
+            return None
+        with open(key, "rb") as file:
+            file_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(file_map)
+        self._maps[key] = (stat, file_map, view)
+        return view
+
+
+class UploadTransaction:
+    """Source handler of a transaction slot and the packet which it generated, but which could
+    not be sent yet because the send buffer was full."""
+
+    def __init__(self, source_handler: SourceHandler):
+        self.source_handler = source_handler
+        self.pending: Optional[List[Buffer]] = None
+
+    @property
+    def busy(self) -> bool:
+        return (
+            self.pending is not None
+            or self.source_handler.states.state != CfdpStates.IDLE
+        )
+
+
+class CfdpUploader:
+    """Sends the PDUs of CFDP source handlers in windows.
+
+    The uploader takes over sending the source PDUs of the handler, whose source handler is
+    the first transaction slot. Files queued with :py:meth:`put_files` are uploaded by up to
+    max_transactions concurrent transactions, each with its own source handler and
+    transaction sequence number. The transactions share the window round robin, one PDU at
+    a time, so small files are not stuck behind a large one.
+
+    The CFDP handler only passes received PDUs to its own source handler. The reply PDUs of
+    the other transactions are picked up from the TM dispatcher, see :py:meth:`register`.
+
+    The uploader also sets a :py:class:`MmapFilestore` as filestore of the CFDP user,
+    unless a filestore is passed. The source handlers of the queued files read the files
+    and calculate the checksums through it. The source handler of the TC handler only reads
+    the file data through it, because it took over the filestore for its checksums when it
+    was created.
+
+    :param handler: CFDP handler of the TC handler
+    :param com_if: Communication interface used to send the PDUs
+    :param window_size: Maximum number of PDUs sent per :py:meth:`operation` call. This
+        is not a limit of the PDUs in flight, which are not acknowledged one by one.
+    :param max_transactions: Maximum number of concurrent transactions for queued files
+    :param filestore: Filestore used to read the source files
+    """
+
+    def __init__(
+        self,
+        handler: CfdpInCcsdsHandler,
+        com_if: ComInterface,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        max_transactions: int = DEFAULT_MAX_TRANSACTIONS,
+        filestore: Optional[MmapFilestore] = None,
+    ):
+        if window_size < 1:
+            raise ValueError("The window size must be at least 1")
+        if max_transactions < 1:
+            raise ValueError("At least one transaction is required")
+        self.handler = handler
+        self.com_if = com_if
+        self.window_size = window_size
+        self.max_transactions = max_transactions
+        self.filestore = filestore if filestore is not None else MmapFilestore()
+        self.pdus_sent = 0
+        self.bytes_sent = 0
+        self.transactions = [UploadTransaction(handler.source_handler)]
+        self._put_requests: Deque[PutRequest] = deque()
+        # Transaction which sends the first PDU of the next round
+        self._next_transaction = 0
+        handler.source_handler.user.vfs = self.filestore
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._put_requests) or any(
+            transaction.busy for transaction in self.transactions
+        )
+
+    def put_files(
+        self, paths: Iterable[Union[str, Path]], dest_dir: str, dest_id: int
+    ) -> int:
+        """Queue the upload of files. All files of a directory are uploaded, without its
+        subdirectories.
+
+        :param paths: Files or directories
+        :param dest_dir: Directory of the files on the remote entity
+        :param dest_id: ID of the remote entity. It has the same width as the local
+            entity ID.
+        :return: Number of queued files
+        """
+        local_id = self.handler.source_handler.cfg.local_entity_id
+        destination_id = UnsignedByteField(dest_id, local_id.byte_len)
+        if self.handler.cfdp_handler.remote_cfg_table.get_cfg(destination_id) is None:
+            raise ValueError(f"No remote CFDP config found for entity ID {dest_id}")
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files.extend(
+                    sorted(entry for entry in path.iterdir() if entry.is_file())
+                )
+            else:
+                files.append(path)
+        for file in files:
+            self._put_requests.append(
+                PutRequest(
+                    PutRequestCfg(
+                        destination_id=destination_id,
+                        source_file=file,
+                        dest_file=posixpath.join(dest_dir, file.name),
+                        trans_mode=None,
+                        closure_requested=None,
+                    )
+                )
+            )
+        return len(files)
+
+    def register(self, dispatcher: TmDispatcher):
+        """Pick up the reply PDUs of the queued transactions before the TM handler passes
+        them to the CFDP handler."""
+        dispatcher.add_raw_handler(self.handle_packet, apid=self.handler.ccsds_apid)
+
+    def handle_packet(
+        self,
+        apid: int,
+        service: Optional[int],
+        subservice: Optional[int],
+        packet: memoryview,
+    ) -> bool:
+        """Raw TM handler for the space packets of the CFDP APID.
+
+        :return: True if the packet contained a PDU of a queued transaction
+        """
+        if service is not None or len(self.transactions) < 2:
+            return False
+        try:
+            pdu = PduFactory.from_raw(bytes(packet[SPACE_PACKET_HEADER_SIZE:]))
+        except (ValueError, IndexError):
+            return False
+        return pdu is not None and self.pass_pdu(pdu)
+
+    def pass_pdu(self, pdu: GenericPduPacket) -> bool:
+        """Pass a PDU directed to the file sender to the queued transaction it belongs to.
+
+        :return: True if the PDU was passed. Otherwise, it belongs to the CFDP handler.
+        """
+        if pdu.pdu_header.direction != Direction.TOWARDS_SENDER:
+            return False
+        for transaction in self.transactions[1:]:
+            source_handler = transaction.source_handler
+            if (
+                source_handler.states.state != CfdpStates.IDLE
+                and source_handler.transaction_seq_num == pdu.transaction_seq_num
+            ):
+                source_handler.pass_packet(pdu)
+                return True
+        return False
+
+    def operation(self) -> int:
+        """Start queued transactions and send the next window of source PDUs.
+
+        :return: Number of PDUs sent
+        """
+        self.__start_transactions()
+        sent = 0
+        blocked = False
+        while sent < self.window_size and not blocked:
+            sent_in_round = 0
+            count = len(self.transactions)
+            for offset in range(count):
+                index = (self._next_transaction + offset) % count
+                if sent == self.window_size:
+                    self._next_transaction = index
+                    break
+                transaction = self.transactions[index]
+                if not self.__prepare_packet(transaction):
+                    continue
+                if not self.__send(transaction.pending):
+                    # The send buffer is full, the window ends early
+                    self._next_transaction = index
+                    blocked = True
+                    break
+                transaction.pending = None
+                sent += 1
+                sent_in_round += 1
+            if sent_in_round == 0:
+                break
+            # Transactions which finished during this window free their slot
+            self.__start_transactions()
+        if not self.busy:
+            self.filestore.release()
+        self.pdus_sent += sent
+        return sent
+
+    def __start_transactions(self):
+        # Every queued file gets a new source handler, because a source handler does not
+        # reset all of its transaction state at the end of a transaction. The first slot
+        # belongs to the source handler of the TC handler.
+        self.transactions = self.transactions[:1] + [
+            transaction for transaction in self.transactions[1:] if transaction.busy
+        ]
+        while self._put_requests and len(self.transactions) <= self.max_transactions:
+            request = self._put_requests.popleft()
+            base_handler = self.handler.source_handler
+            source_handler = SourceHandler(
+                base_handler.cfg, base_handler.seq_num_provider, base_handler.user
+            )
+            remote_cfg = self.handler.cfdp_handler.remote_cfg_table.get_cfg(
+                request.cfg.destination_id
+            )
+            LOGGER.info(f"CFDP upload of {request.cfg.source_file} started")
+            source_handler.put_request(request, remote_cfg)
+            self.transactions.append(UploadTransaction(source_handler))
+
+    def __prepare_packet(self, transaction: UploadTransaction) -> bool:
+        """Generate the next packet of a transaction, unless one is still pending.
+
+        :return: True if the transaction has a packet to send
+        """
+        if transaction.pending is not None:
+            return True
+        source_handler = transaction.source_handler
+        if not source_handler.states.packet_ready:
+            if source_handler.states.state == CfdpStates.IDLE:
+                return False
+            source_handler.state_machine()
+            if not source_handler.states.packet_ready:
+                return False
+        transaction.pending = self.__space_packet_parts(source_handler.pdu_holder)
+        # The packet is confirmed once it is owned by the uploader, so the state machine
+        # can also be called by the main loop while a packet is pending
+        source_handler.confirm_packet_sent_advance_fsm()
+        return True
+
+    def __space_packet_parts(self, pdu_holder: PduHolder) -> List[Buffer]:
+        """Pack the PDU into a space packet. The file segment of a file data PDU is kept as
+        a separate buffer referencing the source file."""
+        pdu = pdu_holder.base
+        if (
+            pdu.pdu_type == PduType.FILE_DATA
+            and isinstance(pdu, FileDataPdu)
+            and not pdu.has_segment_metadata
+        ):
+            pdu_header = pdu.pdu_header
+            offset_format = "!Q" if pdu_header.large_file_flag_set else "!I"
+            parts = [
+                pdu_header.pack() + struct.pack(offset_format, pdu.offset),
+                pdu.file_data,
+            ]
+        else:
+            parts = [pdu.pack()]
+        pdu_len = sum(len(part) for part in parts)
+        sp_header = SpacePacketHeader(
+            packet_type=PacketType.TC,
+            apid=self.handler.ccsds_apid,
+            seq_count=self.handler.ccsds_seq_cnt_provider.get_and_increment(),
+            data_len=pdu_len - 1,
+        )
+        return [sp_header.pack()] + parts
+
+    def __send(self, parts: List[Buffer]) -> bool:
+        udp_com_if = getattr(self.com_if, "com_if", self.com_if)
+        udp_socket = getattr(udp_com_if, "udp_socket", None)
+        if not isinstance(udp_socket, socket.socket):
+            self.com_if.send(b"".join(parts))
+        else:
+            try:
+                udp_socket.sendmsg(parts, [], 0, udp_com_if.send_address.to_tuple)
+            except (BlockingIOError, InterruptedError):
+                return False
+        self.bytes_sent += sum(len(part) for part in parts)
+        return True
@@ -0,0 +1,14 @@
+"""Default settings of the client options.
+
+The command line of the client is parsed before tmtccmd and the modules using these settings
+are imported, so this module must not import anything but the standard library.
+"""
+
+# Maximum number of concurrent CFDP uploads
+DEFAULT_MAX_TRANSACTIONS = 4
+# APID, window size and timeout of pipelined telecommands
+DEFAULT_TC_APID = 0xEF
+DEFAULT_TC_WINDOW = 16
+DEFAULT_TC_TIMEOUT = 30.0
+# Number of packets the receive ring buffer holds
+DEFAULT_SLOT_COUNT = 1024
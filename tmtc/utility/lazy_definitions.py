@@ -0,0 +1,124 @@
+"""Lazily built and cached TMTC definitions.
+
+tmtccmd requests the service and op code definitions on every start, but only uses them to
+prompt for a service or an op code. Building them imports every TC module of common_tmtc.
+The wrapper of this module builds them on first access instead, and stores them in a cache
+file which is reused while the source files of the definitions are unchanged.
+"""
+import os
+import pickle
+import sys
+from importlib.util import find_spec
+from typing import Callable, Iterable, Optional, Tuple
+
+import tmtccmd
+from tmtccmd import get_console_logger
+from tmtccmd.config import TmtcDefinitionWrapper
+from tmtccmd.config.tmtc import ServiceOpCodeDictT
+
+LOGGER = get_console_logger()
+
+DEFS_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "log", "tmtc_defs.pickle"
+)
+
+
+class LazyTmtcDefinitionWrapper(TmtcDefinitionWrapper):
+    """TMTC definitions which are built when their dictionary is first accessed.
+
+    :param builder: Builds the definitions
+    :param source_packages: Packages which contain the definitions. The cache is invalid if
+        any Python file of these packages changed.
+    :param cache_file: Cache file, or None to disable the cache
+    """
+
+    def __init__(
+        self,
+        builder: Callable[[], TmtcDefinitionWrapper],
+        source_packages: Iterable[str],
+        cache_file: Optional[str] = DEFS_CACHE_FILE,
+    ):
+        # The base class constructor is not called, it would assign the dictionary
+        self._defs: Optional[ServiceOpCodeDictT] = None
+        self.builder = builder
+        self.source_packages = tuple(source_packages)
+        self.cache_file = cache_file
+        # How the definitions were loaded, None until they are accessed
+        self.source: Optional[str] = None
+
+    @property
+    def defs(self) -> ServiceOpCodeDictT:
+        if self._defs is None:
+            self._defs = self.__load()
+        return self._defs
+
+    @defs.setter
+    def defs(self, defs: ServiceOpCodeDictT):
+        self._defs = defs
+
+    def __load(self) -> ServiceOpCodeDictT:
+        key = None
+        if self.cache_file is not None:
+            key = self.__cache_key()
+            defs = self.__read_cache(key)
+            if defs is not None:
+                self.source = "loaded from cache"
+                return defs
+        self.source = "built"
+        defs = self.builder().defs
+        if key is not None:
+            self.__write_cache(key, defs)
+        return defs
+
+    def __cache_key(self) -> Tuple:
+        return (
+            sys.version_info[:2],
+            tmtccmd.__version__,
+            tuple(_package_stamp(package) for package in self.source_packages),
+        )
+
+    def __read_cache(self, key: Tuple) -> Optional[ServiceOpCodeDictT]:
+        try:
+            with open(self.cache_file, "rb") as file:
+                cached_key, defs = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Stale caches may reference classes which no longer exist
+            LOGGER.debug("TMTC definition cache is unreadable, rebuilding it")
+            return None
+        return defs if cached_key == key else None
+
+    def __write_cache(self, key: Tuple, defs: ServiceOpCodeDictT):
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(temp_file, "wb") as file:
+                pickle.dump((key, defs), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+        except (OSError, pickle.PicklingError, AttributeError, TypeError):
+            LOGGER.debug("TMTC definitions can not be cached")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+
+def _package_stamp(package: str) -> Tuple[str, int, int]:
+    """Return the number of Python files and their latest modification time, which changes
+    when a file of the package was edited, added or removed."""
+    spec = find_spec(package)
+    if spec is None:
+        return package, 0, 0
+    if spec.submodule_search_locations is None:
+        stat = os.stat(spec.origin)
+        return package, 1, stat.st_mtime_ns
+    file_count = 0
+    latest = 0
+    for location in spec.submodule_search_locations:
+        for root, dirs, files in os.walk(location):
+            dirs[:] = [name for name in dirs if name != "__pycache__"]
+            latest = max(latest, os.stat(root).st_mtime_ns)
+            for name in files:
+                if name.endswith(".py"):
+                    file_count += 1
+                    latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return package, file_count, latest
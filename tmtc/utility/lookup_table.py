@@ -0,0 +1,251 @@
+"""Memory mapped lookup tables for the translation of event IDs, object IDs and returnvalues.
+
+The tables are generated by the generators next to the CSV files. The file is mapped into
+memory and binary searched directly, so opening a table does not parse anything and the pages
+are shared between all client processes using the same table. See
+generators/utility/lookup_table.py for the file layout.
+
+The tables are also offered as read-only dictionaries in the formats tmtccmd uses for its
+event, object ID and returnvalue dictionaries, which decode an entry when it is accessed.
+The hook hands them to the TM handlers instead of dictionaries parsed from the CSV files.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LOOKUP_TABLE_MAGIC = b"FSLT"
+LOOKUP_TABLE_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+STRING_REF = struct.Struct("<II")
+ID = struct.Struct("<I")
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
+EVENTS_LOOKUP_TABLE = os.path.join(CONFIG_DIR, "events.bin")
+OBJECTS_LOOKUP_TABLE = os.path.join(CONFIG_DIR, "objects.bin")
+RETURNVALUES_LOOKUP_TABLE = os.path.join(CONFIG_DIR, "returnvalues.bin")
+
+
+class LookupTable:
+    """Read-only view on a binary lookup table.
+
+    :param file_name: Lookup table generated by the generators
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        with open(file_name, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, field_count, entry_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != LOOKUP_TABLE_MAGIC or version != LOOKUP_TABLE_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"{file_name} is not a lookup table of version {LOOKUP_TABLE_VERSION}"
+            )
+        self._field_count = field_count
+        self._entry_count = entry_count
+        ids_offset = HEADER.size + field_count * STRING_REF.size
+        self._records_offset = ids_offset + entry_count * ID.size
+        self._blob_offset = (
+            self._records_offset + entry_count * field_count * STRING_REF.size
+        )
+        self._view = memoryview(self._mmap)
+        ids = self._view[ids_offset : self._records_offset]
+        if sys.byteorder == "little":
+            self._ids: Sequence[int] = ids.cast("I")
+        else:
+            # The IDs are stored little endian, so they have to be swapped once
+            self._ids = array("I", ids)
+            self._ids.byteswap()
+        self.fields: Tuple[str, ...] = tuple(
+            self.__string(HEADER.size + index * STRING_REF.size)
+            for index in range(field_count)
+        )
+
+    def __len__(self) -> int:
+        return self._entry_count
+
+    def __contains__(self, entry_id: int) -> bool:
+        return self.__index(entry_id) is not None
+
+    def lookup(self, entry_id: int) -> Optional[Tuple[str, ...]]:
+        """Return all fields of an entry, or None if the ID is unknown."""
+        index = self.__index(entry_id)
+        if index is None:
+            return None
+        record_offset = (
+            self._records_offset + index * self._field_count * STRING_REF.size
+        )
+        return tuple(
+            self.__string(record_offset + field * STRING_REF.size)
+            for field in range(self._field_count)
+        )
+
+    def lookup_field(self, entry_id: int, field: str) -> Optional[str]:
+        """Return a single field of an entry, or None if the ID is unknown."""
+        index = self.__index(entry_id)
+        if index is None:
+            return None
+        return self.__string(
+            self._records_offset
+            + (index * self._field_count + self.fields.index(field)) * STRING_REF.size
+        )
+
+    def name(self, entry_id: int) -> Optional[str]:
+        """Return the name of an entry. The name is always the first field."""
+        return self.lookup_field(entry_id, self.fields[0])
+
+    def as_dict(self) -> Dict[int, Tuple[str, ...]]:
+        """Decode the whole table. Only intended for tools which need all entries."""
+        return {entry_id: self.lookup(entry_id) for entry_id in self.ids()}
+
+    def ids(self) -> List[int]:
+        return list(self._ids)
+
+    def close(self):
+        if isinstance(self._ids, memoryview):
+            self._ids.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __index(self, entry_id: int) -> Optional[int]:
+        index = bisect_left(self._ids, entry_id)
+        if index < self._entry_count and self._ids[index] == entry_id:
+            return index
+        return None
+
+    def __string(self, ref_offset: int) -> str:
+        offset, length = STRING_REF.unpack_from(self._mmap, ref_offset)
+        start = self._blob_offset + offset
+        return self._mmap[start : start + length].decode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_TABLES: Dict[str, Optional[LookupTable]] = dict()
+
+
+def get_lookup_table(file_name: str) -> Optional[LookupTable]:
+    """Open a lookup table once per process. Returns None if the table was not generated."""
+    if file_name not in _TABLES:
+        _TABLES[file_name] = (
+            LookupTable(file_name) if os.path.isfile(file_name) else None
+        )
+    return _TABLES[file_name]
+
+
+def translate_event(event_id: int) -> Optional[str]:
+    table = get_lookup_table(EVENTS_LOOKUP_TABLE)
+    return table.name(event_id) if table is not None else None
+
+
+def translate_object_id(object_id: int) -> Optional[str]:
+    table = get_lookup_table(OBJECTS_LOOKUP_TABLE)
+    return table.name(object_id) if table is not None else None
+
+
+def translate_returnvalue(code: int) -> Optional[str]:
+    table = get_lookup_table(RETURNVALUES_LOOKUP_TABLE)
+    return table.name(code) if table is not None else None
+
+
+class LookupTableDict(Mapping):
+    """Read-only dictionary view on a lookup table.
+
+    :param table: Lookup table
+    :param make_value: Creates the value of an entry from its ID and fields
+    :param key_to_id: Converts a dictionary key into a table ID, or returns None if the key
+        has the wrong format
+    :param id_to_key: Converts a table ID into a dictionary key
+    """
+
+    def __init__(
+        self,
+        table: LookupTable,
+        make_value: Callable[[int, Tuple[str, ...]], Any],
+        key_to_id: Callable[[Any], Optional[int]] = lambda key: key,
+        id_to_key: Callable[[int], Any] = lambda entry_id: entry_id,
+    ):
+        self.table = table
+        self.make_value = make_value
+        self.key_to_id = key_to_id
+        self.id_to_key = id_to_key
+
+    def __getitem__(self, key):
+        entry_id = self.key_to_id(key)
+        fields = self.table.lookup(entry_id) if isinstance(entry_id, int) else None
+        if fields is None:
+            raise KeyError(key)
+        return self.make_value(entry_id, fields)
+
+    def __contains__(self, key) -> bool:
+        entry_id = self.key_to_id(key)
+        return isinstance(entry_id, int) and entry_id in self.table
+
+    def __iter__(self) -> Iterator:
+        return (self.id_to_key(entry_id) for entry_id in self.table.ids())
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+def get_event_dict() -> Optional[LookupTableDict]:
+    """Return the event table as event dictionary of tmtccmd, keyed by the event ID."""
+    table = get_lookup_table(EVENTS_LOOKUP_TABLE)
+    if table is None:
+        return None
+    from tmtccmd.pus.pus_5_event import EventInfo
+
+    def make_event_info(event_id: int, fields: Tuple[str, ...]) -> EventInfo:
+        info = EventInfo()
+        info.id = event_id
+        info.name, info.severity, info.info, info.file_location = fields
+        return info
+
+    return LookupTableDict(table, make_event_info)
+
+
+def get_object_id_dict() -> Optional[LookupTableDict]:
+    """Return the object table as object ID dictionary of tmtccmd, keyed by the big endian
+    bytes of the object ID."""
+    table = get_lookup_table(OBJECTS_LOOKUP_TABLE)
+    if table is None:
+        return None
+    from tmtccmd.util.obj_id import ObjectIdU32
+
+    def object_id_to_int(key) -> Optional[int]:
+        if not isinstance(key, (bytes, bytearray)) or len(key) != 4:
+            return None
+        return int.from_bytes(key, "big")
+
+    return LookupTableDict(
+        table,
+        lambda object_id, fields: ObjectIdU32(object_id, fields[0]),
+        key_to_id=object_id_to_int,
+        id_to_key=lambda object_id: object_id.to_bytes(4, "big"),
+    )
+
+
+def get_retval_dict() -> Optional[LookupTableDict]:
+    """Return the returnvalue table as returnvalue dictionary of tmtccmd, keyed by the
+    returnvalue code."""
+    table = get_lookup_table(RETURNVALUES_LOOKUP_TABLE)
+    if table is None:
+        return None
+    from tmtccmd.util.retval import RetvalInfo
+
+    def make_retval_info(code: int, fields: Tuple[str, ...]) -> RetvalInfo:
+        info = RetvalInfo()
+        info.id = code
+        info.name, info.info, _, _, info.if_name = fields
+        return info
+
+    return LookupTableDict(table, make_retval_info)
@@ -0,0 +1,297 @@
+"""Telemetry and telecommand handling for several hosted OBSW instances in one process.
+
+Every target has its own communication interface, TM handler, verificator and log folder,
+which are created by the client from a targets file. All targets are served by one asyncio
+loop, and share the TMTC definitions and the subservice table of the client.
+
+Targets file layout:
+
+    {
+        "targets": [
+            {"name": "obsw-1", "com_if": "udp", "ip_addr": "127.0.0.1", "port": 7301},
+            {"name": "obsw-2", "com_if": "tcp", "ip_addr": "127.0.0.1", "port": 7401}
+        ]
+    }
+
+The receive size of a target can be set with the optional recv_max_size entry. The hosted
+OBSW sends UDP telemetry to the sender of the last telecommand, so a ping telecommand is sent
+to every UDP target when the client starts.
+"""
+import asyncio
+import json
+import logging
+import os
+from logging.handlers import TimedRotatingFileHandler
+import socket
+import time
+from typing import List, NamedTuple, Optional
+
+from spacepackets.ecss import PusTelecommand
+from tmtccmd import get_console_logger
+from tmtccmd.com_if import ComInterface
+from tmtccmd.logging import LOG_DIR, TMTC_LOGGER_NAME
+from tmtccmd.logging.pus import (
+    RAW_PUS_FILE_BASE_NAME,
+    RAW_PUS_LOGGER_NAME,
+    RawTmtcLogBase,
+    TimedLogWhen,
+)
+from tmtccmd.pus import VerificationWrapper
+from tmtccmd.tm.ccsds_tm_listener import CcsdsTmListener
+from utility.async_client import POLL_INTERVAL
+from utility.defaults import DEFAULT_TC_APID
+from utility.tc_pipeline import TcPipeline
+from utility.tm_dispatch import TmDispatcher
+
+LOGGER = get_console_logger()
+
+DEFAULT_RECV_MAX_SIZE = 1500
+TARGET_COM_IFS = ("udp", "tcp")
+# Interval of the aggregated status log
+STATUS_INTERVAL = 10.0
+
+
+class TargetConfig(NamedTuple):
+    name: str
+    com_if_key: str
+    ip_addr: str
+    port: int
+    recv_max_size: int = DEFAULT_RECV_MAX_SIZE
+
+
+def load_targets(file_name: str) -> List[TargetConfig]:
+    with open(file_name) as file:
+        cfg = json.load(file)
+    targets = []
+    for entry in cfg.get("targets", []):
+        try:
+            target = TargetConfig(
+                name=entry["name"],
+                com_if_key=entry.get("com_if", "udp"),
+                ip_addr=entry["ip_addr"],
+                port=int(entry["port"]),
+                recv_max_size=int(entry.get("recv_max_size", DEFAULT_RECV_MAX_SIZE)),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{file_name}: Invalid target {entry}")
+        if target.com_if_key not in TARGET_COM_IFS:
+            raise ValueError(
+                f"{file_name}: Target {target.name} uses the unsupported "
+                f"communication interface {target.com_if_key}"
+            )
+        if any(other.name == target.name for other in targets):
+            raise ValueError(f"{file_name}: Duplicate target name {target.name}")
+        targets.append(target)
+    if not targets:
+        raise ValueError(f"{file_name}: No targets")
+    return targets
+
+
+def target_log_dir(name: str) -> str:
+    return os.path.join(LOG_DIR, name)
+
+
+def target_file_logger(name: str) -> logging.Logger:
+    """Return a TMTC file logger which writes into the log folder of the target."""
+    log_dir = target_log_dir(name)
+    os.makedirs(log_dir, exist_ok=True)
+    logger = logging.getLogger(f"{TMTC_LOGGER_NAME}.{name}")
+    if not logger.handlers:
+        handler = logging.FileHandler(os.path.join(log_dir, "tmtc.log"))
+        handler.setFormatter(
+            logging.Formatter(fmt="%(asctime)s.%(msecs)03d: %(message)s")
+        )
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        # The log of the client must not contain the packets of all targets
+        logger.propagate = False
+    return logger
+
+
+def target_raw_logger(
+    name: str, when: TimedLogWhen = TimedLogWhen.PER_HOUR, interval: int = 1
+) -> RawTmtcLogBase:
+    """Return a timed raw TMTC text log which writes into the log folder of the target.
+    The raw log wrappers of tmtccmd all share one logger, so every log file would receive
+    the packets of all targets."""
+    log_dir = target_log_dir(name)
+    os.makedirs(log_dir, exist_ok=True)
+    logger = logging.getLogger(f"{RAW_PUS_LOGGER_NAME}.{name}")
+    if not logger.handlers:
+        handler = TimedRotatingFileHandler(
+            filename=os.path.join(log_dir, f"{RAW_PUS_FILE_BASE_NAME}.log"),
+            when=when.value,
+            interval=interval,
+        )
+        handler.setFormatter(
+            logging.Formatter(
+                fmt="%(asctime)s.%(msecs)03d: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            )
+        )
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return RawTmtcLogBase(logger)
+
+
+class Target:
+    """Communication interface and TM handling of one OBSW instance.
+
+    :param config: Target configuration
+    :param com_if: Communication interface of the target
+    :param dispatcher: TM dispatcher wrapping the TM handler of the target
+    :param verif_wrapper: Verificator of the target
+    :param pipeline: Optional TC pipeline of the target
+    """
+
+    def __init__(
+        self,
+        config: TargetConfig,
+        com_if: ComInterface,
+        dispatcher: TmDispatcher,
+        verif_wrapper: VerificationWrapper,
+        pipeline: Optional[TcPipeline] = None,
+    ):
+        self.config = config
+        self.com_if = com_if
+        self.dispatcher = dispatcher
+        self.verif_wrapper = verif_wrapper
+        self.pipeline = pipeline
+        self.listener = CcsdsTmListener(dispatcher)
+        self.received = 0
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def open(self):
+        self.com_if.open()
+        if self.config.com_if_key == "udp":
+            apid = DEFAULT_TC_APID
+            seq_count = 0
+            if self.pipeline is not None:
+                # The pipeline takes all verification reports of its APID
+                apid = self.pipeline.apid
+                seq_count = self.pipeline.reserve_seq_count()
+            ping = PusTelecommand(
+                service=17, subservice=1, apid=apid, seq_count=seq_count
+            )
+            self.verif_wrapper.add_tc(ping)
+            self.com_if.send(ping.pack())
+
+    def close(self):
+        self.com_if.close()
+
+    def operation(self):
+        self.received += self.listener.operation(self.com_if)
+        if self.pipeline is not None and self.pipeline.busy:
+            self.pipeline.operation()
+
+    @property
+    def busy(self) -> bool:
+        return self.pipeline is not None and self.pipeline.busy
+
+    def status(self) -> str:
+        status = f"{self.name}: {self.received} TM"
+        if self.pipeline is not None:
+            stats = self.pipeline.stats()
+            status += (
+                f", TC {stats.sent}/{stats.total} sent, {stats.completed} completed, "
+                f"{stats.failed + stats.timed_out} failed, {stats.outstanding} outstanding"
+            )
+        return status
+
+
+class MultiTargetClient:
+    """Serves all targets on one asyncio loop.
+
+    :param targets: Targets
+    :param exit_after_batch: Return once the TC pipelines of all targets are done
+    """
+
+    def __init__(self, targets: List[Target], exit_after_batch: bool = False):
+        self.targets = targets
+        self.exit_after_batch = exit_after_batch
+        self._wake_up_event: Optional[asyncio.Event] = None
+        self._reader_fds: List[int] = []
+        # Targets which notify about new telemetry, by socket or by callback
+        self._watched_targets = 0
+        self._next_status_time = 0.0
+
+    async def run(self) -> int:
+        """Run the client until all TC batches are done, or forever if there are none.
+
+        :return: Exit code
+        """
+        loop = asyncio.get_running_loop()
+        self._wake_up_event = asyncio.Event()
+        for target in self.targets:
+            target.open()
+            self.__watch(loop, target)
+        LOGGER.info(f"Serving {len(self.targets)} targets")
+        self._next_status_time = time.monotonic() + STATUS_INTERVAL
+        try:
+            while True:
+                self._wake_up_event.clear()
+                for target in self.targets:
+                    target.operation()
+                if time.monotonic() >= self._next_status_time:
+                    self._next_status_time = time.monotonic() + STATUS_INTERVAL
+                    self.log_status()
+                busy = any(target.busy for target in self.targets)
+                if self.exit_after_batch and not busy:
+                    self.log_status()
+                    LOGGER.info("TC batches of all targets done, closing client")
+                    return 0 if self.succeeded else 1
+                await self.__wait(busy)
+        finally:
+            for fd in self._reader_fds:
+                loop.remove_reader(fd)
+            self._reader_fds.clear()
+            for target in self.targets:
+                target.close()
+
+    @property
+    def succeeded(self) -> bool:
+        return all(
+            target.pipeline is None or target.pipeline.succeeded
+            for target in self.targets
+        )
+
+    def log_status(self):
+        total = sum(target.received for target in self.targets)
+        LOGGER.info(f"{len(self.targets)} targets, {total} TM received")
+        for target in self.targets:
+            LOGGER.info(target.status())
+
+    async def __wait(self, busy: bool):
+        timeout = STATUS_INTERVAL
+        if busy:
+            timeout = min(
+                target.pipeline.next_delay() for target in self.targets if target.busy
+            )
+            if timeout <= 0:
+                await asyncio.sleep(0)
+                return
+        if self._watched_targets < len(self.targets):
+            # Some targets can not notify about new telemetry and are polled
+            timeout = min(timeout, POLL_INTERVAL)
+        try:
+            await asyncio.wait_for(self._wake_up_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def __watch(self, loop: asyncio.AbstractEventLoop, target: Target):
+        com_if = target.com_if
+        if hasattr(com_if, "data_callback"):
+            # The interface receives in its own thread and notifies about new packets
+            com_if.data_callback = lambda: loop.call_soon_threadsafe(
+                self._wake_up_event.set
+            )
+            self._watched_targets += 1
+            return
+        com_if_socket = getattr(com_if, "udp_socket", None)
+        if isinstance(com_if_socket, socket.socket) and com_if_socket.fileno() >= 0:
+            loop.add_reader(com_if_socket.fileno(), self._wake_up_event.set)
+            self._reader_fds.append(com_if_socket.fileno())
+            self._watched_targets += 1
@@ -0,0 +1,233 @@
+"""Binary raw TM/TC log with a background writer thread.
+
+The raw log wrappers of tmtccmd format a hex dump of every packet and write it synchronously
+on the main loop. This logger only appends the packed packet and a timestamp to a queue. A
+writer thread collects the queued packets and writes them in batches with os.writev into a
+length prefixed binary log.
+
+The log files are rotated on the same schedule as the timed raw log of tmtccmd. Every log
+file has an index file next to it, which maps timestamps to file offsets, so readers can
+seek to a point in time without scanning the whole log.
+
+Log file layout, all integers little endian:
+
+- File header: magic ``RTLG``, format version (u16), reserved (u16)
+- Records: timestamp in seconds since the epoch (f64), packet type (u8, 0 for TC and 1 for
+  TM), packet length (u32), packet
+
+Index file layout: a sequence of timestamps (f64) and log file offsets (u64). An entry is
+written for the first record of every batch.
+"""
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from spacepackets.ecss import PusTelecommand, PusTelemetry
+from tmtccmd import get_console_logger
+from tmtccmd.logging import LOG_DIR
+from tmtccmd.logging.pus import TimedLogWhen
+
+LOGGER = get_console_logger()
+
+RAW_LOG_MAGIC = b"RTLG"
+RAW_LOG_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH")
+RECORD_HEADER = struct.Struct("<dBI")
+INDEX_ENTRY = struct.Struct("<dQ")
+PACKET_TYPE_TC = 0
+PACKET_TYPE_TM = 1
+
+RAW_LOG_BASE_NAME = "raw-tmtc"
+# Maximum time a packet stays in the queue before it is written
+FLUSH_INTERVAL = 0.2
+# The writer is woken up early if this many packets are queued
+BATCH_SIZE = 256
+SECONDS_PER_UNIT = {
+    TimedLogWhen.PER_SECOND: 1,
+    TimedLogWhen.PER_MINUTE: 60,
+    TimedLogWhen.PER_HOUR: 3600,
+    TimedLogWhen.PER_DAY: 86400,
+}
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+
+class BinaryRawTmtcLogWrapper:
+    """Drop-in replacement for the raw TMTC log wrappers of tmtccmd.
+
+    :param when: A new log file is created at the product of when and interval
+    :param interval: A new log file is created at the product of when and interval
+    :param log_dir: Directory of the log and index files
+    """
+
+    def __init__(
+        self,
+        when: TimedLogWhen = TimedLogWhen.PER_HOUR,
+        interval: int = 1,
+        log_dir: str = LOG_DIR,
+    ):
+        self.rotation_interval = SECONDS_PER_UNIT[when] * interval
+        self.log_dir = log_dir
+        self.counter = 0
+        self.file_name: Optional[str] = None
+        self._queue: Deque[Tuple[float, int, bytes]] = deque()
+        self._wake_up_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._log_fd: Optional[int] = None
+        self._index_fd: Optional[int] = None
+        self._log_offset = 0
+        self._rotation_time = 0.0
+        os.makedirs(log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self.__writer_thread, daemon=True)
+        self._thread.start()
+
+    def log_tc(self, packet: PusTelecommand):
+        self.log_raw(PACKET_TYPE_TC, packet.pack())
+
+    def log_tm(self, packet: PusTelemetry):
+        self.log_raw(PACKET_TYPE_TM, packet.pack())
+
+    def log_raw(self, packet_type: int, raw: bytes):
+        """Queue a packet. This is the only work done on the calling thread."""
+        self._queue.append((time.time(), packet_type, raw))
+        self.counter += 1
+        if len(self._queue) >= BATCH_SIZE:
+            self._wake_up_event.set()
+
+    def close(self):
+        """Write all queued packets and close the log files."""
+        self._stop_event.set()
+        self._wake_up_event.set()
+        self._thread.join()
+
+    def __writer_thread(self):
+        while True:
+            self._wake_up_event.wait(FLUSH_INTERVAL)
+            self._wake_up_event.clear()
+            stopping = self._stop_event.is_set()
+            try:
+                self.__write_batch()
+            except OSError:
+                LOGGER.exception("Binary raw log: Writing packets failed")
+            if stopping:
+                self.__close_files()
+                return
+
+    def __write_batch(self):
+        batch: List[Tuple[float, int, bytes]] = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+        start = 0
+        for index, (timestamp, _, _) in enumerate(batch):
+            if timestamp >= self._rotation_time:
+                self.__write_records(batch[start:index])
+                self.__rotate(timestamp)
+                start = index
+        self.__write_records(batch[start:])
+
+    def __write_records(self, records: List[Tuple[float, int, bytes]]):
+        if not records:
+            return
+        buffers = []
+        length = 0
+        for timestamp, packet_type, raw in records:
+            header = RECORD_HEADER.pack(timestamp, packet_type, len(raw))
+            buffers.append(header)
+            buffers.append(raw)
+            length += len(header) + len(raw)
+        os.write(self._index_fd, INDEX_ENTRY.pack(records[0][0], self._log_offset))
+        _writev_all(self._log_fd, buffers)
+        self._log_offset += length
+
+    def __rotate(self, timestamp: float):
+        self.__close_files()
+        # Align the rotation times with the interval, like the timed rotating file handler
+        self._rotation_time = (
+            timestamp // self.rotation_interval + 1
+        ) * self.rotation_interval
+        date_string = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d_%H-%M-%S")
+        self.file_name = os.path.join(
+            self.log_dir, f"{RAW_LOG_BASE_NAME}_{date_string}.bin"
+        )
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._log_fd = os.open(self.file_name, flags, 0o644)
+        self._index_fd = os.open(f"{self.file_name}.idx", flags, 0o644)
+        self._log_offset = os.lseek(self._log_fd, 0, os.SEEK_END)
+        if self._log_offset == 0:
+            os.write(self._log_fd, FILE_HEADER.pack(RAW_LOG_MAGIC, RAW_LOG_VERSION, 0))
+            self._log_offset = FILE_HEADER.size
+
+    def __close_files(self):
+        for fd in (self._log_fd, self._index_fd):
+            if fd is not None:
+                os.close(fd)
+        self._log_fd = None
+        self._index_fd = None
+
+
+def read_raw_log(
+    file_name: str, start_time: Optional[float] = None
+) -> Iterator[Tuple[float, int, bytes]]:
+    """Read the records of a binary raw log.
+
+    :param file_name: Log file
+    :param start_time: Skip records before this time. The index file is used to seek close
+        to the first record.
+    :return: Iterator over the timestamp, packet type and packet of each record
+    """
+    with open(file_name, "rb") as file:
+        magic, version, _ = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != RAW_LOG_MAGIC or version != RAW_LOG_VERSION:
+            raise ValueError(
+                f"{file_name} is not a raw log of version {RAW_LOG_VERSION}"
+            )
+        if start_time is not None:
+            file.seek(
+                max(FILE_HEADER.size, _seek_offset(f"{file_name}.idx", start_time))
+            )
+        data = file.read()
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        timestamp, packet_type, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if start_time is None or timestamp >= start_time:
+            yield timestamp, packet_type, data[offset : offset + length]
+        offset += length
+
+
+def _seek_offset(index_file_name: str, start_time: float) -> int:
+    """Return the offset of the last batch which starts before the given time."""
+    if not os.path.isfile(index_file_name):
+        return 0
+    with open(index_file_name, "rb") as file:
+        data = file.read()
+    entries = [
+        INDEX_ENTRY.unpack_from(data, offset)
+        for offset in range(0, len(data) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size)
+    ]
+    index = bisect_right([entry[0] for entry in entries], start_time) - 1
+    return entries[index][1] if index >= 0 else 0
+
+
+def _writev_all(fd: int, buffers: List[bytes]):
+    """Write all buffers, in chunks of at most IOV_MAX buffers, and continue after partial
+    writes."""
+    while buffers:
+        chunk = buffers[:IOV_MAX]
+        written = os.writev(fd, chunk)
+        for index, buffer in enumerate(chunk):
+            if written < len(buffer):
+                buffers = [memoryview(buffer)[written:]] + buffers[index + 1 :]
+                break
+            written -= len(buffer)
+        else:
+            buffers = buffers[len(chunk) :]
@@ -0,0 +1,56 @@
+"""Timing of the startup phases of the TMTC client.
+
+This module only uses the standard library, so it can be imported before the heavy imports
+it measures.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, NamedTuple
+
+
+class PhaseTiming(NamedTuple):
+    name: str
+    duration: float
+    modules: int
+
+
+class StartupProfiler:
+    """Records the duration and the number of newly imported modules of startup phases.
+
+    :param start_time: perf_counter value at which the startup began
+    """
+
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.phases: List[PhaseTiming] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        module_count = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                PhaseTiming(
+                    name=name,
+                    duration=time.perf_counter() - start,
+                    modules=len(sys.modules) - module_count,
+                )
+            )
+
+    def report(self) -> List[str]:
+        """Return one line per phase and a line with the total startup time."""
+        width = max((len(phase.name) for phase in self.phases), default=0)
+        lines = [
+            f"{phase.name:<{width}} {phase.duration * 1000:8.1f} ms, "
+            f"{phase.modules} modules imported"
+            for phase in self.phases
+        ]
+        total = time.perf_counter() - self.start_time
+        lines.append(
+            f"{'Total':<{width}} {total * 1000:8.1f} ms, "
+            f"{len(sys.modules)} modules loaded"
+        )
+        return lines
@@ -0,0 +1,371 @@
+"""Pipelined sending of telecommand batches with verification tracking.
+
+The TC queue of the backend sends one telecommand at a time with a fixed delay, and the
+verificator of tmtccmd logs every verification report. Regression campaigns with thousands
+of telecommands take hours this way. The pipeline sends the telecommands of a command file
+with up to window_size telecommands in flight and an optional rate limit instead. The
+verification reports are picked up as raw packets by the TM dispatcher and looked up in a
+table keyed by the request ID, which is the first four bytes of the telecommand. The
+request ID is read at the offset of the source data, which depends on the timestamp format
+of the telemetry. Only the reports of the telecommands of the pipeline are consumed, all
+others are still passed to the verificator.
+
+Command files contain one telecommand per line, with the service, the subservice and the
+optional application data as hex string, separated by semicolons. Empty lines and lines
+starting with # are skipped. Binary raw logs can be used as command files as well, their
+telecommands are sent again with new sequence counts.
+"""
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from spacepackets.ccsds.time import CcsdsTimeProvider, CdsShortTimestamp
+from spacepackets.ecss import PusTelecommand
+from spacepackets.ecss.tm import PusTelemetry
+from tmtccmd import get_console_logger
+from tmtccmd.com_if import ComInterface
+from utility.defaults import DEFAULT_TC_APID, DEFAULT_TC_TIMEOUT, DEFAULT_TC_WINDOW
+from utility.lookup_table import translate_returnvalue
+from utility.raw_log import (
+    BinaryRawTmtcLogWrapper,
+    PACKET_TYPE_TC,
+    PACKET_TYPE_TM,
+    RAW_LOG_MAGIC,
+    read_raw_log,
+)
+from utility.tm_dispatch import TmDispatcher
+
+LOGGER = get_console_logger()
+
+# Interval of the progress log
+PROGRESS_INTERVAL = 2.0
+# Maximum time the client waits for telemetry while the window is full
+WAIT_INTERVAL = 0.01
+SEQ_COUNT_MASK = 0x3FFF
+VERIFICATION_SERVICE = 1
+SUBSERVICE_ACCEPTANCE_SUCCESS = 1
+SUBSERVICE_START_SUCCESS = 3
+SUBSERVICE_STEP_SUCCESS = 5
+SUBSERVICE_COMPLETION_SUCCESS = 7
+# Failure reports carry the step number before the error code
+SUBSERVICE_STEP_FAILURE = 6
+FAILURE_SUBSERVICES = (2, 4, 6, 8)
+
+
+def source_data_offset(time_reader: CcsdsTimeProvider) -> int:
+    """Return the offset of the source data of telemetry whose secondary header contains a
+    timestamp in the format of the time reader."""
+    tm = PusTelemetry(service=1, subservice=1, apid=0, time_provider=time_reader)
+    return len(tm.pack()) - 2
+
+
+class TcEntry(NamedTuple):
+    line: int
+    service: int
+    subservice: int
+    app_data: bytes
+
+
+class TcRecord:
+    """Verification state of a sent telecommand."""
+
+    __slots__ = (
+        "entry",
+        "request_id",
+        "sent_time",
+        "accepted",
+        "started",
+        "steps",
+        "completed",
+        "failed_subservice",
+        "error_code",
+        "timed_out",
+    )
+
+    def __init__(self, entry: TcEntry, request_id: int, sent_time: float):
+        self.entry = entry
+        self.request_id = request_id
+        self.sent_time = sent_time
+        self.accepted = False
+        self.started = False
+        self.steps = 0
+        self.completed = False
+        self.failed_subservice: Optional[int] = None
+        self.error_code: Optional[int] = None
+        self.timed_out = False
+
+    @property
+    def done(self) -> bool:
+        return self.completed or self.failed_subservice is not None or self.timed_out
+
+
+class PipelineStats(NamedTuple):
+    total: int
+    sent: int
+    completed: int
+    failed: int
+    timed_out: int
+    outstanding: int
+    unknown_reports: int
+    duration: float
+
+
+def load_tc_file(file_name: str) -> List[TcEntry]:
+    """Load the telecommands of a command file or of a binary raw log."""
+    with open(file_name, "rb") as file:
+        is_raw_log = file.read(len(RAW_LOG_MAGIC)) == RAW_LOG_MAGIC
+    if is_raw_log:
+        entries = []
+        for index, (_, packet_type, packet) in enumerate(read_raw_log(file_name)):
+            if packet_type != PACKET_TYPE_TC:
+                continue
+            tc = PusTelecommand.unpack(packet)
+            entries.append(TcEntry(index, tc.service, tc.subservice, tc.app_data))
+        return entries
+    entries = []
+    with open(file_name) as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = [field.strip() for field in line.split(";")]
+            try:
+                app_data = bytes.fromhex(fields[2]) if len(fields) > 2 else bytes()
+                entries.append(
+                    TcEntry(line_number, int(fields[0], 0), int(fields[1], 0), app_data)
+                )
+            except (ValueError, IndexError):
+                raise ValueError(f"{file_name}:{line_number}: Invalid telecommand")
+    return entries
+
+
+class TcPipeline:
+    """Sends a batch of telecommands with a window of telecommands in flight.
+
+    A telecommand leaves the window when its completion success or any failure report
+    arrives, or when it timed out.
+
+    :param com_if: Communication interface used to send the telecommands
+    :param entries: Telecommands to send
+    :param apid: APID of the telecommands
+    :param window_size: Maximum number of telecommands in flight
+    :param rate: Maximum number of telecommands per second, or 0 for no limit
+    :param timeout: Time after which a telecommand without completion report fails
+    :param raw_logger: Optional raw logger for the sent telecommands. A binary raw logger
+        also logs the consumed verification reports.
+    :param name: Prefix of the log messages
+    :param progress_interval: Interval of the progress log, or None to disable it
+    :param time_reader: Timestamp format of the telemetry. Default: CDS short timestamp
+    """
+
+    def __init__(
+        self,
+        com_if: ComInterface,
+        entries: List[TcEntry],
+        apid: int = DEFAULT_TC_APID,
+        window_size: int = DEFAULT_TC_WINDOW,
+        rate: float = 0,
+        timeout: float = DEFAULT_TC_TIMEOUT,
+        raw_logger=None,
+        name: str = "TC pipeline",
+        progress_interval: Optional[float] = PROGRESS_INTERVAL,
+        time_reader: Optional[CcsdsTimeProvider] = None,
+    ):
+        if not 1 <= window_size <= SEQ_COUNT_MASK:
+            raise ValueError(f"The window size must be between 1 and {SEQ_COUNT_MASK}")
+        self.com_if = com_if
+        self.entries = entries
+        self.apid = apid
+        self.window_size = window_size
+        self.send_interval = 1 / rate if rate > 0 else 0.0
+        self.timeout = timeout
+        self.raw_logger = raw_logger
+        self.name = name
+        self.progress_interval = progress_interval
+        if time_reader is None:
+            time_reader = CdsShortTimestamp.empty()
+        self.request_id_offset = source_data_offset(time_reader)
+        self.records: List[TcRecord] = []
+        # Records in flight in send order, keyed by request ID
+        self.in_flight: Dict[int, TcRecord] = dict()
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.unknown_reports = 0
+        self._seq_count = 0
+        self._next_send_time = 0.0
+        self._start_time: Optional[float] = None
+        self._next_progress_time = 0.0
+
+    def register(self, dispatcher: TmDispatcher):
+        """Consume the verification reports of the pipeline before the regular verificator
+        sees them."""
+        dispatcher.add_raw_handler(self.handle_report, service=VERIFICATION_SERVICE)
+
+    @property
+    def busy(self) -> bool:
+        return len(self.records) < len(self.entries) or bool(self.in_flight)
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.busy and self.completed == len(self.entries)
+
+    def handle_report(
+        self,
+        apid: int,
+        service: Optional[int],
+        subservice: Optional[int],
+        packet: memoryview,
+    ) -> bool:
+        """Update the record of the telecommand a verification report belongs to.
+
+        :return: True if the report belongs to a telecommand of the pipeline in flight
+        """
+        offset = self.request_id_offset
+        if len(packet) < offset + 4:
+            return False
+        record = self.in_flight.get(int.from_bytes(packet[offset : offset + 4], "big"))
+        if record is None:
+            self.unknown_reports += 1
+            return False
+        if isinstance(self.raw_logger, BinaryRawTmtcLogWrapper):
+            self.raw_logger.log_raw(PACKET_TYPE_TM, bytes(packet))
+        if subservice == SUBSERVICE_ACCEPTANCE_SUCCESS:
+            record.accepted = True
+        elif subservice == SUBSERVICE_START_SUCCESS:
+            record.started = True
+        elif subservice == SUBSERVICE_STEP_SUCCESS:
+            record.steps += 1
+        elif subservice == SUBSERVICE_COMPLETION_SUCCESS:
+            record.completed = True
+            self.completed += 1
+            del self.in_flight[record.request_id]
+        elif subservice in FAILURE_SUBSERVICES:
+            error_offset = offset + 4
+            if subservice == SUBSERVICE_STEP_FAILURE:
+                error_offset += 1
+            record.failed_subservice = subservice
+            if len(packet) >= error_offset + 2:
+                record.error_code = int.from_bytes(
+                    packet[error_offset : error_offset + 2], "big"
+                )
+            self.failed += 1
+            del self.in_flight[record.request_id]
+            error = "unknown error"
+            if record.error_code is not None:
+                error = translate_returnvalue(record.error_code) or "unknown error"
+                error = f"{error} ({record.error_code:#06x})"
+            LOGGER.warning(
+                f"{self.name}: TC[{record.entry.service}, {record.entry.subservice}] "
+                f"from line {record.entry.line} failed with TM[1, {subservice}], {error}"
+            )
+        return True
+
+    def operation(self) -> int:
+        """Expire timed out telecommands and send as many telecommands as the window and the
+        rate limit allow.
+
+        :return: Number of telecommands sent
+        """
+        now = time.monotonic()
+        if self._start_time is None:
+            self._start_time = now
+            self._next_send_time = now
+            self._next_progress_time = now + (self.progress_interval or 0)
+        self.__expire(now)
+        sent = 0
+        while (
+            len(self.records) < len(self.entries)
+            and len(self.in_flight) < self.window_size
+            and now >= self._next_send_time
+        ):
+            self.__send(self.entries[len(self.records)], now)
+            sent += 1
+            if self.send_interval > 0:
+                # Do not send a burst to catch up after a stall
+                self._next_send_time = (
+                    max(self._next_send_time, now - self.send_interval)
+                    + self.send_interval
+                )
+        if self.progress_interval is not None and now >= self._next_progress_time:
+            self._next_progress_time = now + self.progress_interval
+            self.log_progress()
+        return sent
+
+    def next_delay(self) -> float:
+        """Return the time until the next telecommand may be sent. While the window is full,
+        this is the maximum time to wait for telemetry."""
+        if (
+            len(self.records) < len(self.entries)
+            and len(self.in_flight) < self.window_size
+        ):
+            return min(WAIT_INTERVAL, self._next_send_time - time.monotonic())
+        return WAIT_INTERVAL
+
+    def wait(self):
+        """Wait until the next telecommand may be sent, or telemetry arrived."""
+        delay = self.next_delay()
+        if delay > 0:
+            self.com_if.data_available(delay)
+
+    def stats(self) -> PipelineStats:
+        duration = 0.0
+        if self._start_time is not None:
+            duration = time.monotonic() - self._start_time
+        return PipelineStats(
+            total=len(self.entries),
+            sent=len(self.records),
+            completed=self.completed,
+            failed=self.failed,
+            timed_out=self.timed_out,
+            outstanding=len(self.in_flight),
+            unknown_reports=self.unknown_reports,
+            duration=duration,
+        )
+
+    def log_progress(self):
+        stats = self.stats()
+        rate = stats.sent / stats.duration if stats.duration > 0 else 0.0
+        LOGGER.info(
+            f"{self.name}: {stats.sent}/{stats.total} sent, {stats.completed} completed, "
+            f"{stats.failed} failed, {stats.timed_out} timed out, "
+            f"{stats.outstanding} outstanding, {rate:.1f} TC/s"
+        )
+
+    def reserve_seq_count(self) -> int:
+        """Return the next sequence count of the pipeline. Telecommands which are sent
+        besides the batch with the APID of the pipeline must use it, otherwise their
+        verification reports are taken for the ones of a batch telecommand."""
+        seq_count = self._seq_count
+        self._seq_count = (self._seq_count + 1) & SEQ_COUNT_MASK
+        return seq_count
+
+    def __send(self, entry: TcEntry, now: float):
+        tc = PusTelecommand(
+            service=entry.service,
+            subservice=entry.subservice,
+            app_data=entry.app_data,
+            seq_count=self.reserve_seq_count(),
+            apid=self.apid,
+        )
+        raw = tc.pack()
+        request_id = int.from_bytes(raw[:4], "big")
+        record = TcRecord(entry, request_id, now)
+        self.records.append(record)
+        self.in_flight[request_id] = record
+        self.com_if.send(raw)
+        if self.raw_logger is not None:
+            self.raw_logger.log_tc(tc)
+
+    def __expire(self, now: float):
+        # The records are in send order, so only the oldest ones can have timed out
+        while self.in_flight:
+            record = next(iter(self.in_flight.values()))
+            if now - record.sent_time < self.timeout:
+                return
+            record.timed_out = True
+            self.timed_out += 1
+            del self.in_flight[record.request_id]
+            LOGGER.warning(
+                f"{self.name}: TC[{record.entry.service}, {record.entry.subservice}] "
+                f"from line {record.entry.line} timed out"
+            )
@@ -0,0 +1,244 @@
+"""Fast dispatch of telemetry by APID, service and subservice.
+
+The APID handlers of the TM handler unpack every packet into a PUS telemetry object before
+it is printed, logged or verified. The dispatcher peeks at the CCSDS primary header and the
+service and subservice bytes of the PUS secondary header through a memoryview instead and
+passes the packet to raw handlers registered for this key. Raw handlers can consume
+packets, which then skip the APID handlers and their object construction entirely. Packets
+are consumed by all handlers registered with consume set, or by a single packet if one of
+the handlers returns True for it.
+
+Routes are stored in a dictionary keyed by service and subservice, and by the APID as well if
+a raw handler is registered for a specific APID. Routes for the TM subservices of the
+generated subservice table and for the subservices named by the registrations are built when
+a handler is registered. Other keys are resolved when they are first received and cached.
+"""
+import csv
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from tmtccmd import get_console_logger
+from tmtccmd.tm import CcsdsTmHandler, SpecificApidHandlerBase
+
+LOGGER = get_console_logger()
+
+SUBSERVICE_TABLE_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "config", "subservices.csv"
+)
+# Offsets of the secondary header flag, the service and the subservice. They are the same
+# for PUS A and PUS C telemetry.
+SEC_HEADER_FLAG_OFFSET = 0
+SEC_HEADER_FLAG_MASK = 0x08
+SERVICE_OFFSET = 7
+SUBSERVICE_OFFSET = 8
+# Route key APID used while no raw handler is registered for a specific APID. APIDs only
+# have 11 bits, so it never collides with a received one.
+ANY_APID = 0x800
+
+RawTmHandler = Callable[[int, Optional[int], Optional[int], memoryview], Optional[bool]]
+
+
+class SubserviceEntry(NamedTuple):
+    service: int
+    subservice: int
+    name: str
+    packet_type: str
+
+
+class TmRoute(NamedTuple):
+    handlers: Tuple[RawTmHandler, ...]
+    consume: bool
+
+
+class _Registration(NamedTuple):
+    handler: RawTmHandler
+    apid: Optional[int]
+    service: Optional[int]
+    subservice: Optional[int]
+    consume: bool
+
+
+EMPTY_ROUTE = TmRoute(handlers=(), consume=False)
+
+
+def load_subservice_table(
+    file_name: str = SUBSERVICE_TABLE_FILE,
+) -> Dict[Tuple[int, int], SubserviceEntry]:
+    """Load the subservice table written by the subservice generator.
+
+    :return: Entries keyed by service and subservice. Empty if the table does not exist.
+    """
+    if not os.path.isfile(file_name):
+        return dict()
+    table = dict()
+    with open(file_name, newline="") as file:
+        for row in csv.reader(file, delimiter=";"):
+            if len(row) < 4:
+                continue
+            entry = SubserviceEntry(int(row[0]), int(row[1]), row[2], row[3])
+            table[(entry.service, entry.subservice)] = entry
+    return table
+
+
+class TmDispatcher(CcsdsTmHandler):
+    """CCSDS TM handler which passes packets to raw handlers before the APID handlers of the
+    wrapped TM handler.
+
+    :param ccsds_handler: TM handler, which still handles all packets which are not
+        consumed by a raw handler
+    :param subservice_table: Table of known subservices. By default, the table generated
+        into the config folder is loaded.
+    """
+
+    def __init__(
+        self,
+        ccsds_handler: CcsdsTmHandler,
+        subservice_table: Optional[Dict[Tuple[int, int], SubserviceEntry]] = None,
+    ):
+        super().__init__(generic_handler=ccsds_handler.generic_handler)
+        self.ccsds_handler = ccsds_handler
+        if subservice_table is None:
+            subservice_table = load_subservice_table()
+        self.subservice_table = subservice_table
+        self._registrations: List[_Registration] = []
+        self._routes: Dict[int, TmRoute] = dict()
+        self._by_apid = False
+
+    def add_apid_handler(self, handler: SpecificApidHandlerBase):
+        self.ccsds_handler.add_apid_handler(handler)
+
+    def has_apid(self, apid: int) -> bool:
+        return self.ccsds_handler.has_apid(apid)
+
+    def add_raw_handler(
+        self,
+        handler: RawTmHandler,
+        apid: Optional[int] = None,
+        service: Optional[int] = None,
+        subservice: Optional[int] = None,
+        consume: bool = False,
+    ):
+        """Register a handler for raw packets. The handler is called with the APID,
+        service, subservice and a memoryview of the packet, which is only valid during
+        the call. If the handler returns True, the packet is consumed.
+
+        :param apid: APID to match, or None to match all APIDs
+        :param service: Service to match, or None to match all services
+        :param subservice: Subservice to match, or None to match all subservices
+        :param consume: Do not pass any matching packet to the APID handlers
+        """
+        self._registrations.append(
+            _Registration(handler, apid, service, subservice, consume)
+        )
+        self._routes.clear()
+        apids = {
+            registration.apid
+            for registration in self._registrations
+            if registration.apid is not None
+        }
+        # Routes only depend on the APID if a registration names one
+        self._by_apid = bool(apids)
+        if not self._by_apid:
+            apids = {ANY_APID}
+        keys = {
+            (entry.service, entry.subservice)
+            for entry in self.subservice_table.values()
+            if entry.packet_type != "TC"
+        }
+        keys.update(
+            (registration.service, registration.subservice)
+            for registration in self._registrations
+            if registration.service is not None and registration.subservice is not None
+        )
+        for route_apid in apids:
+            for known_service, known_subservice in keys:
+                self._routes[
+                    _route_key(route_apid, known_service, known_subservice)
+                ] = self.__resolve(route_apid, known_service, known_subservice)
+
+    def subservice_name(self, service: int, subservice: int) -> Optional[str]:
+        entry = self.subservice_table.get((service, subservice))
+        return entry.name if entry is not None else None
+
+    def handle_packet(self, apid: int, packet: bytes) -> bool:
+        if not self._registrations:
+            return self.ccsds_handler.handle_packet(apid, packet)
+        view = memoryview(packet)
+        if (
+            len(view) > SUBSERVICE_OFFSET
+            and view[SEC_HEADER_FLAG_OFFSET] & SEC_HEADER_FLAG_MASK
+        ):
+            service = view[SERVICE_OFFSET]
+            subservice = view[SUBSERVICE_OFFSET]
+        else:
+            service = subservice = None
+        route_apid = apid if self._by_apid else ANY_APID
+        key = _route_key(route_apid, service, subservice)
+        route = self._routes.get(key)
+        if route is None:
+            route = self.__resolve(route_apid, service, subservice)
+            self._routes[key] = route
+        consumed = route.consume
+        for handler in route.handlers:
+            if handler(apid, service, subservice, view):
+                consumed = True
+        if consumed:
+            return True
+        return self.ccsds_handler.handle_packet(apid, packet)
+
+    def __resolve(
+        self, apid: int, service: Optional[int], subservice: Optional[int]
+    ) -> TmRoute:
+        handlers = []
+        consume = False
+        for registration in self._registrations:
+            if registration.apid is not None and registration.apid != apid:
+                continue
+            if registration.service is not None and registration.service != service:
+                continue
+            if (
+                registration.subservice is not None
+                and registration.subservice != subservice
+            ):
+                continue
+            handlers.append(registration.handler)
+            consume |= registration.consume
+        if not handlers:
+            return EMPTY_ROUTE
+        return TmRoute(handlers=tuple(handlers), consume=consume)
+
+
+def _route_key(apid: int, service: Optional[int], subservice: Optional[int]) -> int:
+    if service is None:
+        # Packets without a PUS secondary header, for example CFDP PDUs
+        return -1 - apid
+    return apid << 16 | service << 8 | subservice
+
+
+class TmCounter:
+    """Raw handler which counts packets per APID, service and subservice."""
+
+    def __init__(self):
+        self.counts: Dict[Tuple[int, Optional[int], Optional[int]], int] = dict()
+
+    def __call__(
+        self,
+        apid: int,
+        service: Optional[int],
+        subservice: Optional[int],
+        packet: memoryview,
+    ):
+        key = (apid, service, subservice)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def log_counts(self, dispatcher: Optional[TmDispatcher] = None):
+        for (apid, service, subservice), count in sorted(
+            self.counts.items(), key=lambda item: str(item[0])
+        ):
+            name = None
+            if dispatcher is not None and service is not None:
+                name = dispatcher.subservice_name(service, subservice)
+            label = f"APID {apid:#05x} service {service} subservice {subservice}"
+            if name is not None:
+                label += f" ({name})"
+            LOGGER.info(f"{label}: {count} packets")
@@ -0,0 +1,218 @@
+"""Receive thread for the UDP communication interface.
+
+By default, telemetry is only read from the socket when the backend runs on the main thread.
+Printing, verification and logging of a burst of packets then delay the next read, and the
+kernel drops datagrams once the socket buffer is full. The receive thread reads the socket
+continuously and stores the datagrams in a preallocated ring buffer. The backend drains the
+ring buffer through the regular receive call of the communication interface.
+"""
+import select
+import socket
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+from tmtccmd import get_console_logger
+from tmtccmd.com_if import ComInterface
+from tmtccmd.com_if.udp import UdpComIF
+from tmtccmd.tm import TelemetryListT
+from utility.defaults import DEFAULT_SLOT_COUNT
+
+LOGGER = get_console_logger()
+
+DEFAULT_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+# Maximum time until the thread notices that it should stop
+STOP_POLL_INTERVAL = 0.2
+
+
+class ReceiverStats(NamedTuple):
+    received: int
+    dropped: int
+    depth: int
+    high_water_mark: int
+
+
+class SlotRingBuffer:
+    """Ring buffer of fixed size slots for a single producer and a single consumer.
+
+    The producer receives directly into the memoryview of the next free slot, so no memory is
+    allocated on the receive path. The consumer copies the packets out of the slots.
+
+    :param slot_count: Number of packets the buffer can hold
+    :param slot_size: Maximum size of a packet
+    """
+
+    def __init__(self, slot_count: int, slot_size: int):
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self._buffer = memoryview(bytearray(slot_count * slot_size))
+        self._slots = [
+            self._buffer[index * slot_size : (index + 1) * slot_size]
+            for index in range(slot_count)
+        ]
+        self._lengths = [0] * slot_count
+        self._lock = threading.Lock()
+        self._head = 0
+        self._tail = 0
+        self._count = 0
+        self.received = 0
+        self.dropped = 0
+        self.high_water_mark = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def write_slot(self) -> Optional[memoryview]:
+        """Return the next free slot, or None if the buffer is full. Only the consumer frees
+        slots, so a returned slot stays free until it is committed."""
+        if self._count == self.slot_count:
+            return None
+        return self._slots[self._head]
+
+    def commit(self, length: int) -> bool:
+        """Publish the packet written into the current write slot.
+
+        :return: True if the buffer was empty before
+        """
+        self._lengths[self._head] = length
+        with self._lock:
+            self._head = (self._head + 1) % self.slot_count
+            self._count += 1
+            self.received += 1
+            self.high_water_mark = max(self.high_water_mark, self._count)
+            return self._count == 1
+
+    def drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def drain(self, max_packets: Optional[int] = None) -> List[bytearray]:
+        """Copy up to max_packets packets out of the buffer and free their slots."""
+        with self._lock:
+            tail = self._tail
+            count = self._count
+        if max_packets is not None:
+            count = min(count, max_packets)
+        packets = []
+        for offset in range(count):
+            index = (tail + offset) % self.slot_count
+            packets.append(bytearray(self._slots[index][: self._lengths[index]]))
+        with self._lock:
+            self._tail = (tail + count) % self.slot_count
+            self._count -= count
+        return packets
+
+    def stats(self) -> ReceiverStats:
+        with self._lock:
+            return ReceiverStats(
+                received=self.received,
+                dropped=self.dropped,
+                depth=self._count,
+                high_water_mark=self.high_water_mark,
+            )
+
+
+class ReceiveThreadComIF(ComInterface):
+    """Wraps the UDP communication interface and reads its socket in a separate thread.
+
+    :param com_if: UDP communication interface, which is still used for sending
+    :param slot_count: Number of datagrams which can be buffered
+    :param socket_buffer_size: Requested size of the kernel receive buffer
+    """
+
+    def __init__(
+        self,
+        com_if: UdpComIF,
+        slot_count: int = DEFAULT_SLOT_COUNT,
+        socket_buffer_size: int = DEFAULT_SOCKET_BUFFER_SIZE,
+    ):
+        self.com_if = com_if
+        self.ring_buffer = SlotRingBuffer(slot_count, com_if.max_recv_size)
+        self.socket_buffer_size = socket_buffer_size
+        # Called from the receive thread when packets arrive in an empty ring buffer
+        self.data_callback: Optional[Callable[[], None]] = None
+        self._data_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._scratch = bytearray(com_if.max_recv_size)
+
+    def get_id(self) -> str:
+        return self.com_if.get_id()
+
+    def initialize(self, args: any = None) -> any:
+        return self.com_if.initialize(args)
+
+    def open(self, args: any = None):
+        if not self.com_if.is_open():
+            self.com_if.open(args)
+        udp_socket = self.com_if.udp_socket
+        udp_socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer_size
+        )
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.__receive_thread, args=(udp_socket,), daemon=True
+        )
+        self._thread.start()
+
+    def is_open(self) -> bool:
+        return self.com_if.is_open()
+
+    def close(self, args: any = None) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            stats = self.stats()
+            LOGGER.info(
+                f"TM receiver: {stats.received} packets received, {stats.dropped} dropped, "
+                f"high-water mark {stats.high_water_mark} of {self.ring_buffer.slot_count}"
+            )
+        self.com_if.close(args)
+
+    def send(self, data: bytes):
+        self.com_if.send(data)
+
+    def data_available(self, timeout: float = 0, parameters: any = 0) -> bool:
+        if len(self.ring_buffer) > 0:
+            return True
+        if timeout > 0:
+            self._data_event.wait(timeout)
+        return len(self.ring_buffer) > 0
+
+    def receive(self, parameters: any = 0) -> TelemetryListT:
+        self._data_event.clear()
+        return self.ring_buffer.drain()
+
+    def stats(self) -> ReceiverStats:
+        return self.ring_buffer.stats()
+
+    def __receive_thread(self, udp_socket: socket.socket):
+        while not self._stop_event.is_set():
+            try:
+                readable, _, _ = select.select([udp_socket], [], [], STOP_POLL_INTERVAL)
+            except (OSError, ValueError):
+                # Socket was closed
+                return
+            if not readable:
+                continue
+            was_empty = False
+            while True:
+                slot = self.ring_buffer.write_slot()
+                try:
+                    if slot is None:
+                        udp_socket.recv_into(self._scratch)
+                        self.ring_buffer.drop()
+                        continue
+                    length = udp_socket.recv_into(slot)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except ConnectionResetError:
+                    LOGGER.warning("Connection reset exception occured!")
+                    break
+                except OSError:
+                    return
+                was_empty |= self.ring_buffer.commit(length)
+            if was_empty:
+                self._data_event.set()
+                if self.data_callback is not None:
+                    self.data_callback()